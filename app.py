@@ -1,23 +1,45 @@
 import streamlit as st
-import pandas as pd
-from utils.config import load_config, save_config
-from utils.formatting import format_discord_table
-from utils.discord_sender import send_batched_notifications
+from utils.config import ConfigStore
+from utils.discord_sender import DELIVERY_MODES, build_result_payloads
+from utils.notification_queue import NotificationQueue, NotificationWorker
+from utils.metrics import METRICS_PORT, RUN_HISTORY, start_metrics_server, timed
 from logic.runner import run_analysis
+from logic.routing import route_results
+from logic.results import AlertResults
+from indicators.registry import get_indicator_class, list_indicator_keys
 
 # Page Config
 st.set_page_config(page_title="Stock Notifier", layout="wide")
 st.title("📈 Pro Stock Notifier")
 
-# Load Config
-if "config" not in st.session_state:
-    st.session_state.config = load_config()
+@st.cache_resource
+def get_config_store() -> ConfigStore:
+    """One config store per server process: parsed and validated once, shared by every session."""
+    return ConfigStore()
 
-config = st.session_state.config
+
+# Load Config (edits are written atomically, batched by the store)
+config_store = get_config_store()
+config = config_store.config
 
 
 def save_current_config():
-    save_config(st.session_state.config)
+    config_store.update()
+
+
+@st.cache_resource
+def get_notification_worker() -> NotificationWorker:
+    """One queue worker per server process; it resumes anything left in the queue from a previous run."""
+    return NotificationWorker(NotificationQueue()).start()
+
+
+@st.cache_resource
+def get_metrics_server(port: int):
+    """One /metrics endpoint per server process ("metrics_port": 0 in config.json disables it)."""
+    return start_metrics_server(port) if port else None
+
+
+get_metrics_server(int(config.get("metrics_port", METRICS_PORT)))
 
 
 # --- Sidebar Helper Functions ---
@@ -92,9 +114,83 @@ def render_webhook_input():
         save_current_config()
 
 
+def render_delivery_mode_input():
+    """Render the Discord delivery mode selector (ASCII tables, embeds or CSV attachment)."""
+    labels = {
+        "auto": "Auto (fewest requests)",
+        "text": "Text tables",
+        "embeds": "Embeds",
+        "file": "CSV attachment",
+    }
+    current_mode = config.get("delivery_mode", "auto")
+    new_mode = st.selectbox(
+        "Discord Delivery", DELIVERY_MODES,
+        index=DELIVERY_MODES.index(current_mode) if current_mode in DELIVERY_MODES else 0,
+        format_func=lambda m: labels[m]
+    )
+    if new_mode != current_mode:
+        config["delivery_mode"] = new_mode
+        save_current_config()
+
+
+def render_route(route, k):
+    """Render one alert route (extra webhook filtered by groups/categories). Returns True if it should be deleted."""
+    with st.expander(f"📡 {route.get('name') or 'Unnamed Route'}", expanded=False):
+        new_name = st.text_input("Route Name", value=route.get("name", ""), key=f"r_name_{k}")
+        if new_name != route.get("name", ""):
+            route["name"] = new_name
+            save_current_config()
+
+        current_env = route.get("webhook_env", "")
+        new_env = st.text_input(
+            "Webhook env variable", value=current_env, key=f"r_env_{k}",
+            help="Name of the variable in .env holding this route's Discord webhook URL"
+        ).strip()
+        if new_env != current_env:
+            route["webhook_env"] = new_env
+            save_current_config()
+
+        group_names = [g.get("name", "") for g in config.get("groups", [])]
+        current_groups = [g for g in route.get("groups", []) if g in group_names]
+        new_groups = st.multiselect("Groups (empty = all)", group_names, default=current_groups, key=f"r_groups_{k}")
+        if new_groups != route.get("groups", []):
+            route["groups"] = new_groups
+            save_current_config()
+
+        category_names = list(config.get("ticker_categories", {}))
+        current_cats = [c for c in route.get("categories", []) if c in category_names]
+        new_cats = st.multiselect("Categories (empty = all)", category_names, default=current_cats, key=f"r_cats_{k}")
+        if new_cats != route.get("categories", []):
+            route["categories"] = new_cats
+            save_current_config()
+
+        if st.button("🗑️ Delete Route", key=f"del_r_{k}"):
+            return True
+
+    return False
+
+
+def render_routes_input():
+    """Render the alert routes editor. Alerts no route claims go to the default webhook."""
+    st.subheader("Alert Routes")
+    routes = config.setdefault("routes", [])
+
+    if st.button("➕ Add Route"):
+        routes.append({"name": f"Route {len(routes) + 1}", "webhook_env": "", "groups": [], "categories": []})
+        save_current_config()
+        st.rerun()
+
+    routes_to_remove = [k for k, route in enumerate(routes) if render_route(route, k)]
+    if routes_to_remove:
+        for idx in sorted(routes_to_remove, reverse=True):
+            routes.pop(idx)
+        save_current_config()
+        st.rerun()
+
+
 def render_condition_indicator(cond, i, j):
     """Render the indicator type selector for a condition."""
-    ind_types = ["RSI", "RCI", "Price vs EMA", "EMA Proximity", "Days Above EMA"]
+    ind_types = list_indicator_keys()
     curr_type = cond.get("indicator", "RSI")
     new_type = st.selectbox(
         "Indicator", ind_types,
@@ -102,116 +198,87 @@ def render_condition_indicator(cond, i, j):
         key=f"c_type_{i}_{j}", label_visibility="collapsed"
     )
     if new_type != curr_type:
-        cond["indicator"] = new_type
+        # Start from the new type's defaults: the old period/value may be outside its ranges
+        cond.clear()
+        cond.update(get_indicator_class(new_type).default_condition())
         save_current_config()
         st.rerun()
     return new_type
 
 
-def render_condition_period(cond, new_type, i, j):
-    """Render the period selector appropriate for the indicator type."""
-    ema_periods = [7, 13, 21, 55, 100, 200]
-    osc_periods = [9, 14, 21, 30, 50]
-    current_period = cond.get("period", 14)
-
-    if new_type in ["Price vs EMA", "EMA Proximity", "Days Above EMA"]:
-        new_period = st.selectbox(
-            "Period", ema_periods,
-            index=ema_periods.index(current_period) if current_period in ema_periods else 0,
-            key=f"c_per_{i}_{j}", label_visibility="collapsed"
-        )
-    elif new_type in ["RSI", "RCI"]:
-        new_period = st.selectbox(
-            "Period", osc_periods,
-            index=osc_periods.index(current_period) if current_period in osc_periods else 1,
-            key=f"c_per_{i}_{j}", label_visibility="collapsed"
+def render_param(cond, spec, widget_key, label_visibility="collapsed"):
+    """Render one declarative condition field (see indicators.base.ParamSpec) and persist changes."""
+    if spec.kind == "static":
+        st.write(spec.label)
+        return
+
+    curr_val = cond.get(spec.name, spec.default)
+
+    if spec.kind == "ticker":
+        new_val = st.text_input(
+            spec.label, value=str(curr_val or ""),
+            key=widget_key, label_visibility=label_visibility
+        ).strip().upper()
+    elif spec.choices:
+        options = list(spec.choices)
+        if curr_val in options:
+            index = options.index(curr_val)
+        else:
+            index = options.index(spec.default) if spec.default in options else 0
+        new_val = st.selectbox(
+            spec.label, options, index=index,
+            format_func=lambda o: str(spec.choice_labels.get(o, o)),
+            key=widget_key, label_visibility=label_visibility
         )
     else:
-        new_period = st.number_input(
-            "Period", value=int(current_period), min_value=1,
-            key=f"c_per_{i}_{j}", label_visibility="collapsed"
+        cast = int if spec.kind == "int" else float
+        bound = (lambda v: None if v is None else cast(v))
+        value = cast(curr_val if curr_val is not None else 0)
+        # A hand-edited config may hold a value outside the widget's range
+        if spec.min_value is not None:
+            value = max(value, cast(spec.min_value))
+        if spec.max_value is not None:
+            value = min(value, cast(spec.max_value))
+        new_val = st.number_input(
+            spec.label, value=value,
+            min_value=bound(spec.min_value), max_value=bound(spec.max_value), step=bound(spec.step),
+            key=widget_key, label_visibility=label_visibility
         )
 
-    if new_period != current_period:
-        cond["period"] = new_period
+    if new_val != curr_val:
+        cond[spec.name] = new_val
         save_current_config()
 
 
+def render_condition_period(cond, new_type, i, j):
+    """Render the period selector appropriate for the indicator type."""
+    spec = get_indicator_class(new_type).period_spec
+    if spec is None:
+        st.write("-")
+    else:
+        render_param(cond, spec, f"c_per_{i}_{j}")
+
+
 def render_condition_operator(cond, new_type, i, j):
     """Render the operator selector appropriate for the indicator type."""
-    if new_type == "EMA Proximity":
-        options = ["≈", ">", "<"]
-        curr_op = cond.get("operator", "=")
-
-        current_selection_index = 0
-        if curr_op == '>':
-            current_selection_index = 1
-        elif curr_op == '<':
-            current_selection_index = 2
-
-        selected_option = st.selectbox(
-            "Proximity", options,
-            index=current_selection_index,
-            key=f"c_op_{i}_{j}", label_visibility="collapsed"
-        )
-
-        new_op = {'≈': '=', '>': '>', '<': '<'}[selected_option]
-        if new_op != curr_op:
-            cond["operator"] = new_op
-            save_current_config()
-    elif new_type == "Days Above EMA":
-        ops = [">=", "<="]
-        curr_op = cond.get("operator", ">=")
-        new_op = st.selectbox(
-            "Op", ops, index=ops.index(curr_op) if curr_op in ops else 0,
-            key=f"c_op_{i}_{j}", label_visibility="collapsed"
-        )
-        if new_op != curr_op:
-            cond["operator"] = new_op
-            save_current_config()
-    else:
-        ops = ["<", ">"]
-        curr_op = cond.get("operator", "<")
-        new_op = st.selectbox(
-            "Op", ops, index=ops.index(curr_op) if curr_op in ops else 0,
-            key=f"c_op_{i}_{j}", label_visibility="collapsed"
-        )
-        if new_op != curr_op:
-            cond["operator"] = new_op
-            save_current_config()
+    render_param(cond, get_indicator_class(new_type).operator_spec, f"c_op_{i}_{j}")
 
 
 def render_condition_value(cond, new_type, i, j):
     """Render the threshold/value input appropriate for the indicator type."""
-    if new_type == "Price vs EMA":
-        st.write("Current EMA")
-    elif new_type == "EMA Proximity":
-        curr_val = cond.get("value", 3.0)
-        new_val = st.number_input(
-            "%", value=float(curr_val), min_value=0.1, max_value=100.0, step=0.5,
-            key=f"c_val_{i}_{j}", label_visibility="collapsed"
-        )
-        if new_val != curr_val:
-            cond["value"] = new_val
-            save_current_config()
-    elif new_type == "Days Above EMA":
-        curr_val = cond.get("value", 7)
-        new_val = st.number_input(
-            "Days", value=int(curr_val), min_value=1, max_value=365, step=1,
-            key=f"c_val_{i}_{j}", label_visibility="collapsed"
-        )
-        if new_val != curr_val:
-            cond["value"] = new_val
-            save_current_config()
-    else:
-        curr_val = cond.get("value", 30)
-        new_val = st.number_input(
-            "Val", value=float(curr_val),
-            key=f"c_val_{i}_{j}", label_visibility="collapsed"
-        )
-        if new_val != curr_val:
-            cond["value"] = new_val
-            save_current_config()
+    spec = get_indicator_class(new_type).value_spec
+    if spec is not None:
+        render_param(cond, spec, f"c_val_{i}_{j}")
+
+
+def render_condition_params(cond, new_type, i, j):
+    """Render any extra parameters the indicator declares (e.g. MACD fast/slow/signal)."""
+    specs = get_indicator_class(new_type).param_specs
+    if not specs:
+        return
+    for col, spec in zip(st.columns(len(specs)), specs):
+        with col:
+            render_param(cond, spec, f"c_{spec.name}_{i}_{j}", label_visibility="visible")
 
 
 def render_condition_row(cond, i, j):
@@ -227,9 +294,10 @@ def render_condition_row(cond, i, j):
     with c4:
         render_condition_value(cond, new_type, i, j)
     with c5:
-        return st.button("🗑️", key=f"del_c_{i}_{j}")
+        should_delete = st.button("🗑️", key=f"del_c_{i}_{j}")
 
-    return False
+    render_condition_params(cond, new_type, i, j)
+    return should_delete
 
 
 def render_group_conditions(group, i):
@@ -314,12 +382,33 @@ def render_alert_rules():
         st.rerun()
 
 
+def render_notification_queue_status():
+    """Show undelivered notifications and allow retrying ones that failed permanently."""
+    queue = get_notification_worker().queue
+    counts = queue.counts()
+    waiting = counts.get("pending", 0) + counts.get("sending", 0)
+    dead = counts.get("dead", 0)
+    if waiting:
+        st.caption(f"📨 {waiting} notification(s) waiting for delivery")
+    if dead:
+        st.warning(f"{dead} notification(s) failed permanently.")
+        for error in queue.dead_errors():
+            st.caption(error)
+        if st.button("🔁 Retry Failed Notifications"):
+            queue.requeue_dead()
+            get_notification_worker().notify()
+            st.rerun()
+
+
 def render_sidebar():
     """Top-level sidebar renderer composing all sidebar sections."""
     with st.sidebar:
         st.header("Global Settings")
         render_tickers_input()
         render_webhook_input()
+        render_delivery_mode_input()
+        render_routes_input()
+        render_notification_queue_status()
         st.divider()
         render_alert_rules()
 
@@ -330,40 +419,63 @@ render_sidebar()
 
 # --- Main Logic ---
 
-def display_results(results_by_group: dict[str, list[dict]]):
+def render_results_export(results: AlertResults):
+    """Offer the full results table as CSV / Parquet downloads for downstream tools."""
+    c1, c2 = st.columns(2)
+    with c1:
+        st.download_button(
+            "⬇️ Download CSV", results.to_csv(), file_name="alerts.csv",
+            mime="text/csv", on_click="ignore"
+        )
+    with c2:
+        st.download_button(
+            "⬇️ Download Parquet", results.to_parquet(None), file_name="alerts.parquet",
+            mime="application/octet-stream", on_click="ignore"
+        )
+
+
+def render_data_issues(results: AlertResults):
+    """List tickers the data quality check flagged (short histories only skip the longer conditions)."""
+    issues = results.data_issues
+    if issues.empty:
+        return
+    with st.expander(f"⚠️ {len(issues)} ticker(s) with data quality issues", expanded=False):
+        st.table(issues)
+
+
+def display_results(results: AlertResults):
     """Display analysis results in the main area and send Discord notifications."""
-    if not results_by_group:
+    render_data_issues(results)
+    if results.empty:
         st.info("No tickers matched any of the configured rules.")
         return
 
-    all_alerts_text = []
-
-    for g_name, matches in results_by_group.items():
+    for g_name in results.groups:
         st.subheader(f"🔔 {g_name}")
-        # Remove internal keys for Streamlit table display
-        display_matches = [{k: v for k, v in m.items() if not k.startswith("_")} for m in matches]
-        res_df = pd.DataFrame(display_matches)
-        st.table(res_df)
-
-        table_text = format_discord_table(matches)
-        group_text = f"**{g_name}**:\n{table_text}"
-        all_alerts_text.append(group_text)
-
-    # Send Discord notifications
-    webhook_url = config.get("webhook_url")
-    if not webhook_url:
+        st.table(results.group_table(g_name, include_category=False))
+
+    render_results_export(results)
+
+    # Send Discord notifications: one batch per destination webhook, all from this run's results
+    routed = route_results(results, config)
+    if not routed:
         st.warning("Notifications skipped (No Webhook URL configured).")
         return
 
-    success_count, total_count, errors = send_batched_notifications(webhook_url, all_alerts_text)
-
-    for error in errors:
-        st.error(error)
+    # Hand off to the durable queue; the background worker delivers (webhooks in parallel),
+    # rate-limits and retries
+    worker = get_notification_worker()
+    mode = config.get("delivery_mode", "auto")
+    queued = 0
+    for _, webhook_url, subset in routed:
+        with timed("batch"):
+            payloads = build_result_payloads(subset, mode)
+        queued += worker.queue.enqueue(webhook_url, payloads)
+    worker.notify()
 
-    if success_count > 0:
-        st.toast(f"{success_count} of {total_count} Discord notification(s) sent!", icon="✅")
-    if success_count < total_count:
-        st.warning(f"Failed to send {total_count - success_count} notification(s).")
+    if queued > 0:
+        destinations = ", ".join(name for name, _, _ in routed)
+        st.toast(f"{queued} Discord notification(s) queued for delivery ({destinations})", icon="📨")
 
 
 if st.button("🚀 Run Analysis", type="primary"):
@@ -381,11 +493,29 @@ if st.button("🚀 Run Analysis", type="primary"):
 
         try:
             status.write("Evaluating rules...")
-            results_by_group = run_analysis(config)
+            results = run_analysis(config, config_store.hashes)
             status.update(label="Analysis Complete!", state="complete", expanded=False)
-            display_results(results_by_group)
+            display_results(results)
 
         except Exception as e:
             st.error(f"An error occurred: {e}")
             import traceback
             st.text(traceback.format_exc())
+
+
+def render_run_history():
+    """Recent runs from the rolling run-history file, for spotting latency trends."""
+    runs = RUN_HISTORY.read(last=20)
+    if not runs:
+        return
+    with st.expander("⏱️ Recent runs", expanded=False):
+        rows = [
+            {"Time": r.get("ts"), "Outcome": r.get("outcome"), "Seconds": r.get("seconds"),
+             "Tickers": r.get("tickers"), "Excluded": r.get("excluded"), "Alerts": r.get("alerts"),
+             **{f"{stage} (s)": secs for stage, secs in r.get("stages", {}).items()}}
+            for r in reversed(runs)
+        ]
+        st.dataframe(rows, hide_index=True)
+
+
+render_run_history()
@@ -1,18 +1,22 @@
 import yfinance as yf
 import pandas as pd
 
-def fetch_stock_data(tickers: list[str], period="2y") -> pd.DataFrame:
+def fetch_stock_data(tickers: list[str], period="2y", start=None) -> pd.DataFrame:
     """
     Fetch stock data for given tickers.
-    Returns specific 'Close' price mostly related.
+    Returns the full OHLCV download (Open, High, Low, Close, Volume).
+    start: fetch from this date instead of the whole period (incremental updates).
     
     If multiple tickers, yf returns MultiIndex columns.
-    We generally want just the Close prices for this app.
+    All fields are kept so volume- and range-based indicators need no extra request.
     """
     if not tickers:
         return pd.DataFrame()
-        
-    data = yf.download(tickers, period=period, group_by='ticker', auto_adjust=True)
+
+    if start is not None:
+        data = yf.download(tickers, start=start, group_by='ticker', auto_adjust=True)
+    else:
+        data = yf.download(tickers, period=period, group_by='ticker', auto_adjust=True)
     
     # If single ticker, structure is simpler
     # If single ticker, structure is simpler
@@ -20,6 +24,24 @@ def fetch_stock_data(tickers: list[str], period="2y") -> pd.DataFrame:
     # or sometimes flat. The app logic should handle the structure.
     return data
 
+def extract_ticker_df(raw_data: pd.DataFrame, ticker: str, num_tickers: int) -> pd.DataFrame | None:
+    """
+    Safely extract a single ticker's DataFrame from yfinance output.
+    Handles both MultiIndex (multiple tickers) and flat (single ticker) structures.
+    Returns None if the ticker data cannot be extracted or is invalid.
+    """
+    try:
+        if isinstance(raw_data.columns, pd.MultiIndex):
+            if ticker in raw_data.columns.get_level_values(0):
+                return raw_data[ticker]
+        elif num_tickers == 1:
+            return raw_data
+    except (KeyError, TypeError) as e:
+        print(f"Warning: Could not extract data for {ticker}: {e}")
+
+    return None
+
+
 def get_latest_price(series: pd.Series) -> float:
     if series.empty:
         return 0.0
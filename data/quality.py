@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# A ticker whose last bar is more than this many sessions behind the universe's latest bar is stale
+MAX_STALE_BARS = 3
+# Longest run of missing bars tolerated between a ticker's first and last valid bar
+MAX_GAP_BARS = 5
+
+DATA_ISSUE_COLUMNS = ["Ticker", "Issue", "Detail"]
+SHORT_HISTORY = "Short history"
+
+
+def check_data_quality(close: pd.DataFrame, tickers: list[str] | None = None, min_history: int = 1,
+                       max_stale_bars: int = MAX_STALE_BARS, max_gap_bars: int = MAX_GAP_BARS) -> pd.DataFrame:
+    """
+    Validate a dates x tickers Close matrix in one vectorized pass, before any indicator work.
+
+    Flags, per ticker:
+      - "No data": nothing was fetched (delisted or invalid symbol)
+      - "Stale": the last bar lags the universe's latest bar by more than max_stale_bars sessions
+      - "Gaps": a run of more than max_gap_bars missing bars inside the ticker's history
+      - "Short history": fewer valid bars than min_history (the longest indicator lookback)
+    tickers: the requested universe; tickers missing from the matrix are reported as "No data".
+    Returns a table with one row per flagged ticker (columns Ticker, Issue, Detail).
+    """
+    if tickers is not None:
+        close = close.reindex(columns=list(dict.fromkeys(tickers)))
+    if close.shape[1] == 0:
+        return pd.DataFrame(columns=DATA_ISSUE_COLUMNS)
+
+    if close.shape[0] == 0:
+        return pd.DataFrame([(t, "No data", "No bars fetched (delisted or invalid symbol?)") for t in close.columns],
+                            columns=DATA_ISSUE_COLUMNS)
+
+    valid = close.notna().to_numpy()
+    n_rows = valid.shape[0]
+    has_data = valid.any(axis=0)
+    valid_bars = valid.sum(axis=0)
+
+    # Position of each ticker's first/last valid bar (meaningless where has_data is False)
+    first = valid.argmax(axis=0)
+    last = n_rows - 1 - valid[::-1].argmax(axis=0)
+    lag = n_rows - 1 - last
+
+    # Longest run of NaNs strictly between the first and last valid bar
+    rows = np.arange(n_rows)[:, None]
+    interior_missing = ~valid & (rows > first) & (rows < last)
+    run_ends = np.cumsum(interior_missing, axis=0)
+    resets = np.maximum.accumulate(np.where(interior_missing, 0, run_ends), axis=0)
+    longest_gap = (run_ends - resets).max(axis=0)
+
+    # Only the flagged tickers are visited to build the report
+    flagged = ~has_data | (lag > max_stale_bars) | (longest_gap > max_gap_bars) | (valid_bars < min_history)
+    issues = []
+    for k in np.flatnonzero(flagged):
+        ticker = close.columns[k]
+        if not has_data[k]:
+            issues.append((ticker, "No data", "No bars fetched (delisted or invalid symbol?)"))
+        elif lag[k] > max_stale_bars:
+            issues.append((ticker, "Stale", f"Last bar {close.index[last[k]].date()} is {lag[k]} sessions old"))
+        elif longest_gap[k] > max_gap_bars:
+            issues.append((ticker, "Gaps", f"{longest_gap[k]} consecutive missing bars"))
+        else:
+            issues.append((ticker, SHORT_HISTORY, f"{valid_bars[k]} bars, rules need {min_history}"))
+
+    return pd.DataFrame(issues, columns=DATA_ISSUE_COLUMNS)
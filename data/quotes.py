@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+QUOTE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _by_ticker(raw_data: pd.DataFrame, tickers: list[str]) -> pd.DataFrame:
+    """Single ticker downloads come back flat; give them the (ticker, field) column layout."""
+    if isinstance(raw_data.columns, pd.MultiIndex):
+        return raw_data
+    return pd.concat({tickers[0]: raw_data}, axis=1)
+
+
+def session_bars(raw_data: pd.DataFrame, tickers: list[str]) -> tuple[pd.Timestamp | None, pd.DataFrame]:
+    """
+    Collapse an intraday download (minute bars, yfinance layout) into one bar per ticker
+    for the session so far: first Open, highest High, lowest Low, last Close, summed Volume.
+    Returns (session date, tickers x OHLCV frame); tickers without data are all-NaN rows.
+    """
+    empty = pd.DataFrame(np.nan, index=pd.Index(tickers), columns=QUOTE_FIELDS)
+    if raw_data is None or raw_data.empty:
+        return None, empty
+    raw_data = _by_ticker(raw_data, tickers)
+
+    def matrix(field):
+        return raw_data.xs(field, axis=1, level=1).reindex(columns=tickers)
+
+    bars = pd.DataFrame({
+        "Open": matrix("Open").bfill().iloc[0],
+        "High": matrix("High").max(),
+        "Low": matrix("Low").min(),
+        "Close": matrix("Close").ffill().iloc[-1],
+        "Volume": matrix("Volume").sum(min_count=1),
+    })
+    last = raw_data.index[-1]
+    # Exchange-local date, comparable with the (timezone-naive) daily history index
+    session = (last.tz_localize(None) if last.tzinfo is not None else last).normalize()
+    return session, bars
+
+
+def merge_session_bars(earlier: pd.DataFrame, later: pd.DataFrame) -> pd.DataFrame:
+    """Combine a session bar with the bar over the minutes that followed it (same tickers)."""
+    return pd.DataFrame({
+        "Open": earlier["Open"].fillna(later["Open"]),
+        "High": np.fmax(earlier["High"], later["High"]),
+        "Low": np.fmin(earlier["Low"], later["Low"]),
+        "Close": later["Close"].fillna(earlier["Close"]),
+        "Volume": earlier["Volume"].add(later["Volume"], fill_value=0),
+    })
+
+
+class YahooQuoteFeed:
+    """
+    Quote snapshots from one-minute intraday downloads for the whole universe. The first
+    snapshot of a session downloads the session so far; later ones only download the
+    minutes since the previous snapshot (starting at its last minute, which may not have
+    been finished) and fold them into the running session bar.
+    """
+
+    def __init__(self, download=yf.download):
+        self.download = download
+        self.session: pd.Timestamp | None = None
+        self._tickers: list[str] = []
+        # Bar over the session's finished minutes, i.e. those before `_since`
+        self._finished: pd.DataFrame | None = None
+        # Start of the last minute received: the next download starts there
+        self._since: pd.Timestamp | None = None
+        self._bars: pd.DataFrame | None = None
+
+    def _fetch(self, tickers: list[str], **window) -> pd.DataFrame:
+        return self.download(tickers, interval="1m", group_by="ticker", auto_adjust=True, progress=False, **window)
+
+    def snapshot(self, tickers: list[str]) -> tuple[pd.Timestamp | None, pd.DataFrame]:
+        if not tickers:
+            return None, pd.DataFrame(columns=QUOTE_FIELDS)
+        incremental = self._since is not None and tickers == self._tickers
+        raw_data = self._fetch(tickers, start=self._since) if incremental else self._fetch(tickers, period="1d")
+        if raw_data is None or raw_data.empty:
+            if incremental:
+                return self.session, self._bars.copy()
+            return session_bars(raw_data, tickers)
+
+        raw_data = _by_ticker(raw_data, tickers)
+        # Only the latest day counts: after a session change the download also spans the previous one
+        days = raw_data.index.normalize()
+        raw_data = raw_data[days == days[-1]]
+        session, bars = session_bars(raw_data, tickers)
+        last = raw_data.index[-1]
+        _, finished = session_bars(raw_data[raw_data.index < last], tickers)
+        if incremental and session == self.session:
+            bars = merge_session_bars(self._finished, bars)
+            finished = merge_session_bars(self._finished, finished)
+
+        self.session, self._tickers, self._since = session, list(tickers), last
+        self._finished, self._bars = finished, bars
+        return session, bars.copy()
+
+
+class StubQuoteFeed:
+    """
+    Offline feed for tests and dry runs: each snapshot moves every ticker's price by a
+    seeded random step from the last close of `history`, keeping a running session bar
+    (High/Low follow the path, Volume accumulates).
+    """
+
+    def __init__(self, last_close: pd.Series, session: pd.Timestamp | None = None,
+                 volatility: float = 0.003, seed: int = 0):
+        self.session = pd.Timestamp(session).normalize() if session is not None else pd.Timestamp.now().normalize()
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        price = last_close.astype(float)
+        self.bars = pd.DataFrame({"Open": price, "High": price, "Low": price, "Close": price,
+                                  "Volume": pd.Series(0.0, index=price.index)})
+
+    def snapshot(self, tickers: list[str]) -> tuple[pd.Timestamp, pd.DataFrame]:
+        bars = self.bars
+        bars["Close"] = bars["Close"] * np.exp(self.rng.normal(0, self.volatility, len(bars)))
+        bars["High"] = np.fmax(bars["High"], bars["Close"])
+        bars["Low"] = np.fmin(bars["Low"], bars["Close"])
+        bars["Volume"] += self.rng.integers(100, 1_000, len(bars))
+        return self.session, bars.reindex(tickers).copy()
@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+from data.fetcher import extract_ticker_df, fetch_stock_data
+
+PRICE_CACHE_DIR = "price_cache"
+# Calendar days re-fetched before each ticker's last stored bar, to compare against what we have
+OVERLAP_DAYS = 10
+# Relative Close difference on overlapping bars treated as a retroactive adjustment
+# (dividends of a few basis points still exceed it; float noise between downloads does not)
+ADJUSTMENT_RTOL = 1e-4
+
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def period_start(period: str, now: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """First date covered by a yfinance period string such as "2y" or "6mo" (None for "max")."""
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return None
+    now = pd.Timestamp.now().normalize() if now is None else now
+    return now - pd.DateOffset(**{_PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+
+
+class PriceStore:
+    """
+    On-disk OHLCV history per ticker (one Parquet file each), updated incrementally.
+
+    Prices are split/dividend adjusted (auto_adjust=True), so a corporate action rewrites
+    a ticker's whole past. Each update re-fetches only the last `overlap_days` of every
+    stored ticker and compares the overlapping Close values with the stored ones: if they
+    moved by more than `rtol`, that ticker's history is re-fetched in full and its
+    revision is bumped (kept in meta.json as a record of how often that happened).
+    """
+
+    def __init__(self, path: str = PRICE_CACHE_DIR, fetch=fetch_stock_data, period: str = "2y",
+                 overlap_days: int = OVERLAP_DAYS, rtol: float = ADJUSTMENT_RTOL):
+        self.path = path
+        self.fetch = fetch
+        self.period = period
+        self.overlap_days = overlap_days
+        self.rtol = rtol
+        os.makedirs(path, exist_ok=True)
+        self._meta_file = os.path.join(path, "meta.json")
+        self.revisions: dict[str, int] = self._load_meta()
+        self._frames: dict[str, pd.DataFrame] = {}
+        # Outcome counts of the last update: tail-only refresh (hit), full fetch (miss), adjusted
+        self.last_update = {"hit": 0, "miss": 0, "adjusted": 0}
+
+    def _load_meta(self) -> dict[str, int]:
+        try:
+            with open(self._meta_file, "r") as f:
+                return json.load(f).get("revisions", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _atomic_write(self, target: str, write):
+        with tempfile.NamedTemporaryFile("wb", dir=self.path, prefix=".store-", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _save_meta(self):
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                json.dump({"revisions": self.revisions}, f, indent=4)
+        self._atomic_write(self._meta_file, write)
+
+    def _file(self, ticker: str) -> str:
+        return os.path.join(self.path, re.sub(r"[^\w.^=-]", "_", ticker) + ".parquet")
+
+    def revision(self, ticker: str) -> int:
+        """How many times the ticker's stored history was replaced because of a retroactive adjustment."""
+        return self.revisions.get(ticker, 0)
+
+    def history(self, ticker: str) -> pd.DataFrame | None:
+        """The stored bars of a ticker, or None if nothing is stored."""
+        if ticker not in self._frames:
+            file = self._file(ticker)
+            if not os.path.exists(file):
+                return None
+            try:
+                self._frames[ticker] = pd.read_parquet(file)
+            except Exception as e:
+                print(f"Warning: Could not read cached prices for {ticker}: {e}")
+                return None
+        return self._frames[ticker]
+
+    def _store(self, ticker: str, df: pd.DataFrame):
+        self._atomic_write(self._file(ticker), lambda tmp_path: df.to_parquet(tmp_path))
+        self._frames[ticker] = df
+
+    def is_adjusted(self, stored: pd.DataFrame, tail: pd.DataFrame) -> bool:
+        """
+        Whether freshly fetched bars disagree with stored ones on the dates both cover.
+        The last stored bar is left out, since it may have been an unfinished session.
+        No common bar at all counts as a mismatch, since nothing can be verified.
+        """
+        common = stored.index[:-1].intersection(tail.index)
+        if common.empty:
+            return True
+        old = stored.loc[common, "Close"].to_numpy(dtype=float)
+        new = tail.loc[common, "Close"].to_numpy(dtype=float)
+        return not np.allclose(new, old, rtol=self.rtol, atol=0, equal_nan=True)
+
+    def update(self, tickers: list[str]) -> set[str]:
+        """
+        Bring the stored history of `tickers` up to date: overlapping tail downloads for
+        stored tickers, grouped by their last stored date so a stale or delisted ticker never
+        widens everyone else's window (normally this is a single download), then one
+        full-period fetch for new tickers and those whose past was adjusted.
+        Returns the tickers whose history was invalidated.
+        """
+        stored = {t: self.history(t) for t in tickers}
+        cached = [t for t in tickers if stored[t] is not None and not stored[t].empty]
+        refetch = [t for t in tickers if t not in cached]
+        invalidated = set()
+        self.last_update = {"hit": 0, "miss": len(refetch), "adjusted": 0}
+
+        by_last_bar: dict[pd.Timestamp, list[str]] = {}
+        for ticker in cached:
+            by_last_bar.setdefault(stored[ticker].index[-1], []).append(ticker)
+
+        for last_bar, group in sorted(by_last_bar.items()):
+            start = last_bar - pd.Timedelta(days=self.overlap_days)
+            raw = self.fetch(group, start=start.strftime("%Y-%m-%d"))
+            for ticker in group:
+                tail = extract_ticker_df(raw, ticker, len(group))
+                if tail is None or tail.dropna(how="all").empty:
+                    continue  # nothing new (e.g. delisted); the data quality check reports staleness
+                tail = tail.dropna(how="all")
+                if self.is_adjusted(stored[ticker], tail):
+                    print(f"Price store: {ticker} history was adjusted retroactively; re-fetching it.")
+                    invalidated.add(ticker)
+                    refetch.append(ticker)
+                    self.last_update["adjusted"] += 1
+                else:
+                    self.last_update["hit"] += 1
+                    old = stored[ticker]
+                    self._store(ticker, pd.concat([old[old.index < tail.index[0]], tail[old.columns.intersection(tail.columns)]]))
+
+        if refetch:
+            raw = self.fetch(refetch, period=self.period)
+            for ticker in refetch:
+                df = extract_ticker_df(raw, ticker, len(refetch))
+                if df is None or df.dropna(how="all").empty:
+                    continue
+                self._store(ticker, df.dropna(how="all"))
+                if ticker in invalidated:
+                    self.revisions[ticker] = self.revision(ticker) + 1
+            if invalidated:
+                self._save_meta()
+
+        return invalidated
+
+    def load(self, tickers: list[str]) -> pd.DataFrame:
+        """
+        Stored bars of `tickers` within the store's period, shaped like a multi-ticker
+        yfinance download (ticker, field) so it can replace fetch_stock_data's output.
+        """
+        start = period_start(self.period)
+        frames = {}
+        for ticker in tickers:
+            df = self.history(ticker)
+            if df is None:
+                continue
+            frames[ticker] = df[df.index >= start] if start is not None else df
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def refresh(self, tickers: list[str]) -> pd.DataFrame:
+        """Update then load: the incremental replacement for fetch_stock_data(tickers)."""
+        self.update(tickers)
+        return self.load(tickers)
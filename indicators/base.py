@@ -1,14 +1,306 @@
+import copy
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+import numpy as np
 import pandas as pd
 
+
+OPERATORS = {
+    "<": np.less,
+    ">": np.greater,
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+}
+
+
+def compare(values: pd.Series, operator: str, threshold) -> pd.Series:
+    """
+    Vectorized comparison of a per-ticker Series against a scalar or per-ticker threshold.
+    NaN never matches. Unknown operators fall back to '>' like the original if/else evaluation did.
+    """
+    op = OPERATORS.get(operator, np.greater)
+    if isinstance(threshold, pd.Series):
+        threshold = threshold.reindex(values.index).to_numpy(dtype=float)
+    return pd.Series(op(values.to_numpy(dtype=float), threshold), index=values.index)
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """
+    Declarative description of one editable condition field.
+    kind: "float", "int", "choice", "ticker" (symbol text input) or "static" (display-only text, no input).
+    The UI renders these generically, so an indicator never needs app.py changes.
+    """
+    name: str
+    label: str
+    kind: str = "float"
+    default: Any = None
+    choices: tuple = ()
+    choice_labels: dict = field(default_factory=dict)
+    min_value: float | None = None
+    max_value: float | None = None
+    step: float | None = None
+
+    def coerce(self, raw):
+        if raw is None:
+            raw = self.default
+        if self.kind == "int":
+            return int(raw)
+        if self.kind == "float":
+            return float(raw)
+        return raw
+
+
+COMPARE_OPERATORS = ParamSpec("operator", "Op", kind="choice", default="<", choices=("<", ">"))
+
+
+PRICE_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class IndicatorContext:
+    """
+    Shared compute context for one analysis run.
+    Holds the price matrices (rows = dates, columns = tickers) for every OHLCV field
+    that was fetched and memoizes every indicator computed on them, so e.g. EMA(200)
+    is computed once for all tickers no matter how many conditions reference it.
+    """
+
+    def __init__(self, close: pd.DataFrame, fields: dict[str, pd.DataFrame] | None = None,
+                 categories: dict[str, str] | None = None):
+        self.close = close
+        # ticker -> category, used by cross-sectional conditions ranking within a category
+        self.categories = categories or {}
+        self.fields = {"Close": close}
+        for field_name, matrix in (fields or {}).items():
+            if field_name != "Close":
+                self.fields[field_name] = matrix.reindex(index=close.index, columns=close.columns)
+        self._cache: dict[tuple, pd.DataFrame] = {}
+        # Row treated as the latest bar (None = the last row); see at()
+        self.position: int | None = None
+
+    def category_labels(self) -> list[str]:
+        """Category of each ticker column, in column order."""
+        return [self.categories.get(t, "Other") for t in self.tickers]
+
+    def field(self, name: str) -> pd.DataFrame:
+        """Return the dates x tickers matrix for an OHLCV field. Raises KeyError if it was not fetched."""
+        if name not in self.fields:
+            raise KeyError(f"Price field '{name}' is not available in this run")
+        return self.fields[name]
+
+    @property
+    def tickers(self) -> pd.Index:
+        return self.close.columns
+
+    def get(self, indicator: "Indicator") -> pd.DataFrame:
+        """Return the indicator's output matrix, computing it at most once per context."""
+        key = indicator.cache_key
+        if key not in self._cache:
+            self._cache[key] = indicator.compute(self)
+        return self._cache[key]
+
+    def at(self, position: int) -> "IndicatorContext":
+        """
+        View of this context whose latest bar is row `position`. It shares the indicator cache:
+        indicators only use bars up to each row, so replaying history bar by bar computes each
+        indicator once and every step just reads one row per ticker.
+        """
+        view = copy.copy(self)
+        view.position = position
+        return view
+
+    def latest(self, indicator: "Indicator") -> pd.Series:
+        """Return the indicator's value on the latest bar for every ticker."""
+        values = self.get(indicator)
+        if values.empty:
+            return pd.Series(np.nan, index=self.tickers, dtype=float)
+        return values.iloc[-1 if self.position is None else self.position]
+
+    def latest_close(self) -> pd.Series:
+        if self.close.empty:
+            return pd.Series(np.nan, index=self.tickers, dtype=float)
+        return self.close.iloc[-1 if self.position is None else self.position]
+
+
+class LiveContext:
+    """
+    A provisional latest bar (e.g. an intraday quote snapshot) on top of a finished
+    IndicatorContext, the base. Only each indicator's value on that bar is produced, by
+    Indicator.update(): recursive indicators step once from their value on the base's
+    last row, window indicators recompute over a short tail of the base plus the bar.
+    A cycle therefore costs O(tickers) however long the history is, while the base
+    computes each indicator over the full history once and keeps it cached.
+
+    bar: tickers x OHLCV fields (missing tickers or fields are NaN).
+    state: cache for derived state that depends only on the base (e.g. Wilder averages);
+    pass the same dict for every bar on the same base to build it once.
+    Provides the subset of the IndicatorContext API that evaluation uses.
+    """
+
+    def __init__(self, base: IndicatorContext, bar: pd.DataFrame, timestamp: pd.Timestamp,
+                 state: dict | None = None):
+        self.base = base
+        self.bar = bar.reindex(index=base.tickers, columns=list(base.fields))
+        self.timestamp = pd.Timestamp(timestamp)
+        self.categories = base.categories
+        self.state = state if state is not None else {}
+        self._latest: dict[tuple, pd.Series] = {}
+        self._tails: dict[int, IndicatorContext] = {}
+
+    @property
+    def tickers(self) -> pd.Index:
+        return self.base.tickers
+
+    @property
+    def close(self) -> pd.DataFrame:
+        """The provisional bar's Close as a one-row matrix."""
+        return self.bar[["Close"]].T.set_axis([self.timestamp])
+
+    def category_labels(self) -> list[str]:
+        return self.base.category_labels()
+
+    def bar_field(self, name: str) -> pd.Series:
+        """The provisional bar's value of an OHLCV field for every ticker."""
+        if name not in self.bar.columns:
+            raise KeyError(f"Price field '{name}' is not available in this run")
+        return self.bar[name]
+
+    def latest_close(self) -> pd.Series:
+        return self.bar["Close"]
+
+    def previous(self, indicator: "Indicator") -> pd.Series:
+        """The indicator's value on the base's last bar (its state before the provisional bar)."""
+        return self.base.latest(indicator)
+
+    def cached_state(self, key: tuple, build):
+        """Base-derived state under `key`, built with build(base) on first use."""
+        if key not in self.state:
+            self.state[key] = build(self.base)
+        return self.state[key]
+
+    def tail(self, rows: int) -> IndicatorContext:
+        """A context over the base's last `rows` bars followed by the provisional bar."""
+        if rows not in self._tails:
+            fields = {
+                name: pd.concat([matrix.iloc[-rows:], self.bar[[name]].T.set_axis([self.timestamp])])
+                for name, matrix in self.base.fields.items()
+            }
+            self._tails[rows] = IndicatorContext(fields["Close"], fields, self.categories)
+        return self._tails[rows]
+
+    def latest(self, indicator: "Indicator") -> pd.Series:
+        """Return the indicator's value on the provisional bar for every ticker."""
+        key = indicator.cache_key
+        if key not in self._latest:
+            self._latest[key] = indicator.update(self)
+        return self._latest[key]
+
+
 class Indicator(ABC):
+    """
+    Base class for all indicators.
+
+    Subclasses registered with `indicators.registry.register_indicator` become
+    condition types: the class attributes below describe how the condition is
+    edited (period/operator/value/params), how its stats are ordered in tables,
+    and `evaluate` turns the batch output into a per-ticker pass/fail Series.
+    """
+
+    # Condition type name stored in config.json ("indicator" field). Empty = not a condition type.
+    key: str = ""
+    period_spec: ParamSpec | None = None
+    operator_spec: ParamSpec = COMPARE_OPERATORS
+    value_spec: ParamSpec | None = ParamSpec("value", "Val", kind="float", default=30)
+    param_specs: tuple[ParamSpec, ...] = ()
+    # Stat column prefixes this indicator produces, and their position in tables (lower = further left).
+    stat_prefixes: tuple[str, ...] = ()
+    stat_rank: int = 100
+
+    @classmethod
+    def from_condition(cls, cond: dict) -> "Indicator":
+        """Build an instance from a condition dict using the declared param specs."""
+        kwargs = {}
+        if cls.period_spec is not None:
+            kwargs["period"] = cls.period_spec.coerce(cond.get("period"))
+        for spec in cls.param_specs:
+            kwargs[spec.name] = spec.coerce(cond.get(spec.name))
+        return cls(**kwargs)
+
+    @classmethod
+    def default_condition(cls) -> dict:
+        """A condition dict of this type with every editable field at its declared default."""
+        cond = {"indicator": cls.key}
+        specs = (cls.period_spec, cls.operator_spec, cls.value_spec) + tuple(cls.param_specs)
+        for spec in specs:
+            if spec is not None and spec.kind != "static":
+                cond[spec.name] = spec.default
+        return cond
+
+    @property
+    def cache_key(self) -> tuple:
+        """Identity of this computation inside an IndicatorContext."""
+        params = {k: v for k, v in vars(self).items() if not isinstance(v, Indicator)}
+        return (type(self).__name__, tuple(sorted(params.items())))
+
+    @property
+    def lookback(self) -> int:
+        """Bars of history needed for a meaningful latest value: the period plus the prior bar."""
+        return getattr(self, "period", 1) + 1
+
     @abstractmethod
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Vectorized computation over all tickers; returns a dates x tickers frame."""
+        pass
+
+    def update(self, live: LiveContext) -> pd.Series:
+        """
+        Value on a LiveContext's provisional bar. The default recomputes over the last
+        `lookback` bars of the base plus that bar, which is exact for window-based
+        indicators; those that depend on the whole history (EMA-style recursions, run
+        lengths) override it to step from their previous value instead.
+        """
+        return live.tail(self.lookback).latest(self)
+
     def calculate(self, series: pd.Series) -> pd.Series:
         """Calculate the indicator for the given series."""
-        pass
+        ctx = IndicatorContext(series.to_frame())
+        return ctx.get(self).iloc[:, 0].rename(series.name)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value) -> tuple[pd.Series, str, dict[str, pd.Series]]:
+        """
+        Evaluate this condition for every ticker on the latest bar.
+        Returns (met, message, stats) where met and each stats entry are indexed by ticker.
+        """
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        met = compare(current, operator, threshold)
+        label = self.stat_prefixes[0]
+        return met, f"{label} {operator} {threshold:g}", {label: current}
 
     @property
     @abstractmethod
     def name(self) -> str:
         """Return the display name of the indicator."""
         pass
+
+
+class BarCountIndicator(Indicator):
+    """
+    Valid Close bars per ticker up to each bar. Not a condition type: the evaluator uses
+    it to skip a condition for tickers that do not yet have the condition's lookback.
+    """
+
+    @property
+    def name(self) -> str:
+        return "Bars"
+
+    @property
+    def lookback(self) -> int:
+        return 1
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        return ctx.close.notna().cumsum()
+
+    def update(self, live: LiveContext) -> pd.Series:
+        return live.previous(self) + live.latest_close().notna()
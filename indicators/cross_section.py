@@ -0,0 +1,105 @@
+import pandas as pd
+from .base import Indicator, IndicatorContext, LiveContext, ParamSpec
+from .registry import register_indicator, get_indicator_class
+
+# Indicators whose output is a single comparable number per ticker and bar
+RANKABLE_SOURCES = ("RSI", "RCI", "Return %", "Relative Volume", "ATR %", "Gap %", "MACD", "Bollinger %B")
+
+
+@register_indicator
+class CrossSectionalRankIndicator(Indicator):
+    """
+    Ranks another indicator's value across tickers on every bar, either over the whole
+    universe or within each ticker's category (ticker_categories in config.json).
+    One vectorized rank over the dates x tickers matrix replaces any per-ticker loop.
+    """
+
+    key = "Cross-Sectional Rank"
+    period_spec = ParamSpec("period", "Period", kind="int", default=14, min_value=1)
+    operator_spec = ParamSpec(
+        "operator", "Rank", kind="choice", default="bottom %",
+        choices=("bottom %", "top %", "bottom N", "top N"),
+    )
+    value_spec = ParamSpec("value", "Val", kind="float", default=10.0, min_value=1.0, max_value=100.0, step=1.0)
+    param_specs = (
+        ParamSpec("source", "Rank by", kind="choice", default="RSI", choices=RANKABLE_SOURCES),
+        ParamSpec("scope", "Within", kind="choice", default="Universe", choices=("Universe", "Category")),
+    )
+    stat_rank = 95
+
+    def __init__(self, period=14, source="RSI", scope="Universe", direction="bottom"):
+        self.period = period
+        self.source = source
+        self.scope = scope
+        # "bottom" ranks the lowest value as 1, "top" the highest
+        self.direction = direction
+
+    @classmethod
+    def from_condition(cls, cond: dict) -> "Indicator":
+        indicator = super().from_condition(cond)
+        indicator.direction = "top" if str(cond.get("operator", "")).startswith("top") else "bottom"
+        return indicator
+
+    @property
+    def name(self) -> str:
+        return f"{self.source} {self.direction} rank in {self.scope.lower()}"
+
+    @property
+    def source_indicator(self) -> Indicator:
+        source_cls = get_indicator_class(self.source)
+        if source_cls is None:
+            raise ValueError(f"Unknown rank source '{self.source}'")
+        return source_cls.from_condition({"period": self.period})
+
+    @property
+    def lookback(self) -> int:
+        try:
+            return self.source_indicator.lookback
+        except ValueError:
+            return super().lookback
+
+    @property
+    def source_label(self) -> str:
+        source_cls = get_indicator_class(self.source)
+        if source_cls is not None and source_cls.period_spec is None:
+            return self.source
+        return f"{self.source}({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Rank of each ticker per bar (1 = most extreme in `direction`, ties share the best rank)."""
+        return self._rank(ctx.get(self.source_indicator), ctx.category_labels())
+
+    def update(self, live: LiveContext) -> pd.Series:
+        """Rank of the source indicator's values on the provisional bar."""
+        return self._rank(live.latest(self.source_indicator).to_frame().T, live.category_labels()).iloc[0]
+
+    def _rank(self, values: pd.DataFrame, category_labels: list[str]) -> pd.DataFrame:
+        ascending = self.direction == "bottom"
+        if self.scope == "Category":
+            return values.T.groupby(category_labels).rank(ascending=ascending, method="min").T
+        return values.rank(axis=1, ascending=ascending, method="min")
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        rank = ctx.latest(self)
+        source_values = ctx.latest(self.source_indicator)
+        present = source_values.notna()
+        if self.scope == "Category":
+            population = present.groupby(ctx.category_labels()).transform("sum")
+        else:
+            population = pd.Series(present.sum(), index=present.index)
+
+        threshold = float(value)
+        if operator.endswith("%"):
+            met = (rank / population * 100) <= threshold
+            limit = f"{threshold:g}%"
+        else:
+            met = rank <= threshold
+            limit = f"{int(threshold)}"
+
+        scope = "universe" if self.scope == "Universe" else "category"
+        msg = f"{self.source_label} in {self.direction} {limit} of {scope}"
+        stats = {
+            self.source_label: source_values.round(2),
+            f"{self.source_label} Rank": rank.astype("Int64"),
+        }
+        return met.fillna(False), msg, stats
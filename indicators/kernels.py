@@ -0,0 +1,238 @@
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Compute backends for the exponential recursions behind EMA, RSI, ATR and MACD.
+# "pandas" is the reference (DataFrame.ewm); "numpy" steps through the rows once, updating
+# every ticker column together with no intermediate frames; "numba" compiles the same
+# recursion to a scalar loop when numba is installed. "auto" picks numba if available,
+# else pandas. All reproduce ewm(...).mean() (ignore_na=False), NaN handling and
+# min_periods included, up to float rounding.
+BACKENDS = ("auto", "pandas", "numpy", "numba")
+
+_backend = os.getenv("STOCKS_COMPUTE_BACKEND", "auto")
+
+
+def set_backend(name: str):
+    """Select the compute backend ("auto", "pandas", "numpy" or "numba")."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown compute backend '{name}'; expected one of {', '.join(BACKENDS)}")
+    if name == "numba" and numba is None:
+        raise ValueError("The numba backend needs the optional 'numba' package")
+    _backend = name
+
+
+def get_backend() -> str:
+    """The backend actually in use, with "auto" resolved."""
+    if _backend == "auto" or (_backend == "numba" and numba is None):
+        return "numba" if numba is not None else "pandas"
+    return _backend
+
+
+def ewm_alpha(span=None, com=None, alpha=None) -> float:
+    """Smoothing factor from exactly one of pandas' span / com / alpha parameters."""
+    if span is not None:
+        return 2.0 / (span + 1.0)
+    if com is not None:
+        return 1.0 / (com + 1.0)
+    return float(alpha)
+
+
+# --- NumPy kernels: one pass over the rows, all tickers per step ---
+
+def _ewm_mean_numpy(values: np.ndarray, alpha: float, adjust: bool, min_periods: int) -> np.ndarray:
+    out = np.empty_like(values)
+    new_wt = 1.0 if adjust else alpha
+    decay = 1.0 - alpha
+    weighted = np.full(values.shape[1], np.nan)
+    old_wt = np.ones(values.shape[1])
+    nobs = np.zeros(values.shape[1], dtype=np.int64)
+    minp = max(min_periods, 1)
+
+    if values.shape[0] and not np.isnan(values).any():
+        # Common case, no gaps: every column shares the same weights, so each row is one fused update
+        weighted = values[0].copy()
+        out[0] = weighted if minp <= 1 else np.nan
+        wt = 1.0
+        for i in range(1, values.shape[0]):
+            wt *= decay
+            weighted = (wt * weighted + new_wt * values[i]) / (wt + new_wt)
+            wt = wt + new_wt if adjust else 1.0
+            out[i] = weighted if i + 1 >= minp else np.nan
+        return out
+
+    with np.errstate(invalid="ignore"):
+        for i in range(values.shape[0]):
+            cur = values[i]
+            is_obs = cur == cur
+            nobs += is_obs
+            started = weighted == weighted
+            old_wt = np.where(started, old_wt * decay, old_wt)
+            step = started & is_obs
+            blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+            weighted = np.where(step, blended, np.where(~started & is_obs, cur, weighted))
+            if adjust:
+                old_wt = np.where(step, old_wt + new_wt, old_wt)
+            else:
+                old_wt = np.where(step, 1.0, old_wt)
+            out[i] = np.where(nobs >= minp, weighted, np.nan)
+    return out
+
+
+def _wilder_numpy(close: np.ndarray, period: int, out: np.ndarray | None = None):
+    # Wilder averages as ewm(com=period - 1, min_periods=period) with adjust=True, fused:
+    # gains and losses have no NaNs (a missing delta counts as 0), so they share one weight.
+    # Fills `out` with the RSI if given; returns the final (avg_gain, avg_loss, old_wt) state.
+    n_rows, n_cols = close.shape
+    decay = 1.0 - 1.0 / period
+    avg_gain = np.zeros(n_cols)
+    avg_loss = np.zeros(n_cols)
+    old_wt = 1.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(1, n_rows):
+            delta = close[i] - close[i - 1]
+            gain = np.where(delta > 0, delta, 0.0)
+            loss = np.where(delta < 0, -delta, 0.0)
+            old_wt *= decay
+            avg_gain = (old_wt * avg_gain + gain) / (old_wt + 1.0)
+            avg_loss = (old_wt * avg_loss + loss) / (old_wt + 1.0)
+            old_wt += 1.0
+            if out is not None and i + 1 >= period:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return avg_gain, avg_loss, old_wt
+
+
+def _rsi_numpy(close: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(close.shape, np.nan)
+    _wilder_numpy(close, period, out)
+    return out
+
+
+# --- Numba kernels: the same recursions as scalar loops, compiled on first use ---
+
+def _ewm_mean_loop(values, alpha, adjust, min_periods):
+    n_rows, n_cols = values.shape
+    out = np.empty_like(values)
+    new_wt = 1.0 if adjust else alpha
+    decay = 1.0 - alpha
+    minp = max(min_periods, 1)
+    for j in range(n_cols):
+        weighted = np.nan
+        old_wt = 1.0
+        nobs = 0
+        for i in range(n_rows):
+            cur = values[i, j]
+            is_obs = cur == cur
+            if is_obs:
+                nobs += 1
+            if weighted == weighted:
+                old_wt *= decay
+                if is_obs:
+                    if weighted != cur:
+                        weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                    old_wt = old_wt + new_wt if adjust else 1.0
+            elif is_obs:
+                weighted = cur
+            out[i, j] = weighted if nobs >= minp else np.nan
+    return out
+
+
+def _rsi_loop(close, period):
+    n_rows, n_cols = close.shape
+    out = np.full((n_rows, n_cols), np.nan)
+    decay = 1.0 - 1.0 / period
+    for j in range(n_cols):
+        avg_gain = 0.0
+        avg_loss = 0.0
+        old_wt = 1.0
+        for i in range(1, n_rows):
+            delta = close[i, j] - close[i - 1, j]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            old_wt *= decay
+            avg_gain = (old_wt * avg_gain + gain) / (old_wt + 1.0)
+            avg_loss = (old_wt * avg_loss + loss) / (old_wt + 1.0)
+            old_wt += 1.0
+            if i + 1 >= period:
+                out[i, j] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+if numba is not None:
+    # error_model="numpy": x / 0 gives inf/nan like NumPy instead of raising
+    _ewm_mean_numba = numba.njit(cache=True, error_model="numpy")(_ewm_mean_loop)
+    _rsi_numba = numba.njit(cache=True, error_model="numpy")(_rsi_loop)
+
+
+# --- Public entry points, dispatching on the active backend ---
+
+def ewm_mean(frame: pd.DataFrame, span=None, com=None, alpha=None, adjust: bool = True,
+             min_periods: int = 0) -> pd.DataFrame:
+    """Column-wise exponentially weighted mean, equivalent to frame.ewm(...).mean()."""
+    backend = get_backend()
+    if backend == "pandas":
+        return frame.ewm(span=span, com=com, alpha=alpha, adjust=adjust, min_periods=min_periods).mean()
+
+    a = ewm_alpha(span, com, alpha)
+    values = frame.to_numpy(dtype=float)
+    if backend == "numba":
+        out = _ewm_mean_numba(values, a, adjust, min_periods)
+    else:
+        out = _ewm_mean_numpy(values, a, adjust, min_periods)
+    return pd.DataFrame(out, index=frame.index, columns=frame.columns)
+
+
+def rsi(close: pd.DataFrame, period: int) -> pd.DataFrame:
+    """RSI with Wilder smoothing for every column, as one fused recursion (no intermediate frames)."""
+    backend = get_backend()
+    if backend == "pandas":
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        avg_gain = gain.ewm(com=period - 1, min_periods=period).mean()
+        avg_loss = loss.ewm(com=period - 1, min_periods=period).mean()
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    values = close.to_numpy(dtype=float)
+    if backend == "numba":
+        out = _rsi_numba(values, period)
+    else:
+        out = _rsi_numpy(values, period)
+    return pd.DataFrame(out, index=close.index, columns=close.columns)
+
+
+# --- One-bar steps, for a provisional latest bar on top of finished history ---
+
+def ewm_step(previous: pd.Series, value: pd.Series, span=None, com=None, alpha=None) -> pd.Series:
+    """
+    The next value of an adjust=False ewm_mean, from its value on the previous bar.
+    Where there is no previous value the new one starts the average; a missing new value
+    carries the previous one forward (exact as long as the previous bar was observed).
+    """
+    a = ewm_alpha(span, com, alpha)
+    stepped = previous + a * (value - previous)
+    return stepped.where(previous.notna(), value).where(value.notna(), previous)
+
+
+def wilder_state(close: pd.DataFrame, period: int) -> tuple[pd.Series, pd.Series, float]:
+    """Average gain, average loss and accumulated weight of rsi(close, period) after the last row."""
+    avg_gain, avg_loss, old_wt = _wilder_numpy(close.to_numpy(dtype=float), period)
+    return pd.Series(avg_gain, index=close.columns), pd.Series(avg_loss, index=close.columns), old_wt
+
+
+def rsi_step(state: tuple[pd.Series, pd.Series, float], previous_close: pd.Series, close: pd.Series,
+             period: int) -> pd.Series:
+    """RSI on one more bar, from wilder_state() of the history before it and that history's last close."""
+    avg_gain, avg_loss, old_wt = state
+    delta = close - previous_close
+    old_wt *= 1.0 - 1.0 / period
+    avg_gain = (old_wt * avg_gain + delta.where(delta > 0, 0.0)) / (old_wt + 1.0)
+    avg_loss = (old_wt * avg_loss - delta.where(delta < 0, 0.0)) / (old_wt + 1.0)
+    return 100 - (100 / (1 + avg_gain / avg_loss))
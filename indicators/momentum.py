@@ -1,8 +1,20 @@
 import pandas as pd
 import numpy as np
-from .base import Indicator
+from numpy.lib.stride_tricks import sliding_window_view
+from . import kernels
+from .base import Indicator, IndicatorContext, LiveContext, ParamSpec, compare
+from .registry import register_indicator
 
+OSCILLATOR_PERIODS = ParamSpec("period", "Period", kind="int", default=14, choices=(9, 14, 21, 30, 50))
+
+
+@register_indicator
 class RSIIndicator(Indicator):
+    key = "RSI"
+    period_spec = OSCILLATOR_PERIODS
+    stat_prefixes = ("RSI",)
+    stat_rank = 10
+
     def __init__(self, period=14, low_threshold=25):
         self.period = period
         self.low_threshold = low_threshold
@@ -11,35 +23,22 @@ class RSIIndicator(Indicator):
     def name(self) -> str:
         return f"RSI ({self.period})"
 
-    def calculate(self, series: pd.Series) -> pd.Series:
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        # Use classic Wilder's smoothing if preferred, but simple rolling is efficiently close for this purpose
-        # For more accuracy with Wilder's:
-        # gain = delta.where(delta > 0, 0)
-        # loss = -delta.where(delta < 0, 0)
-        # avg_gain = gain.ewm(alpha=1/self.period, adjust=False).mean()
-        # avg_loss = loss.ewm(alpha=1/self.period, adjust=False).mean()
-        # rs = avg_gain / avg_loss
-        # rsi = 100 - (100 / (1 + rs))
-        
-        # Using Wilder's smoothing as it is standard for RSI
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.ewm(com=self.period - 1, min_periods=self.period).mean()
-        avg_loss = loss.ewm(com=self.period - 1, min_periods=self.period).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        # Wilder's smoothing, applied to every ticker column at once
+        return kernels.rsi(ctx.close, self.period)
+
+    def update(self, live: LiveContext) -> pd.Series:
+        state = live.cached_state(("wilder", self.period), lambda base: kernels.wilder_state(base.close, self.period))
+        return kernels.rsi_step(state, live.base.latest_close(), live.latest_close(), self.period)
 
+
+@register_indicator
 class RCIIndicator(Indicator):
+    key = "RCI"
+    period_spec = OSCILLATOR_PERIODS
+    stat_prefixes = ("RCI",)
+    stat_rank = 20
+
     def __init__(self, period=9, low_threshold=-80):
         self.period = period
         self.low_threshold = low_threshold
@@ -47,19 +46,95 @@ class RCIIndicator(Indicator):
     @property
     def name(self) -> str:
         return f"RCI ({self.period})"
-    
-    def calculate(self, series: pd.Series) -> pd.Series:
-        # RCI is Rank Correlation Index (Spearman correlation with time)
-        # We need a rolling Spearman correlation
-        
-        def rolling_spearman(slice_series):
-            n = len(slice_series)
-            time_rank = np.arange(1, n + 1)
-            price_rank = slice_series.rank().values
-            
-            d_sq = np.sum((time_rank - price_rank) ** 2)
-            rci = (1 - (6 * d_sq) / (n * (n**2 - 1))) * 100
-            return rci
-
-        # Rolling apply is slow, but RCI is typically done on small window (9)
-        return series.rolling(window=self.period).apply(rolling_spearman, raw=False)
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        # RCI is Rank Correlation Index (Spearman correlation with time).
+        # Instead of a Python callback per window, rank every window of a ticker at once:
+        # average rank of x_i = #(x_j < x_i) + (#(x_j == x_i) + 1) / 2, which matches Series.rank().
+        n = self.period
+        values = ctx.close.to_numpy(dtype=float)
+        out = np.full(values.shape, np.nan)
+        time_rank = np.arange(1, n + 1)
+
+        if len(values) >= n:
+            for col in range(values.shape[1]):
+                windows = sliding_window_view(values[:, col], n)
+                pairs_a = windows[:, :, None]
+                pairs_b = windows[:, None, :]
+                price_rank = (pairs_a > pairs_b).sum(axis=2) + ((pairs_a == pairs_b).sum(axis=2) + 1) / 2
+
+                d_sq = ((time_rank - price_rank) ** 2).sum(axis=1)
+                rci = (1 - (6 * d_sq) / (n * (n**2 - 1))) * 100
+                rci[np.isnan(windows).any(axis=1)] = np.nan
+                out[n - 1:, col] = rci
+
+        return pd.DataFrame(out, index=ctx.close.index, columns=ctx.close.columns)
+
+
+@register_indicator
+class MACDIndicator(Indicator):
+    key = "MACD"
+    value_spec = ParamSpec("value", "Hist", kind="float", default=0.0, step=0.1)
+    param_specs = (
+        ParamSpec("fast", "Fast", kind="int", default=12, min_value=2, max_value=100),
+        ParamSpec("slow", "Slow", kind="int", default=26, min_value=3, max_value=200),
+        ParamSpec("signal", "Signal", kind="int", default=9, min_value=2, max_value=50),
+    )
+    stat_prefixes = ("MACD Hist",)
+    stat_rank = 50
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+
+    @property
+    def name(self) -> str:
+        return f"MACD ({self.fast},{self.slow},{self.signal})"
+
+    @property
+    def lookback(self) -> int:
+        return self.slow + self.signal
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """MACD histogram: (EMA fast - EMA slow) minus its signal EMA."""
+        from .trend import EMAIndicator
+
+        macd = ctx.get(EMAIndicator(self.fast)) - ctx.get(EMAIndicator(self.slow))
+        signal = kernels.ewm_mean(macd, span=self.signal, adjust=False)
+        return macd - signal
+
+    def update(self, live: LiveContext) -> pd.Series:
+        from .trend import EMAIndicator
+
+        fast, slow = EMAIndicator(self.fast), EMAIndicator(self.slow)
+        previous_macd = live.previous(fast) - live.previous(slow)
+        previous_signal = previous_macd - live.previous(self)
+        macd = live.latest(fast) - live.latest(slow)
+        return macd - kernels.ewm_step(previous_signal, macd, span=self.signal)
+
+
+@register_indicator
+class ReturnIndicator(Indicator):
+    key = "Return %"
+    period_spec = ParamSpec("period", "Period", kind="int", default=20, choices=(5, 20, 60, 120, 250))
+    operator_spec = ParamSpec("operator", "Op", kind="choice", default=">", choices=(">", "<"))
+    value_spec = ParamSpec("value", "%", kind="float", default=0.0, step=1.0)
+    stat_prefixes = ("Ret%(",)
+    stat_rank = 55
+
+    def __init__(self, period=20):
+        self.period = period
+
+    @property
+    def name(self) -> str:
+        return f"Return % ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        return ctx.close.pct_change(periods=self.period, fill_method=None) * 100
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        label = f"Ret%({self.period})"
+        return compare(current, operator, threshold), f"{label} {operator} {threshold:g}", {label: current}
@@ -0,0 +1,57 @@
+import importlib
+from .base import Indicator
+
+# Modules whose indicators register themselves on import.
+BUILTIN_MODULES = (
+    "indicators.momentum",
+    "indicators.trend",
+    "indicators.volume",
+    "indicators.volatility",
+    "indicators.cross_section",
+    "indicators.relative_strength",
+)
+
+_REGISTRY: dict[str, type[Indicator]] = {}
+_builtins_loaded = False
+
+
+def register_indicator(cls: type[Indicator]) -> type[Indicator]:
+    """Class decorator: make an Indicator subclass available as a condition type under `cls.key`."""
+    if not cls.key:
+        raise ValueError(f"{cls.__name__} must define a non-empty 'key' to be registered")
+    _REGISTRY[cls.key] = cls
+    return cls
+
+
+def _load_builtins():
+    global _builtins_loaded
+    if not _builtins_loaded:
+        _builtins_loaded = True
+        for module in BUILTIN_MODULES:
+            importlib.import_module(module)
+
+
+def get_indicator_class(key: str) -> type[Indicator] | None:
+    """Look up the registered indicator class for a condition's 'indicator' value."""
+    _load_builtins()
+    return _REGISTRY.get(key)
+
+
+def list_indicator_keys() -> list[str]:
+    """All registered condition types, in registration order."""
+    _load_builtins()
+    return list(_REGISTRY.keys())
+
+
+def stat_column_sort_key(column: str) -> tuple[int, str]:
+    """
+    Sort key for a stats column, based on which indicator produces it.
+    The longest matching prefix wins, so 'Days>EMA(7)' is not mistaken for an EMA column.
+    """
+    _load_builtins()
+    best_rank, best_len = None, -1
+    for cls in _REGISTRY.values():
+        for prefix in cls.stat_prefixes:
+            if column.startswith(prefix) and len(prefix) > best_len:
+                best_rank, best_len = cls.stat_rank, len(prefix)
+    return (best_rank if best_rank is not None else 1000, column)
@@ -0,0 +1,58 @@
+import pandas as pd
+from . import kernels
+from .base import Indicator, IndicatorContext, LiveContext, ParamSpec, compare
+from .registry import register_indicator
+
+
+class BenchmarkRatioIndicator(Indicator):
+    """
+    Close of every ticker divided by the benchmark's close, as one broadcast division.
+    Not a condition type itself; cached per benchmark so all relative-strength
+    conditions in a run share a single ratio matrix.
+    """
+
+    def __init__(self, benchmark="SPY"):
+        self.benchmark = benchmark
+
+    @property
+    def name(self) -> str:
+        return f"Close / {self.benchmark}"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        if self.benchmark not in ctx.tickers:
+            raise ValueError(f"Benchmark '{self.benchmark}' is not in the ticker universe")
+        benchmark_close = ctx.close[self.benchmark]
+        return ctx.close.div(benchmark_close.where(benchmark_close > 0), axis=0)
+
+
+@register_indicator
+class RelativeStrengthIndicator(Indicator):
+    key = "Relative Strength"
+    period_spec = ParamSpec("period", "Period", kind="int", default=50, choices=(21, 50, 100, 200))
+    value_spec = ParamSpec("value", "Ratio EMA", kind="static")
+    param_specs = (ParamSpec("benchmark", "Benchmark", kind="ticker", default="SPY"),)
+    stat_prefixes = ("RS/",)
+    stat_rank = 85
+
+    def __init__(self, period=50, benchmark="SPY"):
+        self.period = period
+        self.benchmark = str(benchmark).strip().upper()
+        self.ratio_indicator = BenchmarkRatioIndicator(self.benchmark)
+
+    @property
+    def name(self) -> str:
+        return f"Relative Strength vs {self.benchmark} ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """EMA of the ticker / benchmark ratio."""
+        return kernels.ewm_mean(ctx.get(self.ratio_indicator), span=self.period, adjust=False)
+
+    def update(self, live: LiveContext) -> pd.Series:
+        return kernels.ewm_step(live.previous(self), live.latest(self.ratio_indicator), span=self.period)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        ratio = ctx.latest(self.ratio_indicator).round(4)
+        ratio_ema = ctx.latest(self).round(4)
+        label = f"RS/{self.benchmark}"
+        stats = {label: ratio, f"{label} EMA({self.period})": ratio_ema}
+        return compare(ratio, operator, ratio_ema), f"Close/{self.benchmark} {operator} EMA({self.period})", stats
@@ -1,18 +1,50 @@
 import pandas as pd
-from .base import Indicator
+from . import kernels
+from .base import Indicator, IndicatorContext, LiveContext, ParamSpec, compare
+from .registry import register_indicator
 
+EMA_PERIODS = ParamSpec("period", "Period", kind="int", default=7, choices=(7, 13, 21, 55, 100, 200))
+
+
+@register_indicator
 class EMAIndicator(Indicator):
+    key = "Price vs EMA"
+    period_spec = EMA_PERIODS
+    value_spec = ParamSpec("value", "Current EMA", kind="static")
+    stat_prefixes = ("EMA(",)
+    stat_rank = 30
+
     def __init__(self, period=200):
         self.period = period
 
     @property
     def name(self) -> str:
         return f"EMA ({self.period})"
-    
-    def calculate(self, series: pd.Series) -> pd.Series:
-        return series.ewm(span=self.period, adjust=False).mean()
 
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        return kernels.ewm_mean(ctx.close, span=self.period, adjust=False)
+
+    def update(self, live: LiveContext) -> pd.Series:
+        return kernels.ewm_step(live.previous(self), live.latest_close(), span=self.period)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        curr_ema = ctx.latest(self).round(2)
+        met = compare(ctx.latest_close(), operator, curr_ema)
+        return met, f"Price {operator} EMA({self.period})", {f"EMA({self.period})": curr_ema}
+
+
+@register_indicator
 class ApproachingEMAIndicator(Indicator):
+    key = "EMA Proximity"
+    period_spec = EMA_PERIODS
+    operator_spec = ParamSpec(
+        "operator", "Proximity", kind="choice", default="=",
+        choices=("=", ">", "<"), choice_labels={"=": "≈"},
+    )
+    value_spec = ParamSpec("value", "%", kind="float", default=3.0, min_value=0.1, max_value=100.0, step=0.5)
+    stat_prefixes = ("EMA(",)
+    stat_rank = 30
+
     def __init__(self, period=200, threshold_percent=2.0):
         self.period = period
         self.threshold_percent = threshold_percent
@@ -21,11 +53,104 @@ class ApproachingEMAIndicator(Indicator):
     @property
     def name(self) -> str:
         return f"Approaching EMA ({self.period})"
-    
-    def calculate(self, series: pd.Series) -> pd.Series:
-        ema = self.ema_indicator.calculate(series)
-        # Calculate percentage difference
-        diff_percent = ((series - ema).abs() / ema) * 100
-        # Return True if within threshold (we return series of booleans as 0/1 or just the diff for visualization)
-        # But to keep consistent with "Indicator" returning a series of values, we might want to return the Distance %
-        return diff_percent
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        ema = ctx.get(self.ema_indicator)
+        # Absolute percentage distance from the EMA, for visualization
+        return ((ctx.close - ema).abs() / ema) * 100
+
+    def update(self, live: LiveContext) -> pd.Series:
+        ema = live.latest(self.ema_indicator)
+        return ((live.latest_close() - ema).abs() / ema) * 100
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        curr_ema = ctx.latest(self.ema_indicator).round(2)
+        pct_diff = (ctx.latest_close() - curr_ema) / curr_ema * 100
+        threshold_pct = float(value)
+
+        if operator == '<':
+            met = compare(pct_diff, '<', -threshold_pct)
+            msg = f"Price < {threshold_pct:.1f}% of EMA({self.period})"
+        elif operator == '>':
+            met = compare(pct_diff, '>', threshold_pct)
+            msg = f"Price > {threshold_pct:.1f}% of EMA({self.period})"
+        else:  # Default to 'within'
+            met = compare(pct_diff.abs(), '<=', threshold_pct)
+            msg = f"Price within {threshold_pct:.1f}% of EMA({self.period})"
+
+        return met, msg, {f"EMA({self.period})": curr_ema}
+
+
+@register_indicator
+class DaysAboveEMAIndicator(Indicator):
+    key = "Days Above EMA"
+    period_spec = EMA_PERIODS
+    operator_spec = ParamSpec("operator", "Op", kind="choice", default=">=", choices=(">=", "<="))
+    value_spec = ParamSpec("value", "Days", kind="int", default=7, min_value=1, max_value=365, step=1)
+    stat_prefixes = ("Days>EMA(",)
+    stat_rank = 40
+
+    def __init__(self, period=200):
+        self.period = period
+        self.ema_indicator = EMAIndicator(period)
+
+    @property
+    def name(self) -> str:
+        return f"Days Above EMA ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Length of the current run of closes above the EMA, at every bar."""
+        above = ctx.close > ctx.get(self.ema_indicator)
+        runs = above.cumsum()
+        # Subtract the running total as of the last bar that was not above the EMA
+        return (runs - runs.where(~above).ffill().fillna(0)).astype(int)
+
+    def update(self, live: LiveContext) -> pd.Series:
+        """The run continues from the previous bar's length, or resets to 0."""
+        above = live.latest_close() > live.latest(self.ema_indicator)
+        return (live.previous(self) + 1).where(above, 0).astype(int)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        curr_ema = ctx.latest(self.ema_indicator).round(2)
+        consecutive_days = ctx.latest(self)
+        threshold_days = int(value)
+
+        if operator == '>=':
+            met = compare(consecutive_days, '>=', threshold_days)
+            msg = f"Above EMA({self.period}) >= {threshold_days}d"
+        else:  # '<='
+            met = compare(consecutive_days, '<=', threshold_days)
+            msg = f"Above EMA({self.period}) <= {threshold_days}d"
+
+        stats = {f"EMA({self.period})": curr_ema, f"Days>EMA({self.period})": consecutive_days}
+        return met, msg, stats
+
+
+@register_indicator
+class BollingerIndicator(Indicator):
+    key = "Bollinger %B"
+    period_spec = ParamSpec("period", "Period", kind="int", default=20, choices=(10, 20, 50))
+    value_spec = ParamSpec("value", "%B", kind="float", default=0.0, step=0.05)
+    param_specs = (ParamSpec("num_std", "Std Dev", kind="float", default=2.0, min_value=0.5, max_value=4.0, step=0.5),)
+    stat_prefixes = ("%B(",)
+    stat_rank = 60
+
+    def __init__(self, period=20, num_std=2.0):
+        self.period = period
+        self.num_std = num_std
+
+    @property
+    def name(self) -> str:
+        return f"Bollinger %B ({self.period}, {self.num_std:g})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """%B: 0 at the lower band, 1 at the upper band."""
+        mid = ctx.close.rolling(window=self.period).mean()
+        band = ctx.close.rolling(window=self.period).std() * self.num_std
+        return (ctx.close - (mid - band)) / (2 * band)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        label = f"%B({self.period})"
+        return compare(current, operator, threshold), f"{label} {operator} {threshold:g}", {label: current}
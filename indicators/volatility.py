@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from . import kernels
+from .base import Indicator, IndicatorContext, LiveContext, ParamSpec, compare
+from .registry import register_indicator
+
+
+@register_indicator
+class ATRIndicator(Indicator):
+    key = "ATR %"
+    period_spec = ParamSpec("period", "Period", kind="int", default=14, choices=(7, 14, 21))
+    operator_spec = ParamSpec("operator", "Op", kind="choice", default=">", choices=(">", "<"))
+    value_spec = ParamSpec("value", "% of Price", kind="float", default=3.0, min_value=0.1, max_value=100.0, step=0.5)
+    stat_prefixes = ("ATR%(",)
+    stat_rank = 80
+
+    def __init__(self, period=14):
+        self.period = period
+
+    @property
+    def name(self) -> str:
+        return f"ATR % ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Wilder-smoothed Average True Range, as a percentage of the close."""
+        high, low, close = ctx.field("High"), ctx.field("Low"), ctx.close
+        prev_close = close.shift(1)
+        # fmax ignores the missing previous close on the first bar, leaving High - Low
+        true_range = np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+        atr = kernels.ewm_mean(true_range, alpha=1 / self.period, min_periods=self.period, adjust=False)
+        return atr / close * 100
+
+    def update(self, live: LiveContext) -> pd.Series:
+        high, low, close = live.bar_field("High"), live.bar_field("Low"), live.latest_close()
+        prev_close = live.base.latest_close()
+        true_range = np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+        previous_atr = live.previous(self) * prev_close / 100
+        # Not enough bars for a first ATR yet: the full recursion is needed, so leave it undefined
+        atr = kernels.ewm_step(previous_atr, true_range, alpha=1 / self.period).where(previous_atr.notna())
+        return atr / close * 100
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        label = f"ATR%({self.period})"
+        return compare(current, operator, threshold), f"{label} {operator} {threshold:g}", {label: current}
+
+
+@register_indicator
+class GapIndicator(Indicator):
+    key = "Gap %"
+    operator_spec = ParamSpec("operator", "Op", kind="choice", default=">", choices=(">", "<"))
+    value_spec = ParamSpec("value", "%", kind="float", default=2.0, min_value=-100.0, max_value=100.0, step=0.5)
+    stat_prefixes = ("Gap%",)
+    stat_rank = 90
+
+    @property
+    def name(self) -> str:
+        return "Gap %"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Open versus the previous close, in percent (positive = gap up)."""
+        prev_close = ctx.close.shift(1)
+        return (ctx.field("Open") - prev_close) / prev_close * 100
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        return compare(current, operator, threshold), f"Gap {operator} {threshold:g}%", {"Gap%": current}
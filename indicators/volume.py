@@ -0,0 +1,62 @@
+import pandas as pd
+from .base import Indicator, IndicatorContext, ParamSpec, compare
+from .registry import register_indicator
+
+
+@register_indicator
+class RelativeVolumeIndicator(Indicator):
+    key = "Relative Volume"
+    period_spec = ParamSpec("period", "Period", kind="int", default=20, choices=(10, 20, 50))
+    operator_spec = ParamSpec("operator", "Op", kind="choice", default=">", choices=(">", "<"))
+    value_spec = ParamSpec("value", "x Avg", kind="float", default=2.0, min_value=0.1, max_value=50.0, step=0.5)
+    stat_prefixes = ("RVOL(",)
+    stat_rank = 70
+
+    def __init__(self, period=20):
+        self.period = period
+
+    @property
+    def name(self) -> str:
+        return f"Relative Volume ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Volume divided by the average volume of the previous `period` bars."""
+        volume = ctx.field("Volume")
+        # Shift so a spike is measured against the days before it, not diluted by itself
+        avg_volume = volume.rolling(window=self.period).mean().shift(1)
+        return volume / avg_volume.where(avg_volume > 0)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        current = ctx.latest(self).round(2)
+        threshold = float(value)
+        label = f"RVOL({self.period})"
+        return compare(current, operator, threshold), f"{label} {operator} {threshold:g}x", {label: current}
+
+
+@register_indicator
+class VWAPIndicator(Indicator):
+    key = "Price vs VWAP"
+    period_spec = ParamSpec("period", "Period", kind="int", default=20, choices=(5, 10, 20, 50))
+    value_spec = ParamSpec("value", "Rolling VWAP", kind="static")
+    stat_prefixes = ("VWAP(",)
+    stat_rank = 35
+
+    def __init__(self, period=20):
+        self.period = period
+
+    @property
+    def name(self) -> str:
+        return f"VWAP ({self.period})"
+
+    def compute(self, ctx: IndicatorContext) -> pd.DataFrame:
+        """Rolling volume-weighted average of the typical price (H + L + C) / 3."""
+        volume = ctx.field("Volume")
+        typical = (ctx.field("High") + ctx.field("Low") + ctx.close) / 3
+        traded = (typical * volume).rolling(window=self.period).sum()
+        total_volume = volume.rolling(window=self.period).sum()
+        return traded / total_volume.where(total_volume > 0)
+
+    def evaluate(self, ctx: IndicatorContext, operator: str, value):
+        curr_vwap = ctx.latest(self).round(2)
+        met = compare(ctx.latest_close(), operator, curr_vwap)
+        return met, f"Price {operator} VWAP({self.period})", {f"VWAP({self.period})": curr_vwap}
@@ -1,123 +1,144 @@
 import pandas as pd
-from indicators.momentum import RSIIndicator, RCIIndicator
-from indicators.trend import EMAIndicator
+from indicators.base import BarCountIndicator, Indicator, IndicatorContext
+from indicators.registry import get_indicator_class
+from logic.results import AlertResults, KEY_COLUMNS
 
-def evaluate_group(close_series: pd.Series, group_config: dict) -> tuple[bool, str, dict]:
+
+def build_condition_indicator(cond: dict) -> Indicator | None:
+    """Instantiate the registered indicator for a condition dict, or None for unknown types."""
+    cls = get_indicator_class(cond.get("indicator"))
+    if cls is None:
+        return None
+    return cls.from_condition(cond)
+
+
+def stats_row(stats: pd.DataFrame, ticker) -> dict:
+    """One ticker's stats as a dict, keeping each column's own dtype (e.g. int day counts)."""
+    return {col: stats.at[ticker, col] for col in stats.columns}
+
+
+def compile_group(group_config: dict) -> list[Indicator | None]:
+    """Instantiate the indicator of every condition in a group (None where the type is unknown or invalid)."""
+    compiled = []
+    for cond in group_config.get("conditions", []):
+        try:
+            compiled.append(build_condition_indicator(cond))
+        except Exception as e:
+            print(f"Eval error for {cond.get('indicator')}: {e}")
+            compiled.append(None)
+    return compiled
+
+
+def evaluate_group_batch(ctx: IndicatorContext, group_config: dict,
+                         indicators: list[Indicator | None] | None = None) -> tuple[pd.Series, pd.Series, pd.DataFrame]:
     """
-    Evaluates conditions and returns (is_triggered, description, stats).
-    Included stats: Price, RSI, RCI, and any EMA used in conditions.
+    Evaluates a group's conditions for every ticker in the context at once.
+    indicators: the group's precompiled conditions (see compile_group); built on the fly if omitted.
+    Returns (triggered, descriptions, stats), all indexed by ticker:
+      - triggered: bool Series
+      - descriptions: group title per ticker (OR groups list only the conditions that ticker met)
+      - stats: Price plus every stat column produced by the group's conditions
+    A condition is never met for a ticker with fewer bars than its lookback (e.g. a recent
+    listing), so a short history only blocks the conditions that need more of it.
     """
-    if close_series.empty:
-        return False, "", {}
-        
+    tickers = ctx.tickers
+    empty = (pd.Series(False, index=tickers), pd.Series("", index=tickers), pd.DataFrame(index=tickers))
+    if ctx.close.empty:
+        return empty
+
     group_name = group_config.get("name", "Unnamed Group")
     conditions = group_config.get("conditions", [])
     if not conditions:
-        return False, "", {}
-        
+        return empty
+
     logic = group_config.get("logic", "AND")
-    results = []
+    met_columns = []
     messages = []
-    stats = {"Price": round(close_series.iloc[-1], 2)} 
-    
-    current_price = close_series.iloc[-1]
-    
-    for cond in conditions:
+    stats = {"Price": ctx.latest_close().round(2)}
+
+    if indicators is None:
+        indicators = compile_group(group_config)
+    bars = ctx.latest(BarCountIndicator())
+
+    for cond, indicator in zip(conditions, indicators):
         ind_type = cond.get("indicator")
-        period = int(cond.get("period", 14))
-        operator = cond.get("operator", "<")
-        val = cond.get("value")
-        
-        met = False
-        msg = ""
         try:
-            if ind_type == "RSI":
-                rsi_series = RSIIndicator(period=period).calculate(close_series)
-                curr_rsi = round(rsi_series.iloc[-1], 2)
-                stats['RSI'] = curr_rsi
-                threshold = float(val)
-                met = (curr_rsi < threshold) if operator == "<" else (curr_rsi > threshold)
-                msg = f"RSI {operator} {int(threshold)}"
-                    
-            elif ind_type == "RCI":
-                rci_series = RCIIndicator(period=period).calculate(close_series)
-                curr_rci = round(rci_series.iloc[-1], 2)
-                stats['RCI'] = curr_rci
-                threshold = float(val)
-                met = (curr_rci < threshold) if operator == "<" else (curr_rci > threshold)
-                msg = f"RCI {operator} {int(threshold)}"
-            
-            elif ind_type == "Price vs EMA":
-                ema_series = EMAIndicator(period=period).calculate(close_series)
-                curr_ema = round(ema_series.iloc[-1], 2)
-                stats[f'EMA({period})'] = curr_ema
-                met = (current_price < curr_ema) if operator == "<" else (current_price > curr_ema)
-                msg = f"Price {operator} EMA({period})"
-            
-            elif ind_type == "EMA Proximity":
-                ema_series = EMAIndicator(period=period).calculate(close_series)
-                curr_ema = round(ema_series.iloc[-1], 2)
-                stats[f'EMA({period})'] = curr_ema
-                
-                pct_diff = (current_price - curr_ema) / curr_ema * 100
-                threshold_pct = float(val)
-
-                if operator == '<':
-                    met = pct_diff < -threshold_pct
-                    msg = f"Price < {threshold_pct:.1f}% of EMA({period})"
-                elif operator == '>':
-                    met = pct_diff > threshold_pct
-                    msg = f"Price > {threshold_pct:.1f}% of EMA({period})"
-                else: # Default to 'within'
-                    met = abs(pct_diff) <= threshold_pct
-                    msg = f"Price within {threshold_pct:.1f}% of EMA({period})"
-            
-            elif ind_type == "Days Above EMA":
-                ema_series = EMAIndicator(period=period).calculate(close_series)
-                curr_ema = round(ema_series.iloc[-1], 2)
-                stats[f'EMA({period})'] = curr_ema
-                
-                # Count consecutive days price has been above EMA (from most recent day backwards)
-                above = close_series > ema_series
-                consecutive_days = 0
-                for k in range(len(above) - 1, -1, -1):
-                    if above.iloc[k]:
-                        consecutive_days += 1
-                    else:
-                        break
-                
-                stats[f'Days>EMA({period})'] = consecutive_days
-                threshold_days = int(val)
-                
-                if operator == '>=':
-                    met = consecutive_days >= threshold_days
-                    msg = f"Above EMA({period}) >= {threshold_days}d"
-                else:  # '<='
-                    met = consecutive_days <= threshold_days
-                    msg = f"Above EMA({period}) <= {threshold_days}d"
-            
-            results.append(met)
-            if met:
-                messages.append(msg)
-                
+            if indicator is None:
+                raise ValueError(f"Unknown or invalid indicator '{ind_type}'")
+            met, msg, cond_stats = indicator.evaluate(ctx, cond.get("operator", "<"), cond.get("value"))
+            met = met.astype(bool) & (bars >= indicator.lookback)
+            stats.update(cond_stats)
         except Exception as e:
             print(f"Eval error for {ind_type}: {e}")
-            results.append(False)
-
-    is_triggered = all(results) if logic == "AND" else any(results)
-    
-    if is_triggered:
-        desc = f"[{group_name}] " + (", ".join(messages) if logic == "AND" else " || ".join(messages))
-        return True, desc, stats
-    
-    return False, "", {}
-
-# --- EXAMPLE USAGE ---
-# triggered_data = []
-# for ticker, data in stock_data_dict.items():
-#     triggered, description, stats = evaluate_group(data['close'], my_config)
-#     if triggered:
-#         stats['Ticker'] = ticker
-#         triggered_data.append(stats)
-# 
-# discord_message = f"**Alert Triggered!**\n{description}\n" + format_discord_table(triggered_data)
\ No newline at end of file
+            met, msg = pd.Series(False, index=tickers), ""
+
+        met_columns.append(met.astype(bool))
+        messages.append(msg)
+
+    met_matrix = pd.concat(met_columns, axis=1, keys=range(len(met_columns)))
+    triggered = met_matrix.all(axis=1) if logic == "AND" else met_matrix.any(axis=1)
+
+    separator = ", " if logic == "AND" else " || "
+    descriptions = pd.Series("", index=tickers)
+    for ticker in triggered.index[triggered]:
+        met_msgs = [messages[k] for k in met_matrix.columns if met_matrix.at[ticker, k]]
+        descriptions[ticker] = f"[{group_name}] " + separator.join(met_msgs)
+
+    return triggered, descriptions, pd.DataFrame(stats)
+
+
+def evaluate_groups(ctx: IndicatorContext, groups: list[dict],
+                    compiled: list[list[Indicator | None]] | None = None) -> AlertResults:
+    """
+    Evaluates every group for every ticker and collects the triggers into one columnar table.
+    Rows are ordered by ticker (universe order), then by group (config order).
+    compiled: per-group precompiled conditions, parallel to `groups` (see compile_group).
+    """
+    ticker_pos = pd.Series(range(len(ctx.tickers)), index=ctx.tickers)
+    frames = []
+    group_columns: dict[str, list[str]] = {}
+    group_rules: dict[str, str] = {}
+
+    for g_idx, group in enumerate(groups):
+        triggered, descriptions, stats = evaluate_group_batch(ctx, group, compiled[g_idx] if compiled else None)
+        hits = triggered.index[triggered]
+        if hits.empty:
+            continue
+
+        # Nullable ints so integer stats (e.g. day counts) survive rows from groups without them
+        frame = stats.loc[hits].astype(
+            {col: "Int64" for col in stats.columns if pd.api.types.is_integer_dtype(stats[col])}
+        )
+        frame.insert(0, "Group", descriptions[hits])
+        frame.insert(1, "Ticker", hits)
+        frame.insert(2, "Category", [ctx.categories.get(t, "Other") for t in hits])
+        frame["_order"] = ticker_pos[hits] * len(groups) + g_idx
+        for title in frame["Group"].unique():
+            group_columns.setdefault(title, list(stats.columns))
+            group_rules.setdefault(title, group.get("name", "Unnamed Group"))
+        frames.append(frame)
+
+    if not frames:
+        return AlertResults()
+
+    table = pd.concat(frames, ignore_index=True, sort=False)
+    table = table.sort_values("_order", kind="stable").drop(columns="_order").reset_index(drop=True)
+    table = table[KEY_COLUMNS + [c for c in table.columns if c not in KEY_COLUMNS]]
+    return AlertResults(table, group_columns, group_rules)
+
+
+def evaluate_group(close_series: pd.Series, group_config: dict) -> tuple[bool, str, dict]:
+    """
+    Evaluates conditions and returns (is_triggered, description, stats).
+    Included stats: Price, RSI, RCI, and any EMA used in conditions.
+    Single-series wrapper around evaluate_group_batch.
+    """
+    if close_series.empty:
+        return False, "", {}
+
+    ctx = IndicatorContext(close_series.to_frame(name="_"))
+    triggered, descriptions, stats = evaluate_group_batch(ctx, group_config)
+    if not triggered.iloc[0]:
+        return False, "", {}
+
+    return True, descriptions.iloc[0], stats_row(stats, stats.index[0])
@@ -0,0 +1,177 @@
+import argparse
+import time
+import pandas as pd
+from data.quotes import StubQuoteFeed, YahooQuoteFeed
+from indicators.base import IndicatorContext, LiveContext
+from logic.evaluator import evaluate_groups
+from logic.results import AlertResults
+from logic.routing import route_results
+from logic.runner import prepare_context
+from utils.discord_sender import build_result_payloads
+from utils.metrics import ALERTS, STAGE_SECONDS, start_metrics_server, timed
+from utils.notification_queue import NotificationQueue, NotificationWorker
+
+DEFAULT_POLL_SECONDS = 60
+# Per-cycle latency budget (fetch + evaluate); slower cycles are reported
+CYCLE_BUDGET_SECONDS = 1.0
+# The poller runs in its own process, so it serves its own /metrics (the app holds 9108)
+POLL_METRICS_PORT = 9109
+
+
+class PollingSession:
+    """
+    Intraday polling on top of the daily history: every cycle fetches one quote snapshot
+    for the universe, applies it as a provisional latest bar and re-evaluates the rules on
+    that bar only (see LiveContext). The finished history before the session date (the
+    base) and the indicator state derived from it are built on the first cycle of each
+    session and reused by every later cycle, so a cycle costs one row per ticker.
+
+    When the session date changes, the daily history is reloaded (load(config), by default
+    prepare_context, which refreshes the price store), so the recursions step from the
+    last completed bar rather than from wherever the history ended at startup.
+    ctx/compiled: history and rules for the first session (default: load(config)).
+    """
+
+    def __init__(self, config: dict, feed=None, ctx: IndicatorContext | None = None, compiled: list | None = None,
+                 data_issues: pd.DataFrame | None = None, load=prepare_context):
+        self.config = config
+        self.load = load
+        self.history = ctx
+        self.compiled = compiled
+        self.data_issues = data_issues
+        if ctx is None:
+            self.reload()
+        self.feed = feed if feed is not None else YahooQuoteFeed()
+        self._base: IndicatorContext | None = None
+        self._session: pd.Timestamp | None = None
+        self._state: dict = {}
+        # (rule group, ticker) pairs already reported in the current session
+        self.alerted: set[tuple[str, str]] = set()
+        self.last_timings: dict[str, float] = {}
+
+    def reload(self):
+        """Fetch the daily history again (incrementally, through the price store by default)."""
+        ctx, compiled, data_issues = self.load(self.config)
+        if ctx is None:
+            print("Polling: no history could be loaded; keeping the previous one.")
+            return
+        self.history, self.compiled, self.data_issues = ctx, compiled, data_issues
+
+    def base_for(self, session: pd.Timestamp) -> IndicatorContext:
+        """The history before `session`: a daily bar already stored for that date was provisional too."""
+        if session != self._session:
+            if self._session is not None:
+                self.reload()
+                if self.history.close.index[-1] < self._session:
+                    print(f"Polling: history still ends on {self.history.close.index[-1].date()}; "
+                          f"the {self._session.date()} session is missing from it.")
+            close = self.history.close
+            n = close.index.searchsorted(session)
+            if n == len(close.index):
+                base = self.history
+            else:
+                fields = {name: matrix.iloc[:n] for name, matrix in self.history.fields.items()}
+                base = IndicatorContext(fields["Close"], fields, self.history.categories)
+            self._base, self._session, self._state = base, session, {}
+            self.alerted = set()
+        return self._base
+
+    def poll_once(self) -> AlertResults:
+        """Fetch one snapshot and evaluate every rule group on it."""
+        timings = {}
+        with timed("poll_fetch", timings):
+            session, quotes = self.feed.snapshot(list(self.history.tickers))
+        if session is None:
+            print("Polling: no quotes received; skipping this cycle.")
+            self.last_timings = timings
+            return AlertResults(data_issues=self.data_issues)
+
+        with timed("poll_evaluate", timings):
+            live = LiveContext(self.base_for(session), quotes, session, self._state)
+            results = evaluate_groups(live, self.config.get("groups", []), self.compiled)
+        results.data_issues = self.data_issues
+        self.last_timings = timings
+        return results
+
+    def new_alerts(self, results: AlertResults) -> AlertResults:
+        """
+        Rows not yet reported this session (a ticker triggering on every cycle is sent once).
+        Keyed on the rule group, not the title: an OR group's title changes with the
+        conditions met, which would otherwise re-alert the same ticker.
+        """
+        keys = list(zip(results.table["Group"].map(results.group_rules), results.table["Ticker"]))
+        mask = pd.Series([key not in self.alerted for key in keys], index=results.table.index, dtype=bool)
+        self.alerted.update(keys)
+        return results.subset(mask)
+
+    def run(self, deliver=None, interval: float = DEFAULT_POLL_SECONDS, cycles: int | None = None):
+        """
+        Poll every `interval` seconds (forever, or `cycles` times), passing each cycle's new
+        alerts to deliver(results) when there are any.
+        """
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            start = time.perf_counter()
+            fresh = self.new_alerts(self.poll_once())
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.observe(elapsed, stage="poll")
+            ALERTS.inc(len(fresh))
+            if elapsed > CYCLE_BUDGET_SECONDS:
+                print(f"Polling: cycle took {elapsed:.2f}s (budget {CYCLE_BUDGET_SECONDS:g}s): {self.last_timings}")
+            if not fresh.empty and deliver is not None:
+                deliver(fresh)
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+
+
+def enqueue_alerts(config: dict, results: AlertResults, worker: NotificationWorker):
+    """Queue results for Discord delivery, one batch per routed destination (as the app does)."""
+    routed = route_results(results, config)
+    if not routed:
+        print("Polling: notifications skipped (No Webhook URL configured).")
+        return
+    mode = config.get("delivery_mode", "auto")
+    for _, webhook_url, subset in routed:
+        with timed("batch"):
+            payloads = build_result_payloads(subset, mode)
+        worker.queue.enqueue(webhook_url, payloads)
+    worker.notify()
+
+
+if __name__ == "__main__":
+    from utils.config import load_config
+
+    parser = argparse.ArgumentParser(description="Poll quote snapshots and evaluate the rules on the live bar.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_SECONDS, help="Seconds between snapshots")
+    parser.add_argument("--cycles", type=int, help="Stop after this many cycles (default: run until interrupted)")
+    parser.add_argument("--stub", action="store_true", help="Use the offline random-walk feed instead of Yahoo")
+    parser.add_argument("--dry-run", action="store_true", help="Print new alerts instead of queueing them")
+    parser.add_argument("--metrics-port", type=int,
+                        help=f'Port for /metrics (default: "poll_metrics_port" in config.json, else {POLL_METRICS_PORT}; 0 disables)')
+    args = parser.parse_args()
+
+    config = load_config()
+    metrics_port = args.metrics_port if args.metrics_port is not None else int(config.get("poll_metrics_port", POLL_METRICS_PORT))
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    ctx, compiled, data_issues = prepare_context(config)
+    if ctx is None:
+        raise SystemExit("Nothing to evaluate: configure tickers and rule groups first.")
+    feed = StubQuoteFeed(ctx.latest_close()) if args.stub else None
+    session = PollingSession(config, feed, ctx, compiled, data_issues)
+    worker = None if args.dry_run else NotificationWorker(NotificationQueue()).start()
+
+    def deliver(results: AlertResults):
+        if args.dry_run:
+            print(results.table.to_string(index=False))
+        else:
+            enqueue_alerts(config, results, worker)
+
+    try:
+        session.run(deliver, interval=args.interval, cycles=args.cycles)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if worker is not None:
+            worker.stop()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+from indicators.base import IndicatorContext
+from logic.evaluator import evaluate_groups
+from logic.routing import resolve_webhook, route_results
+from logic.runner import prepare_context
+from utils.discord_sender import build_result_payloads
+
+# Stand-in webhook so unrouted alerts still reach the sink when no webhook is configured
+LOCAL_WEBHOOK = "local://default"
+
+
+class LocalSink:
+    """
+    Stands in for Discord during a replay: records every request that would have been
+    sent, and appends each one as a JSON line to `path` if given.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.records: list[dict] = []
+        if path:
+            open(path, "w").close()
+
+    def send(self, bar: pd.Timestamp, destination: str, payload: dict, files: dict | None = None):
+        record = {
+            "bar": str(bar.date()),
+            "destination": destination,
+            "payload": payload,
+            "files": sorted(files) if files else [],
+            "size": len(json.dumps(payload)),
+        }
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+class ReplayReport:
+    """What a replay would have sent, and how fast it ran."""
+
+    def __init__(self, num_tickers: int, bars: list[pd.Timestamp], alerts: int, records: list[dict],
+                 warmup_seconds: float, step_seconds: list[float]):
+        self.num_tickers = num_tickers
+        self.bars = bars
+        self.alerts = alerts
+        self.records = records
+        # First step, which also computes every indicator over the whole history
+        self.warmup_seconds = warmup_seconds
+        self.step_seconds = step_seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return self.warmup_seconds + sum(self.step_seconds)
+
+    @property
+    def bars_per_second(self) -> float:
+        return len(self.step_seconds) / sum(self.step_seconds) if sum(self.step_seconds) else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"Replayed {len(self.bars)} bars x {self.num_tickers} tickers"
+            + (f" ({self.bars[0].date()} .. {self.bars[-1].date()})" if self.bars else ""),
+            f"Alerts: {self.alerts} rows, {len(self.records)} requests, "
+            f"{sum(r['size'] for r in self.records):,} payload bytes, "
+            f"{len({r['bar'] for r in self.records})} bars with notifications",
+            f"Time: {self.total_seconds:.2f}s total, warm-up {self.warmup_seconds * 1000:.0f} ms",
+        ]
+        if self.step_seconds:
+            steps_ms = np.array(self.step_seconds) * 1000
+            lines.append(
+                f"Per bar: mean {steps_ms.mean():.1f} ms, p95 {np.percentile(steps_ms, 95):.1f} ms; "
+                f"{self.bars_per_second:.0f} bars/s, {self.bars_per_second * self.num_tickers:,.0f} ticker-bars/s"
+            )
+        return "\n".join(lines)
+
+
+def replay(config: dict, months: int = 3, ctx: IndicatorContext | None = None, compiled: list | None = None,
+           sink: LocalSink | None = None, mode: str | None = None) -> ReplayReport:
+    """
+    Replay the last `months` of bars through the live pipeline (evaluate_groups -> routing ->
+    rendered tables -> batched payloads), delivering to a LocalSink instead of Discord.
+
+    Each step evaluates a view of one shared context positioned on that bar (see
+    IndicatorContext.at), so indicators are computed once and a step only reads one row per
+    ticker. ctx/compiled default to what run_analysis would fetch and build for `config`.
+    """
+    if ctx is None:
+        ctx, compiled, _ = prepare_context(config)
+    sink = sink if sink is not None else LocalSink()
+    mode = mode or config.get("delivery_mode", "auto")
+    groups = config.get("groups", [])
+    if ctx is None or not groups:
+        return ReplayReport(0, [], 0, sink.records, 0.0, [])
+
+    route_config = {**config, "webhook_url": config.get("webhook_url") or LOCAL_WEBHOOK}
+
+    def resolve_local(route: dict) -> str:
+        # Routes whose .env variable is not set here still show up under their own name
+        return resolve_webhook(route) or f"local://{route.get('name') or 'route'}"
+
+    index = ctx.close.index
+    first = index.searchsorted(index[-1] - pd.DateOffset(months=months), side="right")
+    bars = list(index[first:])
+
+    alerts = 0
+    timings = []
+    for position in range(first, len(index)):
+        start = time.perf_counter()
+        results = evaluate_groups(ctx.at(position), groups, compiled)
+        alerts += len(results)
+        for destination, _, subset in route_results(results, route_config, resolve_local):
+            for payload, files in build_result_payloads(subset, mode):
+                sink.send(index[position], destination, payload, files)
+        timings.append(time.perf_counter() - start)
+
+    warmup = timings.pop(0) if timings else 0.0
+    return ReplayReport(ctx.close.shape[1], bars, alerts, sink.records, warmup, timings)
+
+
+def format_message_stream(records: list[dict]) -> str:
+    """The replayed requests as readable text, in send order."""
+    blocks = []
+    for r in records:
+        payload = r["payload"]
+        body = payload.get("content", "")
+        if payload.get("embeds"):
+            body += f"\n[{len(payload['embeds'])} embed(s)]"
+        if r["files"]:
+            body += f"\n[attachments: {', '.join(r['files'])}]"
+        blocks.append(f"--- {r['bar']} -> {r['destination']} ({r['size']} bytes)\n{body}")
+    return "\n".join(blocks)
+
+
+if __name__ == "__main__":
+    from utils.config import load_config
+
+    parser = argparse.ArgumentParser(description="Replay past bars through the alert pipeline without sending.")
+    parser.add_argument("--months", type=int, default=3, help="How many months of bars to replay")
+    parser.add_argument("--mode", choices=["auto", "text", "embeds", "file"], help="Delivery mode (default: config)")
+    parser.add_argument("--out", help="Write every request as a JSON line to this file")
+    parser.add_argument("--show", action="store_true", help="Print the full message stream")
+    args = parser.parse_args()
+
+    report = replay(load_config(), months=args.months, sink=LocalSink(args.out), mode=args.mode)
+    if args.show:
+        print(format_message_stream(report.records))
+    print(report.summary())
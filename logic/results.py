@@ -0,0 +1,64 @@
+import pandas as pd
+
+# Fixed leading columns of every results table; indicator stat columns follow.
+KEY_COLUMNS = ["Group", "Ticker", "Category"]
+
+
+class AlertResults:
+    """
+    Columnar table of triggered alerts, one row per (group title, ticker).
+
+    Columns are Group, Ticker, Category, Price and then every stat column produced
+    by the groups' conditions, each with its own dtype (floats, nullable ints).
+    Rows are ordered the way alerts are reported: tickers in universe order, and
+    for each ticker the groups in config order. Group titles can differ per ticker
+    for OR groups, since they list only the conditions that ticker met.
+    """
+
+    def __init__(self, table: pd.DataFrame | None = None, group_columns: dict[str, list[str]] | None = None,
+                 group_rules: dict[str, str] | None = None, data_issues: pd.DataFrame | None = None):
+        self.table = table if table is not None else pd.DataFrame(columns=KEY_COLUMNS + ["Price"])
+        # Stat columns that belong to each group title, in the order the conditions produced them
+        self.group_columns = group_columns or {}
+        # Configured rule group name behind each group title
+        self.group_rules = group_rules or {}
+        # Tickers excluded before evaluation by the data quality check (see data.quality)
+        self.data_issues = data_issues if data_issues is not None else pd.DataFrame(columns=["Ticker", "Issue", "Detail"])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def empty(self) -> bool:
+        return self.table.empty
+
+    @property
+    def groups(self) -> list[str]:
+        """Group titles in order of first appearance."""
+        return list(dict.fromkeys(self.table["Group"]))
+
+    def group_table(self, group_title: str, include_category: bool = True) -> pd.DataFrame:
+        """Rows of one group title with only that group's columns: Ticker, [Category], Price, stats."""
+        rows = self.table[self.table["Group"] == group_title]
+        columns = ["Ticker"] + (["Category"] if include_category else []) + ["Price"]
+        columns += [c for c in self.group_columns.get(group_title, []) if c != "Price"]
+        return rows[columns].reset_index(drop=True)
+
+    def subset(self, mask: pd.Series) -> "AlertResults":
+        """A new AlertResults with only the rows selected by a boolean mask over `table` (same data issues)."""
+        table = self.table[mask].reset_index(drop=True)
+        titles = set(table["Group"])
+        return AlertResults(
+            table,
+            {t: cols for t, cols in self.group_columns.items() if t in titles},
+            {t: rule for t, rule in self.group_rules.items() if t in titles},
+            self.data_issues,
+        )
+
+    def to_csv(self, path=None, **kwargs):
+        """Write the full table as CSV. With no path, returns the CSV text."""
+        return self.table.to_csv(path, index=False, **kwargs)
+
+    def to_parquet(self, path=None, **kwargs):
+        """Write the full table as Parquet (needs pyarrow, which Streamlit already depends on). With no path, returns bytes."""
+        return self.table.to_parquet(path, index=False, **kwargs)
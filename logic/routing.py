@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+from logic.results import AlertResults
+
+DEFAULT_DESTINATION = "Default"
+
+
+def resolve_webhook(route: dict) -> str:
+    """
+    A route's webhook: the environment variable named by webhook_env. Like the default
+    webhook, route webhooks are secrets and live in .env, never in config.json.
+    """
+    return os.getenv(route.get("webhook_env") or "", "")
+
+
+def route_mask(results: AlertResults, route: dict) -> pd.Series:
+    """Rows of the results table matched by a route's group and category filters (empty filter = all)."""
+    table = results.table
+    mask = pd.Series(True, index=table.index)
+    if route.get("groups"):
+        mask &= table["Group"].map(results.group_rules).isin(route["groups"])
+    if route.get("categories"):
+        mask &= table["Category"].isin(route["categories"])
+    return mask
+
+
+def route_results(results: AlertResults, config: dict, resolve=resolve_webhook) -> list[tuple[str, str, AlertResults]]:
+    """
+    Split one run's results into per-destination subsets, so every channel is served from
+    the same fetch and indicator computation.
+
+    A row goes to every route in config["routes"] whose filters match it; rows that no route
+    claims go to the default webhook_url. Routes sharing a webhook are merged so each webhook
+    gets a single batch. Routes without a resolvable webhook are skipped (their rows fall back
+    to the default). Returns (destination name, webhook url, results) for non-empty destinations.
+    resolve: route -> webhook url (see resolve_webhook).
+    """
+    if results.empty:
+        return []
+
+    destinations: dict[str, tuple[list[str], pd.Series]] = {}
+    claimed = pd.Series(False, index=results.table.index)
+
+    for route in config.get("routes", []):
+        name = route.get("name") or "Unnamed Route"
+        webhook_url = resolve(route)
+        if not webhook_url:
+            print(f"Route '{name}' has no webhook configured; skipped.")
+            continue
+        mask = route_mask(results, route)
+        claimed |= mask
+        names, existing = destinations.get(webhook_url, ([], pd.Series(False, index=results.table.index)))
+        destinations[webhook_url] = (names + [name], existing | mask)
+
+    default_url = config.get("webhook_url")
+    if default_url:
+        names, existing = destinations.get(default_url, ([], pd.Series(False, index=results.table.index)))
+        destinations[default_url] = (names + [DEFAULT_DESTINATION], existing | ~claimed)
+
+    routed = []
+    for webhook_url, (names, mask) in destinations.items():
+        if mask.any():
+            routed.append((", ".join(names), webhook_url, results.subset(mask)))
+    return routed
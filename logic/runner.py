@@ -1,24 +1,29 @@
+import time
 import pandas as pd
-from data.fetcher import fetch_stock_data
-from logic.evaluator import evaluate_group
-
-
-def extract_ticker_df(raw_data: pd.DataFrame, ticker: str, num_tickers: int) -> pd.DataFrame | None:
-    """
-    Safely extract a single ticker's DataFrame from yfinance output.
-    Handles both MultiIndex (multiple tickers) and flat (single ticker) structures.
-    Returns None if the ticker data cannot be extracted or is invalid.
-    """
-    try:
-        if isinstance(raw_data.columns, pd.MultiIndex):
-            if ticker in raw_data.columns.get_level_values(0):
-                return raw_data[ticker]
-        elif num_tickers == 1:
-            return raw_data
-    except (KeyError, TypeError) as e:
-        print(f"Warning: Could not extract data for {ticker}: {e}")
-
-    return None
+from data.fetcher import extract_ticker_df, fetch_stock_data
+from data.quality import DATA_ISSUE_COLUMNS, SHORT_HISTORY, check_data_quality
+from data.store import PriceStore
+from indicators import kernels
+from indicators.base import IndicatorContext, PRICE_FIELDS
+from logic.evaluator import compile_group, evaluate_groups
+from logic.results import AlertResults
+from utils.config import section_hash
+from utils.metrics import (ALERTS, CACHE_LOOKUPS, RUN_HISTORY, RUN_SECONDS, RUNS, TICKERS_EXCLUDED,
+                           TICKERS_FETCHED, timed)
+
+# Derived-state caches keyed on the hash of the config section they depend on.
+# One entry each: a new hash replaces the previous result.
+_universe_cache: dict[str, tuple[list[str], dict[str, str]]] = {}
+_rules_cache: dict[str, list] = {}
+_price_store: PriceStore | None = None
+
+
+def get_price_store() -> PriceStore:
+    """The process-wide on-disk price store (created on first use)."""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore()
+    return _price_store
 
 
 def get_all_tickers(config: dict) -> list[str]:
@@ -42,37 +47,160 @@ def get_ticker_category_map(config: dict) -> dict[str, str]:
     return ticker_to_category
 
 
-def run_analysis(config: dict) -> dict[str, list[dict]]:
+def get_universe(config: dict, categories_hash: str | None = None) -> tuple[list[str], dict[str, str]]:
+    """(tickers, ticker -> category), rebuilt only when the ticker_categories section changes."""
+    key = categories_hash or section_hash(config, "ticker_categories")
+    CACHE_LOOKUPS.inc(cache="universe", result="hit" if key in _universe_cache else "miss")
+    if key not in _universe_cache:
+        _universe_cache.clear()
+        _universe_cache[key] = (get_all_tickers(config), get_ticker_category_map(config))
+    return _universe_cache[key]
+
+
+def get_compiled_rules(config: dict, groups_hash: str | None = None) -> list:
+    """Per-group condition indicators (see compile_group), rebuilt only when the groups section changes."""
+    key = groups_hash or section_hash(config, "groups")
+    CACHE_LOOKUPS.inc(cache="rules", result="hit" if key in _rules_cache else "miss")
+    if key not in _rules_cache:
+        _rules_cache.clear()
+        _rules_cache[key] = [compile_group(group) for group in config.get("groups", [])]
+    return _rules_cache[key]
+
+
+def required_history(compiled: list) -> int:
+    """Longest lookback (in bars) of any compiled condition."""
+    return max((ind.lookback for group in compiled for ind in group if ind is not None), default=1)
+
+
+def exclude_bad_data(prices: dict[str, pd.DataFrame], tickers: list[str],
+                     min_history: int) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
     """
-    Fetch stock data and evaluate all rule groups against all tickers.
-    Returns a dict mapping group description to a list of triggered ticker stats.
-    Each stat dict includes a '_category' key for display grouping.
+    Run the data quality check on the Close matrix and drop tickers with no data, stale or
+    gappy series from every price matrix, so no indicator is computed on them.
+    Tickers that are only short of min_history (the longest lookback of any rule) stay in:
+    the evaluator skips just the conditions that need more bars (see evaluate_group_batch).
+    They are still listed in the returned issues table.
+    Returns (clean price matrices, data issues table).
     """
-    tickers = get_all_tickers(config)
-    groups = config.get("groups", [])
+    close = prices.get("Close", pd.DataFrame())
+    issues = check_data_quality(close, tickers, min_history)
+    dropped = issues[issues["Issue"] != SHORT_HISTORY]
+    if dropped.empty:
+        return prices, issues
 
-    if not tickers or not groups:
-        return {}
+    print(f"Data quality: excluded {len(dropped)} ticker(s): "
+          + ", ".join(f"{t} ({issue})" for t, issue in zip(dropped["Ticker"], dropped["Issue"])))
+    excluded = set(dropped["Ticker"])
+    clean = {field: matrix[[t for t in matrix.columns if t not in excluded]] for field, matrix in prices.items()}
+    return clean, issues
 
-    ticker_to_category = get_ticker_category_map(config)
-    raw_data = fetch_stock_data(tickers)
-    results_by_group: dict[str, list[dict]] = {}
 
+def build_price_matrices(raw_data: pd.DataFrame, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Split the fetched OHLCV download into one dates x tickers matrix per price field,
+    so indicators can be computed for the whole universe in a single vectorized pass.
+    Tickers without a usable Close column are left out of every matrix.
+    """
+    columns: dict[str, dict[str, pd.Series]] = {field: {} for field in PRICE_FIELDS}
     for ticker in tickers:
         df = extract_ticker_df(raw_data, ticker, len(tickers))
 
         if df is None or df.empty or "Close" not in df.columns:
             continue
 
-        close_series = df["Close"]
+        for field in PRICE_FIELDS:
+            if field in df.columns:
+                columns[field][ticker] = df[field]
+
+    return {field: pd.DataFrame(series) for field, series in columns.items() if series}
 
-        for group in groups:
-            triggered, group_title, stats = evaluate_group(close_series, group)
-            if triggered:
-                if group_title not in results_by_group:
-                    results_by_group[group_title] = []
-                stats["Ticker"] = ticker
-                stats["_category"] = ticker_to_category.get(ticker, "Other")
-                results_by_group[group_title].append(stats)
 
-    return results_by_group
+def prepare_context(config: dict, section_hashes: dict[str, str] | None = None, stats: dict | None = None
+                    ) -> tuple[IndicatorContext | None, list, pd.DataFrame]:
+    """
+    Fetch prices for the configured universe, drop tickers failing the data quality check
+    and build the shared IndicatorContext.
+    Returns (ctx, compiled rules, data issues); ctx is None when there is nothing to evaluate.
+    section_hashes: the ConfigStore's per-section hashes, so cached derived state is reused
+    without rehashing the config.
+    stats: if given, filled with stage timings and counts for the run history.
+    """
+    stats = stats if stats is not None else {}
+    timings = stats.setdefault("stages", {})
+    section_hashes = section_hashes or {}
+    no_issues = pd.DataFrame(columns=DATA_ISSUE_COLUMNS)
+
+    with timed("compile", timings):
+        tickers, ticker_to_category = get_universe(config, section_hashes.get("ticker_categories"))
+        if not tickers or not config.get("groups"):
+            return None, [], no_issues
+        compiled = get_compiled_rules(config, section_hashes.get("groups"))
+
+    if config.get("compute_backend"):
+        try:
+            kernels.set_backend(config["compute_backend"])
+        except ValueError as e:
+            print(f"Warning: {e}; keeping the '{kernels.get_backend()}' backend.")
+
+    with timed("fetch", timings):
+        # Incremental fetch through the price store unless disabled with "price_cache": false
+        if config.get("price_cache", True):
+            store = get_price_store()
+            raw_data = store.refresh(tickers)
+            stats["price_cache"] = dict(store.last_update)
+            for result in ("hit", "miss"):
+                CACHE_LOOKUPS.inc(store.last_update[result], cache="prices", result=result)
+        else:
+            raw_data = fetch_stock_data(tickers)
+        prices = build_price_matrices(raw_data, tickers)
+    TICKERS_FETCHED.inc(len(tickers))
+    stats["tickers"] = len(tickers)
+
+    with timed("quality", timings):
+        prices, data_issues = exclude_bad_data(prices, tickers, required_history(compiled))
+    excluded = data_issues[data_issues["Issue"] != SHORT_HISTORY]
+    for issue, count in excluded["Issue"].value_counts().items():
+        TICKERS_EXCLUDED.inc(count, issue=issue)
+    stats["excluded"] = len(excluded)
+
+    if "Close" not in prices or prices["Close"].shape[1] == 0:
+        return None, compiled, data_issues
+
+    # One shared context: each indicator is computed once for all tickers and all groups
+    ctx = IndicatorContext(prices["Close"], prices, categories=ticker_to_category)
+    return ctx, compiled, data_issues
+
+
+def run_analysis(config: dict, section_hashes: dict[str, str] | None = None) -> AlertResults:
+    """
+    Fetch stock data and evaluate all rule groups against all tickers.
+    Returns an AlertResults table with one row per (group description, triggered ticker),
+    including each ticker's category for display grouping. Tickers failing the data quality
+    check are excluded before any indicator work and listed in results.data_issues.
+    section_hashes: see prepare_context.
+    Each run is timed per stage in the metrics registry and appended to the run history.
+    """
+    start = time.perf_counter()
+    stats = {"ts": pd.Timestamp.now().isoformat(timespec="seconds"), "outcome": "error"}
+    try:
+        ctx, compiled, data_issues = prepare_context(config, section_hashes, stats)
+        if ctx is None:
+            stats["outcome"] = "empty"
+            return AlertResults(data_issues=data_issues)
+
+        with timed("evaluate", stats["stages"]):
+            results = evaluate_groups(ctx, config.get("groups", []), compiled)
+        results.data_issues = data_issues
+        stats["outcome"] = "ok"
+        stats["alerts"] = len(results)
+        ALERTS.inc(len(results))
+        return results
+    finally:
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 4)
+        RUN_SECONDS.observe(elapsed)
+        RUNS.inc(outcome=stats["outcome"])
+        try:
+            RUN_HISTORY.append(stats)
+        except OSError as e:
+            print(f"Warning: Could not write run history: {e}")
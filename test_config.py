@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import time
+import utils.config
+from utils.config import ConfigStore, load_config, save_config, section_hash, validate_config
+
+
+def make_config():
+    return {
+        "ticker_categories": {"Tech": ["AAPL", "MSFT"]},
+        "webhook_url": "https://example.invalid/webhook",
+        "delivery_mode": "auto",
+        "groups": [{"name": "RSI", "logic": "AND", "conditions": [{"indicator": "RSI", "period": 14}]}],
+    }
+
+
+def make_dir():
+    return tempfile.mkdtemp()
+
+
+def test_save_is_atomic_and_excludes_webhook():
+    tmp_dir = make_dir()
+    path = os.path.join(tmp_dir, "config.json")
+    config = make_config()
+    config["routes"] = [{"name": "Desk", "webhook_url": "https://example.invalid/desk", "webhook_env": "DESK_WEBHOOK"}]
+    assert save_config(config, path)
+
+    with open(path) as f:
+        saved = json.load(f)
+    assert "webhook_url" not in saved
+    assert saved["routes"] == [{"name": "Desk", "webhook_env": "DESK_WEBHOOK"}]
+    assert config["routes"][0]["webhook_url"]  # the in-memory config is left alone
+    assert saved["ticker_categories"] == {"Tech": ["AAPL", "MSFT"]}
+    # Only the config itself is left behind, no temp files
+    assert os.listdir(tmp_dir) == ["config.json"]
+
+
+def test_failed_save_keeps_previous_file():
+    tmp_dir = make_dir()
+    path = os.path.join(tmp_dir, "config.json")
+    save_config(make_config(), path)
+    with open(path) as f:
+        before = f.read()
+
+    config = make_config()
+    config["groups"] = [object()]  # not JSON serializable
+    assert not save_config(config, path)
+    with open(path) as f:
+        assert f.read() == before
+    assert os.listdir(tmp_dir) == ["config.json"]
+
+
+def test_validation_repairs_sections():
+    config, warnings = validate_config({
+        "ticker_categories": {"Tech": [" aapl", "AAPL", "msft", ""], "Broken": "SPY"},
+        "groups": [{"name": "G", "logic": "XOR", "conditions": [{"indicator": "RSI"}, "junk"]}, 42],
+    })
+    assert config["ticker_categories"] == {"Tech": ["AAPL", "MSFT"]}
+    assert config["groups"] == [{"name": "G", "logic": "AND", "conditions": [{"indicator": "RSI"}]}]
+    assert len(warnings) == 4
+
+    config, warnings = validate_config({"groups": "nope"})
+    assert isinstance(config["ticker_categories"], dict) and isinstance(config["groups"], list)
+    assert len(warnings) == 2
+
+    config, warnings = validate_config({"routes": [{"name": "Desk", "webhook_url": "https://example.invalid/d"}]})
+    assert config["routes"] == [{"name": "Desk"}]
+    assert any("webhook_env" in w for w in warnings)
+
+
+def test_load_falls_back_on_corrupt_file():
+    tmp_dir = make_dir()
+    path = os.path.join(tmp_dir, "config.json")
+    with open(path, "w") as f:
+        f.write("{not json")
+    config = load_config(path)
+    assert "groups" in config and "ticker_categories" in config
+
+
+def test_store_tracks_changed_sections():
+    tmp_dir = make_dir()
+    store = ConfigStore(os.path.join(tmp_dir, "config.json"), debounce_seconds=60, config=make_config())
+    groups_hash = store.hashes["groups"]
+
+    assert store.update() == set()
+    assert store.version == 0
+
+    store.config["ticker_categories"]["Tech"].append("NVDA")
+    assert store.update() == {"ticker_categories"}
+    assert store.version == 1
+    assert store.hashes["groups"] == groups_hash
+    assert store.hashes["ticker_categories"] == section_hash(store.config, "ticker_categories")
+
+    store.config["groups"][0]["name"] = "RSI 14"
+    store.update()
+    assert store.changed_since(1) == {"groups"}
+    assert store.changed_since(0) == {"groups", "ticker_categories"}
+    store.flush()
+
+
+def test_store_debounces_writes():
+    path = os.path.join(make_dir(), "config.json")
+    writes = []
+
+    def counting_save(config, p):
+        writes.append(p)
+        return save_config(config, p)
+
+    utils.config.save_config = counting_save
+    try:
+        store = ConfigStore(path, debounce_seconds=0.2, config=make_config())
+        for ticker in ["NVDA", "AMD", "INTC"]:
+            store.config["ticker_categories"]["Tech"].append(ticker)
+            store.update()
+        assert writes == []
+
+        time.sleep(0.5)
+        assert len(writes) == 1
+        with open(path) as f:
+            assert json.load(f)["ticker_categories"]["Tech"][-1] == "INTC"
+
+        # Webhook edits are not persisted, so they never trigger a write
+        store.config["webhook_url"] = "https://example.invalid/other"
+        assert store.update() == {"webhook_url"}
+        assert store.flush()
+        assert len(writes) == 1
+    finally:
+        utils.config.save_config = save_config
+
+
+def test_debounced_write_uses_the_snapshot_taken_at_update():
+    path = os.path.join(make_dir(), "config.json")
+    store = ConfigStore(path, debounce_seconds=0.2, config=make_config())
+    store.config["ticker_categories"]["Tech"].append("NVDA")
+    store.update()
+    # Edited after update() (as the script thread may be while the timer fires): not written yet
+    store.config["ticker_categories"]["New"] = ["XYZ"]
+    time.sleep(0.5)
+    with open(path) as f:
+        saved = json.load(f)["ticker_categories"]
+    assert saved["Tech"][-1] == "NVDA" and "New" not in saved
+
+    store.update()
+    assert store.flush()
+    with open(path) as f:
+        assert json.load(f)["ticker_categories"]["New"] == ["XYZ"]
+
+
+if __name__ == "__main__":
+    test_save_is_atomic_and_excludes_webhook()
+    test_failed_save_keeps_previous_file()
+    test_validation_repairs_sections()
+    test_load_falls_back_on_corrupt_file()
+    test_store_tracks_changed_sections()
+    test_store_debounces_writes()
+    test_debounced_write_uses_the_snapshot_taken_at_update()
+    print("All config tests passed.")
@@ -0,0 +1,113 @@
+import json
+import threading
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logic.results import AlertResults
+from test_formatting import make_group_table
+from utils.formatting import render_table_block
+from utils.discord_sender import (
+    DISCORD_CHAR_LIMIT, EMBEDS_PER_MESSAGE, batch_discord_messages, send_alert_results,
+)
+
+
+class StubWebhook:
+    """Local stand-in for a Discord webhook that records every request it receives."""
+
+    def __init__(self, status=204):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append({"content_type": self.headers.get("Content-Type", ""), "body": body})
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_results(num_groups, rows_per_group):
+    frames = []
+    for g in range(num_groups):
+        table = make_group_table(rows_per_group)
+        table.insert(0, "Group", f"[Group {g}] RSI < 30")
+        frames.append(table)
+    table = pd.concat(frames, ignore_index=True)
+    columns = {f"[Group {g}] RSI < 30": ["Price", "RSI", "EMA(21)"] for g in range(num_groups)}
+    return AlertResults(table[["Group", "Ticker", "Category", "Price", "RSI", "EMA(21)"]], columns)
+
+
+def render_blocks(results):
+    return [render_table_block(results.group_table(t), title=t) for t in results.groups]
+
+
+def test_auto_mode_uses_text_for_small_results():
+    stub = StubWebhook()
+    try:
+        results = make_results(1, 3)
+        sent, total, errors = send_alert_results(stub.url, results, render_blocks(results))
+        assert (sent, total, errors) == (1, 1, [])
+        assert "```" in json.loads(stub.requests[0]["body"])["content"]
+    finally:
+        stub.close()
+
+
+def test_embeds_cut_request_count():
+    stub = StubWebhook()
+    try:
+        results = make_results(8, 12)
+        blocks = render_blocks(results)
+        text_messages = len(batch_discord_messages(blocks))
+        sent, total, errors = send_alert_results(stub.url, results, blocks, mode="embeds")
+        assert not errors and sent == total < text_messages
+        payload = json.loads(stub.requests[0]["body"])
+        assert len(payload["embeds"]) <= EMBEDS_PER_MESSAGE
+    finally:
+        stub.close()
+
+
+def test_auto_mode_attaches_csv_for_large_results():
+    stub = StubWebhook(status=200)
+    try:
+        results = make_results(40, 50)
+        blocks = render_blocks(results)
+        assert len(batch_discord_messages(blocks)) > 20
+        sent, total, errors = send_alert_results(stub.url, results, blocks)
+        assert (sent, total, errors) == (1, 1, [])
+
+        request = stub.requests[0]
+        assert request["content_type"].startswith("multipart/form-data")
+        assert b'filename="alerts.csv"' in request["body"]
+        assert request["body"].count(b"TCK") == 40 * 50
+        summary = request["body"].split(b'name="payload_json"')[1].split(b"\r\n--")[0]
+        assert len(summary) < DISCORD_CHAR_LIMIT + 500
+    finally:
+        stub.close()
+
+
+def test_failed_webhook_reported():
+    stub = StubWebhook(status=500)
+    try:
+        results = make_results(1, 3)
+        sent, total, errors = send_alert_results(stub.url, results, render_blocks(results), mode="file")
+        assert (sent, total) == (0, 1) and "500" in errors[0]
+    finally:
+        stub.close()
+
+
+if __name__ == "__main__":
+    test_auto_mode_uses_text_for_small_results()
+    test_embeds_cut_request_count()
+    test_auto_mode_attaches_csv_for_large_results()
+    test_failed_webhook_reported()
+    print("All Discord sender tests passed.")
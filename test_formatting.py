@@ -0,0 +1,101 @@
+import time
+import pandas as pd
+from utils.formatting import format_discord_table, render_table_block
+from utils.discord_sender import DISCORD_CHAR_LIMIT, batch_discord_messages, split_text_block
+
+
+def make_group_table(num_rows, categories=("Tech", "Energy", "Finance")):
+    return pd.DataFrame({
+        "Ticker": [f"TCK{i}" for i in range(num_rows)],
+        "Category": [categories[i % len(categories)] for i in range(num_rows)],
+        "Price": [100.0 + i for i in range(num_rows)],
+        "RSI": [25.5] * num_rows,
+        "EMA(21)": [99.12] * num_rows,
+    })
+
+
+def test_table_matches_legacy_dict_input():
+    table = make_group_table(4)
+    legacy = table.rename(columns={"Category": "_category"}).to_dict("records")
+    assert format_discord_table(table) == format_discord_table(legacy)
+
+    lines = format_discord_table(table).split("\n")
+    assert lines[2].split("|")[1].strip() == "Ticker"
+    assert lines[4].strip("|").strip() == "Tech"
+    assert len({len(line) for line in lines[1:-1]}) == 1
+
+
+def test_oversized_group_split_at_row_boundaries():
+    block = render_table_block(make_group_table(300), title="[Big] RSI < 30")
+    messages = batch_discord_messages([block])
+
+    assert len(messages) > 1
+    for msg in messages:
+        assert len(msg) <= DISCORD_CHAR_LIMIT
+        assert msg.count("```") == 2
+        assert "| Ticker" in msg
+    body_rows = sum(msg.count("| TCK") for msg in messages)
+    assert body_rows == 300
+
+
+def test_small_groups_packed_in_order():
+    blocks = [render_table_block(make_group_table(n), title=f"[G{k}]") for k, n in enumerate([20, 3, 20, 3, 20, 3])]
+    messages = batch_discord_messages(blocks)
+    total = sum(len(str(b)) + 2 for b in blocks)
+    assert len(messages) < len(blocks) and len(messages) >= -(-total // (DISCORD_CHAR_LIMIT - 50))
+    assert messages[0].split("\n\n")[1].startswith("**[G0]**")
+    titles = [line for msg in messages for line in msg.split("\n") if line.startswith("**[G")]
+    assert titles == [f"**[G{k}]**:" for k in range(6)]
+
+
+def test_split_tables_keep_row_order_across_messages():
+    small, big = make_group_table(25, ("Tech",)), make_group_table(165, ("Tech",)).iloc[25:]
+    blocks = [render_table_block(small, title="[S25]"), render_table_block(big, title="[S140]")]
+    messages = batch_discord_messages(blocks)
+
+    stream = "\n".join(messages)
+    rows = [line.split("|")[1].strip() for line in stream.split("\n") if line.startswith("| TCK")]
+    assert rows == [f"TCK{i}" for i in range(165)]
+    assert stream.index("[S25]") < stream.index("[S140]")
+    assert all(len(msg) <= DISCORD_CHAR_LIMIT for msg in messages)
+
+
+def test_split_never_ends_a_chunk_on_a_category_label():
+    block = render_table_block(make_group_table(10, ("A", "B")), title="[Two]")
+    labels = {block.rows[i] for i in block.section_rows}
+    chunks = block.split(150)
+    assert chunks[0].split("\n")[-3] not in labels
+
+    for num_rows in range(20, 201, 9):
+        block = render_table_block(make_group_table(num_rows), title="[Cats]")
+        labels = {block.rows[i] for i in block.section_rows}
+        for limit in (300, 700, 1200, DISCORD_CHAR_LIMIT):
+            chunks = block.split(limit)
+            assert all(chunk.split("\n")[-3] not in labels for chunk in chunks), (num_rows, limit)
+            assert sum(chunk.count("| TCK") for chunk in chunks) == num_rows
+
+
+def test_plain_text_split_keeps_code_fences_balanced():
+    text = "**Title**:\n```\n" + "\n".join("x" * 40 for _ in range(200)) + "\n```"
+    pieces = split_text_block(text, 500)
+    assert all(len(p) <= 500 and p.count("```") == 2 for p in pieces)
+
+
+def test_thousands_of_rows_render_quickly():
+    table = make_group_table(5000)
+    start = time.perf_counter()
+    messages = batch_discord_messages([render_table_block(table, title="[Huge]")])
+    elapsed = time.perf_counter() - start
+    assert all(len(m) <= DISCORD_CHAR_LIMIT for m in messages)
+    assert elapsed < 2.0
+
+
+if __name__ == "__main__":
+    test_table_matches_legacy_dict_input()
+    test_oversized_group_split_at_row_boundaries()
+    test_small_groups_packed_in_order()
+    test_split_tables_keep_row_order_across_messages()
+    test_split_never_ends_a_chunk_on_a_category_label()
+    test_plain_text_split_keeps_code_fences_balanced()
+    test_thousands_of_rows_render_quickly()
+    print("All formatting tests passed.")
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from indicators.base import IndicatorContext
+from indicators.registry import get_indicator_class, list_indicator_keys, stat_column_sort_key
+from indicators.momentum import RSIIndicator, RCIIndicator
+from indicators.trend import EMAIndicator
+from indicators.volatility import ATRIndicator
+from indicators.volume import RelativeVolumeIndicator
+from logic.evaluator import evaluate_group, evaluate_group_batch
+
+
+def make_close_matrix(num_tickers=5, num_days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=num_days, freq="B")
+    returns = rng.normal(0, 0.02, size=(num_days, num_tickers))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index,
+                        columns=[f"T{i}" for i in range(num_tickers)])
+
+
+def make_ohlcv_context(num_tickers=5, num_days=300, seed=0):
+    close = make_close_matrix(num_tickers, num_days, seed)
+    rng = np.random.default_rng(seed + 1)
+    fields = {
+        "Open": close.shift(1).fillna(close) * (1 + rng.normal(0, 0.005, close.shape)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Volume": pd.DataFrame(rng.integers(1_000, 2_000, close.shape), index=close.index, columns=close.columns),
+    }
+    return IndicatorContext(close, fields)
+
+
+def test_builtin_condition_types_registered():
+    keys = list_indicator_keys()
+    for key in ["RSI", "RCI", "Price vs EMA", "EMA Proximity", "Days Above EMA", "MACD", "Bollinger %B",
+                "Relative Volume", "Price vs VWAP", "ATR %", "Gap %", "Return %", "Cross-Sectional Rank", "Relative Strength"]:
+        assert key in keys
+        assert get_indicator_class(key).key == key
+
+
+def test_stat_column_order():
+    cols = ["Days>EMA(7)", "EMA(21)", "RCI", "RSI"]
+    assert sorted(cols, key=stat_column_sort_key) == ["RSI", "RCI", "EMA(21)", "Days>EMA(7)"]
+
+
+def test_batch_compute_matches_per_series():
+    close = make_close_matrix()
+    ctx = IndicatorContext(close)
+    for indicator in [RSIIndicator(14), RCIIndicator(9), EMAIndicator(21)]:
+        batch = ctx.get(indicator)
+        for ticker in close.columns:
+            single = indicator.calculate(close[ticker])
+            assert np.allclose(batch[ticker], single, equal_nan=True)
+
+
+def test_context_caches_shared_indicators():
+    ctx = IndicatorContext(make_close_matrix())
+    assert ctx.get(EMAIndicator(21)) is ctx.get(EMAIndicator(21))
+
+
+def test_volume_spike_and_atr():
+    ctx = make_ohlcv_context()
+    ctx.fields["Volume"].iloc[-1, 0] = 10_000
+    rvol = ctx.latest(RelativeVolumeIndicator(20))
+    assert rvol.iloc[0] > 4 and (rvol.iloc[1:] < 3).all()
+
+    # High/Low are +-1% of close, so the true range stays close to 2% of price
+    atr = ctx.latest(ATRIndicator(14))
+    assert ((atr > 1.5) & (atr < 5)).all()
+
+
+def test_missing_field_is_an_eval_error_not_a_crash():
+    ctx = IndicatorContext(make_close_matrix())
+    group = {"name": "Vol", "conditions": [{"indicator": "Relative Volume", "period": 20, "operator": ">", "value": 2}]}
+    triggered, _, _ = evaluate_group_batch(ctx, group)
+    assert not triggered.any()
+
+
+def test_cross_sectional_rank_universe_and_category():
+    close = make_close_matrix(num_tickers=10)
+    categories = {t: ("A" if i < 5 else "B") for i, t in enumerate(close.columns)}
+    ctx = IndicatorContext(close, categories=categories)
+    returns = close.iloc[-1] / close.iloc[-21] - 1
+
+    group = {"name": "Leaders", "conditions": [
+        {"indicator": "Cross-Sectional Rank", "source": "Return %", "period": 20, "scope": "Universe",
+         "operator": "top N", "value": 3},
+    ]}
+    triggered, descriptions, _ = evaluate_group_batch(ctx, group)
+    assert set(triggered[triggered].index) == set(returns.nlargest(3).index)
+    assert descriptions[triggered.idxmax()] == "[Leaders] Return %(20) in top 3 of universe"
+
+    group["conditions"][0].update({"scope": "Category", "operator": "bottom %", "value": 20})
+    triggered, _, _ = evaluate_group_batch(ctx, group)
+    expected = {returns[:5].idxmin(), returns[5:].idxmin()}
+    assert set(triggered[triggered].index) == expected
+
+
+def test_relative_strength_against_benchmark_in_universe():
+    close = make_close_matrix(num_tickers=4).rename(columns={"T0": "SPY"})
+    ctx = IndicatorContext(close)
+    group = {"name": "RS", "conditions": [
+        {"indicator": "Relative Strength", "period": 50, "benchmark": "spy", "operator": ">"},
+    ]}
+    triggered, _, stats = evaluate_group_batch(ctx, group)
+
+    ratio = close["T1"] / close["SPY"]
+    expected = ratio.iloc[-1] > ratio.ewm(span=50, adjust=False).mean().iloc[-1]
+    assert triggered["T1"] == expected
+    assert stats.at["SPY", "RS/SPY"] == 1.0
+
+    group["conditions"][0]["benchmark"] = "QQQ"
+    triggered, _, _ = evaluate_group_batch(ctx, group)
+    assert not triggered.any()
+
+
+def test_group_batch_matches_single_ticker_evaluation():
+    close = make_close_matrix(num_tickers=8)
+    group = {
+        "name": "Mixed",
+        "logic": "OR",
+        "conditions": [
+            {"indicator": "RSI", "period": 14, "operator": "<", "value": 50},
+            {"indicator": "Days Above EMA", "period": 7, "operator": ">=", "value": 2},
+        ],
+    }
+    triggered, descriptions, _ = evaluate_group_batch(IndicatorContext(close), group)
+    for ticker in close.columns:
+        is_triggered, desc, _ = evaluate_group(close[ticker], group)
+        assert is_triggered == triggered[ticker]
+        assert desc == descriptions[ticker]
+
+
+def test_default_conditions_are_within_their_specs():
+    # Switching a condition's type resets it to these, so they must be valid widget values
+    for key in list_indicator_keys():
+        cls = get_indicator_class(key)
+        cond = cls.default_condition()
+        assert cond["indicator"] == key
+        for spec in (cls.period_spec, cls.operator_spec, cls.value_spec) + tuple(cls.param_specs):
+            if spec is None or spec.kind == "static":
+                continue
+            value = cond[spec.name]
+            assert spec.min_value is None or value >= spec.min_value, (key, spec.name)
+            assert spec.max_value is None or value <= spec.max_value, (key, spec.name)
+            assert not spec.choices or value in spec.choices, (key, spec.name)
+        cls.from_condition(cond)
+
+
+if __name__ == "__main__":
+    test_builtin_condition_types_registered()
+    test_stat_column_order()
+    test_batch_compute_matches_per_series()
+    test_context_caches_shared_indicators()
+    test_volume_spike_and_atr()
+    test_missing_field_is_an_eval_error_not_a_crash()
+    test_cross_sectional_rank_universe_and_category()
+    test_relative_strength_against_benchmark_in_universe()
+    test_group_batch_matches_single_ticker_evaluation()
+    test_default_conditions_are_within_their_specs()
+    print("All indicator tests passed.")
@@ -0,0 +1,109 @@
+import time
+import numpy as np
+import pandas as pd
+from indicators import kernels
+from indicators.momentum import MACDIndicator, RSIIndicator
+from indicators.trend import EMAIndicator
+from indicators.volatility import ATRIndicator
+from test_indicators import make_close_matrix, make_ohlcv_context
+
+KERNEL_BACKENDS = ["numpy"] + (["numba"] if kernels.numba is not None else [])
+
+
+def make_gappy_close():
+    close = make_close_matrix(num_tickers=8, num_days=260)
+    close.iloc[:60, 1] = np.nan     # late listing
+    close.iloc[100:104, 2] = np.nan  # interior gap
+    close.iloc[-3:, 3] = np.nan     # stale tail
+    close.iloc[:, 4] = np.nan       # no data
+    close.iloc[150:, 5] = close.iloc[150, 5]  # flat: no losses, RSI pinned at 100 / undefined
+    return close
+
+
+def with_backend(name, fn):
+    previous = kernels._backend
+    kernels.set_backend(name)
+    try:
+        return fn()
+    finally:
+        kernels._backend = previous
+
+
+def assert_same(expected: pd.DataFrame, actual: pd.DataFrame):
+    assert actual.index.equals(expected.index) and actual.columns.equals(expected.columns)
+    assert np.array_equal(np.isnan(expected.to_numpy()), np.isnan(actual.to_numpy()))
+    assert np.allclose(expected, actual, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_kernels_match_pandas_ewm_and_rsi():
+    close = make_gappy_close()
+    cases = [
+        lambda: kernels.rsi(close, 14),
+        lambda: kernels.ewm_mean(close, span=21, adjust=False),
+        lambda: kernels.ewm_mean(close, alpha=1 / 14, min_periods=14, adjust=False),
+        lambda: kernels.ewm_mean(close, com=13, min_periods=14),
+    ]
+    for case in cases:
+        expected = with_backend("pandas", case)
+        for backend in KERNEL_BACKENDS:
+            assert_same(expected, with_backend(backend, case))
+
+
+def test_scalar_loops_match_pandas():
+    # The numba kernels' source, run as plain Python (numba itself is optional)
+    close = make_close_matrix(num_tickers=3, num_days=80)
+    close.iloc[10:13, 1] = np.nan
+    values = close.to_numpy()
+    expected = close.ewm(span=10, adjust=False).mean()
+    assert np.allclose(kernels._ewm_mean_loop(values, 2 / 11, False, 0), expected, equal_nan=True)
+    expected_rsi = with_backend("pandas", lambda: kernels.rsi(close[["T0", "T2"]], 14))
+    assert np.allclose(kernels._rsi_loop(values[:, [0, 2]], 14), expected_rsi, equal_nan=True)
+
+
+def test_indicators_unchanged_across_backends():
+    indicators = [RSIIndicator(14), EMAIndicator(55), ATRIndicator(14), MACDIndicator(12, 26, 9)]
+    expected = with_backend("pandas", lambda: [make_ohlcv_context().get(ind) for ind in indicators])
+    for backend in KERNEL_BACKENDS:
+        actual = with_backend(backend, lambda: [make_ohlcv_context().get(ind) for ind in indicators])
+        for e, a in zip(expected, actual):
+            assert_same(e, a)
+
+
+def best_time(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_kernel_timings_reported():
+    close = make_close_matrix(num_tickers=300, num_days=500)
+
+    def work():
+        kernels.rsi(close, 14)
+        kernels.ewm_mean(close, span=200, adjust=False)
+
+    pandas_time = with_backend("pandas", lambda: best_time(work))
+    for backend in KERNEL_BACKENDS:
+        with_backend(backend, work)  # warm-up (numba compiles on first call)
+        kernel_time = with_backend(backend, lambda: best_time(work))
+        print(f"RSI(14) + EMA(200), 300 tickers x 500 bars: pandas {pandas_time * 1000:.1f} ms, "
+              f"{backend} {kernel_time * 1000:.1f} ms")
+        # Equivalence is checked above; this only catches a pathological slowdown, not CI noise
+        assert kernel_time < 5 * pandas_time + 0.05
+
+
+def test_auto_falls_back_to_pandas_without_numba():
+    expected = "numba" if kernels.numba is not None else "pandas"
+    assert with_backend("auto", kernels.get_backend) == expected
+
+
+if __name__ == "__main__":
+    test_kernels_match_pandas_ewm_and_rsi()
+    test_scalar_loops_match_pandas()
+    test_indicators_unchanged_across_backends()
+    test_kernel_timings_reported()
+    test_auto_falls_back_to_pandas_without_numba()
+    print("All kernel tests passed.")
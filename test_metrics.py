@@ -0,0 +1,118 @@
+import os
+import tempfile
+import urllib.request
+import pandas as pd
+import logic.runner
+from logic.runner import run_analysis
+from utils.metrics import (ALERTS, RUNS, STAGE_SECONDS, MetricsRegistry, RunHistory, start_metrics_server,
+                           timed)
+from test_indicators import make_close_matrix
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    requests_total = registry.counter("app_requests_total", "Requests")
+    requests_total.inc(status="204")
+    requests_total.inc(2, status="429")
+    latency = registry.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE app_requests_total counter" in text
+    assert 'app_requests_total{status="429"} 2' in text
+    assert 'app_latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'app_latency_seconds_bucket{le="1"} 3' in text
+    assert 'app_latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "app_latency_seconds_count 4" in text
+    assert "app_latency_seconds_sum 3.65" in text
+
+
+def test_large_values_keep_full_precision():
+    registry = MetricsRegistry()
+    registry.counter("app_tickers_total", "Tickers").inc(1234567)
+    registry.gauge("app_ratio", "Ratio").set(1 / 3)
+    text = registry.render()
+    assert "app_tickers_total 1234567\n" in text
+    assert f"app_ratio {1 / 3!r}\n" in text
+
+
+def test_run_history_keeps_last_runs():
+    history = RunHistory(os.path.join(tempfile.mkdtemp(), "runs.jsonl"), max_runs=5)
+    for i in range(12):
+        history.append({"run": i})
+    assert [r["run"] for r in history.read()] == [7, 8, 9, 10, 11]
+    assert [r["run"] for r in history.read(last=2)] == [10, 11]
+    with open(history.path) as f:
+        assert len(f.readlines()) <= 10
+
+    # A restart counts the existing lines once; appends only reread the file past 2 x max_runs
+    reopened = RunHistory(history.path, max_runs=5)
+    reopened.append({"run": 12})
+    assert reopened._lines == 7
+    rewrites = []
+    reopened._trim = lambda: rewrites.append(reopened._lines)
+    for i in range(13, 17):
+        reopened.append({"run": i})
+    assert rewrites == [11]
+
+
+def test_endpoint_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("app_up_total", "Up").inc()
+    server = start_metrics_server(0, registry=registry)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert "app_up_total 1" in resp.read().decode()
+    finally:
+        server.shutdown()
+
+
+def test_run_analysis_records_stages_and_history():
+    close = make_close_matrix(num_tickers=3, num_days=260)
+    raw = pd.concat({t: pd.DataFrame({"Close": close[t]}) for t in close.columns}, axis=1)
+    config = {
+        "ticker_categories": {"All": list(close.columns) + ["GONE"]},
+        "groups": [{"name": "Any", "conditions": [{"indicator": "RSI", "period": 14, "operator": "<", "value": 101}]}],
+        "price_cache": False,
+    }
+
+    real_fetch, real_history = logic.runner.fetch_stock_data, logic.runner.RUN_HISTORY
+    logic.runner.fetch_stock_data = lambda tickers: raw
+    logic.runner.RUN_HISTORY = RunHistory(os.path.join(tempfile.mkdtemp(), "runs.jsonl"))
+    try:
+        runs_before, alerts_before = RUNS.value(outcome="ok"), ALERTS.value()
+        evaluations_before = STAGE_SECONDS.count(stage="evaluate")
+        results = run_analysis(config)
+        [record] = logic.runner.RUN_HISTORY.read()
+    finally:
+        logic.runner.fetch_stock_data, logic.runner.RUN_HISTORY = real_fetch, real_history
+
+    assert len(results) == 3
+    assert RUNS.value(outcome="ok") == runs_before + 1
+    assert ALERTS.value() == alerts_before + 3
+    assert STAGE_SECONDS.count(stage="evaluate") == evaluations_before + 1
+    assert record["outcome"] == "ok" and record["alerts"] == 3
+    assert record["tickers"] == 4 and record["excluded"] == 1
+    assert set(record["stages"]) == {"compile", "fetch", "quality", "evaluate"}
+
+
+def test_timed_accumulates_into_timings():
+    timings = {}
+    with timed("unit", timings):
+        pass
+    with timed("unit", timings):
+        pass
+    assert timings["unit"] >= 0 and STAGE_SECONDS.count(stage="unit") >= 2
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_large_values_keep_full_precision()
+    test_run_history_keeps_last_runs()
+    test_endpoint_serves_registry()
+    test_run_analysis_records_stages_and_history()
+    test_timed_accumulates_into_timings()
+    print("All metrics tests passed.")
@@ -0,0 +1,167 @@
+import os
+import tempfile
+import time
+from utils.metrics import STAGE_SECONDS
+from utils.notification_queue import NotificationQueue, NotificationWorker
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class FakeWebhook:
+    """Returns the scripted status codes in order, then 204 forever."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, webhook_url, payload, files=None):
+        self.calls.append((webhook_url, payload, files))
+        return self.responses.pop(0) if self.responses else FakeResponse(204)
+
+
+def make_queue():
+    return NotificationQueue(os.path.join(tempfile.mkdtemp(), "queue.db"))
+
+
+def test_enqueue_and_drain_in_order_with_files():
+    queue = make_queue()
+    webhook = FakeWebhook()
+    files = {"alerts.csv": (b"Ticker\nAAPL\n", "text/csv")}
+    queue.enqueue("http://hook", [({"content": "one"}, None), ({"content": "two"}, files)])
+
+    worker = NotificationWorker(queue, post=webhook, min_interval=0)
+    sends_before = STAGE_SECONDS.count(stage="send")
+    assert worker.drain_once() == 2
+    assert STAGE_SECONDS.count(stage="send") == sends_before + 2
+    assert [c[1]["content"] for c in webhook.calls] == ["one", "two"]
+    assert webhook.calls[1][2] == files
+    assert queue.counts() == {}
+
+
+def test_server_errors_retry_with_backoff_then_succeed():
+    queue = make_queue()
+    webhook = FakeWebhook(FakeResponse(500), FakeResponse(502))
+    queue.enqueue("http://hook", [({"content": "alert"}, None)])
+    worker = NotificationWorker(queue, post=webhook, min_interval=0, base_delay=0.01)
+
+    deadline = time.time() + 5
+    while queue.counts() and time.time() < deadline:
+        worker.drain_once()
+        time.sleep(0.01)
+    assert queue.counts() == {}
+    assert len(webhook.calls) == 3
+
+
+def test_failed_message_holds_back_later_ones():
+    queue = make_queue()
+    webhook = FakeWebhook(FakeResponse(500))
+    queue.enqueue("http://hook", [({"content": f"{i}/3"}, None) for i in range(1, 4)])
+    worker = NotificationWorker(queue, post=webhook, min_interval=0, base_delay=0.05)
+
+    assert worker.drain_once() == 3  # 1/3 fails; 2/3 and 3/3 go back to pending behind it
+    assert [c[1]["content"] for c in webhook.calls] == ["1/3"]
+    assert queue.counts() == {"pending": 3}
+
+    deadline = time.time() + 5
+    while queue.counts() and time.time() < deadline:
+        worker.drain_once()
+        time.sleep(0.01)
+    assert [c[1]["content"] for c in webhook.calls] == ["1/3", "1/3", "2/3", "3/3"]
+
+
+def test_rate_limit_honours_retry_after():
+    queue = make_queue()
+    queue.enqueue("http://hook", [({"content": "alert"}, None)])
+    worker = NotificationWorker(queue, post=FakeWebhook(FakeResponse(429, {"Retry-After": "30"})), min_interval=0)
+    worker.drain_once()
+    assert queue.counts() == {"pending": 1}
+    assert queue.next_due_in() > 25
+
+
+def test_client_errors_go_to_dead_letter_and_can_be_requeued():
+    queue = make_queue()
+    queue.enqueue("http://hook", [({"content": "alert"}, None)])
+    worker = NotificationWorker(queue, post=FakeWebhook(FakeResponse(404, text="Unknown Webhook")), min_interval=0)
+    worker.drain_once()
+    assert queue.counts() == {"dead": 1}
+    assert "Unknown Webhook" in queue.dead_errors()[0]
+
+    assert queue.requeue_dead() == 1
+    worker.drain_once()
+    assert queue.counts() == {}
+
+
+def test_in_flight_rows_recovered_after_lease_expires():
+    queue = NotificationQueue(make_queue().path, lease_seconds=0.1)
+    queue.enqueue("http://hook", [({"content": "alert"}, None)])
+    assert len(queue.claim_due()) == 1  # process dies before reporting the outcome
+    assert queue.counts() == {"sending": 1}
+
+    reopened = NotificationQueue(queue.path)
+    webhook = FakeWebhook()
+    worker = NotificationWorker(reopened, post=webhook, min_interval=0)
+    assert worker.drain_once() == 0  # lease still held
+    time.sleep(0.15)
+    worker.drain_once()
+    assert len(webhook.calls) == 1 and reopened.counts() == {}
+
+
+def test_second_process_does_not_take_rows_being_sent():
+    first = make_queue()
+    first.enqueue("http://hook", [({"content": "alert"}, None)])
+    claimed = first.claim_due()
+
+    second = NotificationQueue(first.path)  # e.g. the polling loop starting next to the app
+    assert second.claim_due() == [] and second.counts() == {"sending": 1}
+    second.mark_retry(claimed[0]["id"], "not mine", 0)
+    assert second.counts() == {"sending": 1}
+    first.mark_sent(claimed[0]["id"])
+    assert first.counts() == {}
+
+
+def test_background_worker_delivers_without_blocking():
+    queue = make_queue()
+    webhook = FakeWebhook()
+    worker = NotificationWorker(queue, post=webhook, min_interval=0, poll_interval=0.05).start()
+    try:
+        queue.enqueue("http://hook", [({"content": str(i)}, None) for i in range(5)])
+        worker.notify()
+        deadline = time.time() + 5
+        while len(webhook.calls) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+    assert [c[1]["content"] for c in webhook.calls] == ["0", "1", "2", "3", "4"]
+
+
+def test_webhooks_delivered_in_parallel_each_in_order():
+    queue = make_queue()
+    webhook = FakeWebhook()
+    for hook in ["http://a", "http://b", "http://c"]:
+        queue.enqueue(hook, [({"content": f"{hook} {i}"}, None) for i in range(3)])
+
+    # With 0.1s spacing per webhook, three webhooks in series would take >= 0.6s
+    worker = NotificationWorker(queue, post=webhook, min_interval=0.1)
+    start = time.monotonic()
+    assert worker.drain_once() == 9
+    assert time.monotonic() - start < 0.5
+    for hook in ["http://a", "http://b", "http://c"]:
+        assert [c[1]["content"] for c in webhook.calls if c[0] == hook] == [f"{hook} {i}" for i in range(3)]
+
+
+if __name__ == "__main__":
+    test_enqueue_and_drain_in_order_with_files()
+    test_server_errors_retry_with_backoff_then_succeed()
+    test_failed_message_holds_back_later_ones()
+    test_rate_limit_honours_retry_after()
+    test_client_errors_go_to_dead_letter_and_can_be_requeued()
+    test_in_flight_rows_recovered_after_lease_expires()
+    test_second_process_does_not_take_rows_being_sent()
+    test_background_worker_delivers_without_blocking()
+    test_webhooks_delivered_in_parallel_each_in_order()
+    print("All notification queue tests passed.")
@@ -0,0 +1,198 @@
+import time
+import numpy as np
+import pandas as pd
+from data.quotes import StubQuoteFeed, YahooQuoteFeed, session_bars
+from indicators.base import IndicatorContext, LiveContext
+from indicators.cross_section import CrossSectionalRankIndicator
+from indicators.registry import get_indicator_class, list_indicator_keys
+from indicators.relative_strength import RelativeStrengthIndicator
+from logic.evaluator import compile_group, evaluate_groups
+from logic.polling import PollingSession
+from test_indicators import make_ohlcv_context
+
+GROUPS = [
+    {"name": "Oversold", "logic": "AND", "conditions": [
+        {"indicator": "RSI", "period": 14, "operator": "<", "value": 45},
+        {"indicator": "Price vs EMA", "period": 21, "operator": "<"},
+    ]},
+    {"name": "Momentum", "logic": "OR", "conditions": [
+        {"indicator": "Days Above EMA", "period": 21, "operator": ">=", "value": 5},
+        {"indicator": "MACD", "fast": 12, "slow": 26, "signal": 9, "operator": ">", "value": 0},
+        {"indicator": "Cross-Sectional Rank", "source": "Return %", "period": 20, "operator": "top N", "value": 3},
+        {"indicator": "ATR %", "period": 14, "operator": ">", "value": 2.5},
+        {"indicator": "Relative Volume", "period": 20, "operator": ">", "value": 1.4},
+    ]},
+]
+CONFIG = {"groups": GROUPS}
+
+
+def truncate(ctx: IndicatorContext, rows: int) -> IndicatorContext:
+    fields = {name: matrix.iloc[:rows] for name, matrix in ctx.fields.items()}
+    return IndicatorContext(fields["Close"], fields, ctx.categories)
+
+
+class ReplayFeed:
+    """Snapshots of the stored bar at row `position` of a full history (the finished session)."""
+
+    def __init__(self, ctx: IndicatorContext, position: int):
+        self.ctx, self.position = ctx, position
+
+    def snapshot(self, tickers):
+        row = {name: matrix.iloc[self.position] for name, matrix in self.ctx.fields.items()}
+        return self.ctx.close.index[self.position], pd.DataFrame(row).reindex(tickers)
+
+
+def split_last_bar(ctx: IndicatorContext) -> tuple[IndicatorContext, pd.DataFrame, pd.Timestamp]:
+    fields = {name: matrix.iloc[:-1] for name, matrix in ctx.fields.items()}
+    base = IndicatorContext(fields["Close"], fields, ctx.categories)
+    bar = pd.DataFrame({name: matrix.iloc[-1] for name, matrix in ctx.fields.items()})
+    return base, bar, ctx.close.index[-1]
+
+
+def test_live_bar_matches_full_recompute():
+    ctx = make_ohlcv_context(num_tickers=6, num_days=300)
+    ctx.categories = {t: ("A" if i % 2 else "B") for i, t in enumerate(ctx.tickers)}
+    live = LiveContext(*split_last_bar(ctx))
+
+    # Every condition type (relative strength against a benchmark that is in the universe)
+    indicators = [get_indicator_class(key).from_condition({}) for key in list_indicator_keys() if key != "Relative Strength"]
+    indicators += [CrossSectionalRankIndicator(14, "RSI", "Category", "top"), RelativeStrengthIndicator(50, "T0")]
+    for indicator in indicators:
+        expected, actual = ctx.latest(indicator).astype(float), live.latest(indicator).astype(float)
+        assert np.allclose(expected, actual, rtol=1e-9, equal_nan=True), indicator.name
+
+    pd.testing.assert_frame_equal(evaluate_groups(live, GROUPS).table, evaluate_groups(ctx, GROUPS).table)
+
+
+def test_stored_bar_for_the_session_is_replaced():
+    # History that already holds today's unfinished daily bar: the snapshot replaces it
+    ctx = make_ohlcv_context(num_tickers=4, num_days=200)
+    session = ctx.close.index[-1]
+    feed = StubQuoteFeed(ctx.close.iloc[-2], session=session, seed=3)
+    polling = PollingSession(CONFIG, feed, ctx, [compile_group(g) for g in GROUPS])
+    polling.poll_once()
+    assert len(polling._base.close) == 199 and polling._base.close.index[-1] < session
+
+
+def test_polling_cycles_are_fast_and_alert_once():
+    ctx = make_ohlcv_context(num_tickers=300, num_days=500)
+    feed = StubQuoteFeed(ctx.latest_close(), session=ctx.close.index[-1] + pd.offsets.BDay(), seed=1)
+    polling = PollingSession(CONFIG, feed, ctx, [compile_group(g) for g in GROUPS])
+
+    first = polling.new_alerts(polling.poll_once())  # builds the base's indicator state
+    assert len(first) > 0
+    cycles = []
+    for _ in range(5):
+        start = time.perf_counter()
+        results = polling.poll_once()
+        fresh = polling.new_alerts(results)
+        cycles.append(time.perf_counter() - start)
+        assert set(zip(fresh.table["Group"], fresh.table["Ticker"])).isdisjoint(zip(first.table["Group"], first.table["Ticker"]))
+    assert max(cycles) < 1.0, cycles
+    assert polling._base is ctx
+
+
+def test_new_session_reloads_history():
+    # Started on day -2 with history up to day -3; the store then gains day -2 before day -1 opens
+    full = make_ohlcv_context(num_tickers=6, num_days=300)
+    compiled = [compile_group(g) for g in GROUPS]
+    loads = []
+
+    def load(config):
+        loads.append(len(full.close) - 1)
+        return truncate(full, len(full.close) - 1), compiled, None
+
+    feed = ReplayFeed(full, len(full.close) - 2)
+    polling = PollingSession(CONFIG, feed, truncate(full, len(full.close) - 2), compiled, load=load)
+    polling.poll_once()
+    assert not loads
+    feed.position += 1
+    results = polling.poll_once()
+    assert loads and polling._base.close.index[-1] == full.close.index[-2]
+
+    live = LiveContext(polling._base, feed.snapshot(list(full.tickers))[1], full.close.index[-1])
+    for indicator in [get_indicator_class(key).from_condition({}) for key in ("RSI", "Days Above EMA", "MACD", "ATR %")]:
+        assert np.allclose(full.latest(indicator).astype(float), live.latest(indicator).astype(float),
+                           rtol=1e-9, equal_nan=True), indicator.name
+    pd.testing.assert_frame_equal(results.table, evaluate_groups(full, GROUPS).table)
+
+
+def test_or_group_alerts_once_as_its_title_changes():
+    ctx = make_ohlcv_context(num_tickers=4, num_days=200)
+    feed = StubQuoteFeed(ctx.latest_close(), session=ctx.close.index[-1] + pd.offsets.BDay(), seed=2)
+    polling = PollingSession(CONFIG, feed, ctx, [compile_group(g) for g in GROUPS])
+    results = polling.poll_once()
+    first = polling.new_alerts(results)
+    assert len(first) > 0
+    # Same rule group and tickers, reported under another combination of met conditions
+    retitled = results.subset(pd.Series(True, index=results.table.index))
+    retitled.table["Group"] = retitled.table["Group"] + " (changed)"
+    retitled.group_rules = {title + " (changed)": rule for title, rule in results.group_rules.items()}
+    assert polling.new_alerts(retitled).empty
+
+
+def test_session_bars_collapse_minute_download():
+    index = pd.date_range("2025-03-03 09:30", periods=4, freq="min", tz="America/New_York")
+    raw = pd.concat({
+        "AAA": pd.DataFrame({"Open": [10, 11, 12, 13], "High": [11, 14, 12, 13], "Low": [9, 10, 8, 12],
+                             "Close": [10.5, 12, 11, 12.5], "Volume": [100, 200, 300, 400]}, index=index, dtype=float),
+        "BBB": pd.DataFrame({"Open": [np.nan, 20, 21, 22], "High": [np.nan, 21, 22, 23], "Low": [np.nan, 19, 20, 21],
+                             "Close": [np.nan, 20.5, 21.5, np.nan], "Volume": [np.nan, 10, 10, np.nan]}, index=index),
+    }, axis=1)
+    session, bars = session_bars(raw, ["AAA", "BBB", "CCC"])
+    assert session == pd.Timestamp("2025-03-03")
+    assert bars.loc["AAA"].tolist() == [10, 14, 8, 12.5, 1000]
+    assert bars.loc["BBB"].tolist() == [20, 23, 19, 21.5, 20]
+    assert bars.loc["CCC"].isna().all()
+
+
+class MinuteDownload:
+    """yf.download stand-in over a fixed minute history; the newest visible minute is still forming."""
+
+    def __init__(self, raw: pd.DataFrame):
+        self.raw, self.now, self.calls = raw, 0, []
+
+    def visible(self) -> pd.DataFrame:
+        raw = self.raw.iloc[:self.now].copy()
+        forming = raw.index[-1]
+        raw.loc[forming, (slice(None), "Close")] = raw.loc[forming, (slice(None), "Open")].to_numpy()
+        raw.loc[forming, (slice(None), "Volume")] = 1.0
+        return raw
+
+    def __call__(self, tickers, start=None, period=None, **kwargs):
+        self.calls.append(start if start is not None else period)
+        raw = self.visible()
+        return raw[raw.index.normalize() == raw.index[-1].normalize()] if start is None else raw[raw.index >= start]
+
+
+def test_yahoo_feed_fetches_only_new_minutes():
+    rng = np.random.default_rng(4)
+    index = pd.date_range("2025-03-03 15:50", "2025-03-04 09:40", freq="min", tz="America/New_York")
+    index = index[(index.time >= pd.Timestamp("09:30").time()) & (index.time < pd.Timestamp("16:00").time())]
+    raw = pd.concat({t: pd.DataFrame({
+        "Open": 100 + rng.normal(0, 1, len(index)), "High": 102 + rng.normal(0, 1, len(index)),
+        "Low": 98 + rng.normal(0, 1, len(index)), "Close": 100 + rng.normal(0, 1, len(index)),
+        "Volume": rng.integers(1, 100, len(index)).astype(float)}, index=index) for t in ("AAA", "BBB")}, axis=1)
+    raw.loc[index[3:6], ("BBB", slice(None))] = np.nan
+
+    download = MinuteDownload(raw)
+    feed = YahooQuoteFeed(download)
+    for now in (2, 3, 7, 8, 10, 12, 16, len(index)):
+        download.now = now
+        session, bars = feed.snapshot(["AAA", "BBB"])
+        visible = download.visible()
+        expected_session, expected = session_bars(visible[visible.index.normalize() == visible.index[-1].normalize()], ["AAA", "BBB"])
+        assert session == expected_session
+        pd.testing.assert_frame_equal(bars, expected, check_exact=False)
+    assert download.calls[0] == "1d" and all(isinstance(start, pd.Timestamp) for start in download.calls[1:])
+
+
+if __name__ == "__main__":
+    test_live_bar_matches_full_recompute()
+    test_stored_bar_for_the_session_is_replaced()
+    test_polling_cycles_are_fast_and_alert_once()
+    test_new_session_reloads_history()
+    test_or_group_alerts_once_as_its_title_changes()
+    test_session_bars_collapse_minute_download()
+    test_yahoo_feed_fetches_only_new_minutes()
+    print("All polling tests passed.")
@@ -0,0 +1,79 @@
+import numpy as np
+from data.quality import check_data_quality
+from indicators.momentum import MACDIndicator, RSIIndicator
+from indicators.trend import EMAIndicator
+from indicators.base import IndicatorContext
+from logic.evaluator import compile_group, evaluate_groups
+from logic.runner import exclude_bad_data, required_history
+from test_indicators import make_close_matrix
+
+
+def make_flawed_close():
+    close = make_close_matrix(num_tickers=6, num_days=120)
+    close.iloc[-5:, 1] = np.nan      # T1: stopped trading 5 sessions ago
+    close.iloc[40:48, 2] = np.nan    # T2: 8-bar hole mid-history
+    close.iloc[:100, 3] = np.nan     # T3: listed 20 bars ago
+    close.iloc[60:62, 4] = np.nan    # T4: short gap, tolerated
+    close.iloc[:, 5] = np.nan        # T5: nothing fetched
+    return close
+
+
+def test_flags_stale_gappy_short_and_missing():
+    issues = check_data_quality(make_flawed_close(), tickers=[f"T{i}" for i in range(7)], min_history=50)
+    assert dict(zip(issues["Ticker"], issues["Issue"])) == {
+        "T1": "Stale", "T2": "Gaps", "T3": "Short history", "T5": "No data", "T6": "No data",
+    }
+    assert issues.set_index("Ticker").at["T2", "Detail"] == "8 consecutive missing bars"
+
+
+def test_clean_matrix_has_no_issues():
+    assert check_data_quality(make_close_matrix(), min_history=200).empty
+
+
+def test_required_history_uses_longest_lookback():
+    compiled = [
+        compile_group({"conditions": [{"indicator": "RSI", "period": 14}, {"indicator": "Price vs EMA", "period": 50}]}),
+        compile_group({"conditions": [{"indicator": "MACD", "fast": 12, "slow": 26, "signal": 9}, {"indicator": "Nope"}]}),
+    ]
+    assert required_history(compiled) == 51
+    assert RSIIndicator(14).lookback == 15 and EMAIndicator(200).lookback == 201
+    assert MACDIndicator(12, 26, 9).lookback == 35
+
+
+def test_flagged_tickers_dropped_from_every_field():
+    close = make_flawed_close()
+    prices = {"Close": close, "Volume": close * 1000}
+    clean, issues = exclude_bad_data(prices, list(close.columns), min_history=50)
+    # The short-history ticker stays in; only its longer conditions are skipped
+    assert list(clean["Close"].columns) == ["T0", "T3", "T4"]
+    assert list(clean["Volume"].columns) == ["T0", "T3", "T4"]
+    assert len(issues) == 4
+
+
+def test_short_history_only_blocks_longer_conditions():
+    close = make_close_matrix(num_tickers=3, num_days=300)
+    close.iloc[:250, 2] = np.nan  # T2: 50 bars, enough for RSI(14) but not EMA(200)
+    groups = [
+        {"name": "RSI", "conditions": [{"indicator": "RSI", "period": 14, "operator": "<", "value": 101}]},
+        {"name": "Trend", "conditions": [{"indicator": "Price vs EMA", "period": 200, "operator": ">"},
+                                         {"indicator": "RSI", "period": 14, "operator": "<", "value": 101}]},
+        {"name": "Either", "logic": "OR", "conditions": [{"indicator": "Price vs EMA", "period": 200, "operator": ">"},
+                                                         {"indicator": "RSI", "period": 14, "operator": "<", "value": 101}]},
+    ]
+    ctx = IndicatorContext(close)
+    hits = evaluate_groups(ctx, groups).table
+    t2_rules = {title.split("]")[0] + "]" for title in hits.loc[hits["Ticker"] == "T2", "Group"]}
+    assert t2_rules == {"[RSI]", "[Either]"}
+    assert not hits.loc[hits["Ticker"] == "T2", "Group"].str.contains("EMA").any()
+    # Replayed views count bars up to their own row
+    early = evaluate_groups(ctx.at(260), groups).table
+    assert "T2" not in set(early["Ticker"])
+
+
+if __name__ == "__main__":
+    test_flags_stale_gappy_short_and_missing()
+    test_clean_matrix_has_no_issues()
+    test_required_history_uses_longest_lookback()
+    test_flagged_tickers_dropped_from_every_field()
+    test_short_history_only_blocks_longer_conditions()
+    print("All data quality tests passed.")
@@ -0,0 +1,49 @@
+import io
+import pandas as pd
+from indicators.base import IndicatorContext
+from logic.evaluator import evaluate_groups
+from utils.formatting import format_discord_table
+from test_indicators import make_close_matrix
+
+GROUPS = [
+    {"name": "Oversold", "logic": "AND", "conditions": [{"indicator": "RSI", "period": 14, "operator": "<", "value": 60}]},
+    {"name": "Trend", "logic": "AND", "conditions": [{"indicator": "Days Above EMA", "period": 7, "operator": ">=", "value": 0}]},
+]
+
+
+def make_results():
+    close = make_close_matrix(num_tickers=6)
+    categories = {t: ("Tech" if i % 2 else "Energy") for i, t in enumerate(close.columns)}
+    return evaluate_groups(IndicatorContext(close, categories=categories), GROUPS)
+
+
+def test_rows_ordered_by_ticker_then_group():
+    results = make_results()
+    assert list(results.table.columns[:4]) == ["Group", "Ticker", "Category", "Price"]
+    tickers = results.table["Ticker"].tolist()
+    assert tickers == sorted(tickers, key=lambda t: int(t[1:]))
+    assert "[Trend] Above EMA(7) >= 0d" in results.groups
+
+
+def test_group_table_keeps_own_columns_and_int_dtype():
+    results = make_results()
+    trend = results.group_table("[Trend] Above EMA(7) >= 0d")
+    assert list(trend.columns) == ["Ticker", "Category", "Price", "EMA(7)", "Days>EMA(7)"]
+    assert str(trend["Days>EMA(7)"].dtype) == "Int64"
+    assert len(trend) == 6
+
+
+def test_csv_round_trip_and_table_rendering():
+    results = make_results()
+    exported = pd.read_csv(io.StringIO(results.to_csv()))
+    assert len(exported) == len(results)
+
+    text = format_discord_table(results.group_table(results.groups[0]))
+    assert text.startswith("```") and "Ticker" in text
+
+
+if __name__ == "__main__":
+    test_rows_ordered_by_ticker_then_group()
+    test_group_table_keeps_own_columns_and_int_dtype()
+    test_csv_round_trip_and_table_rendering()
+    print("All results tests passed.")
@@ -0,0 +1,98 @@
+import os
+import pandas as pd
+from logic.routing import route_results
+from logic.evaluator import evaluate_groups
+from indicators.base import IndicatorContext
+from utils.discord_sender import build_result_payloads
+from test_results import GROUPS, make_results
+from test_indicators import make_close_matrix
+
+
+ROUTE_WEBHOOKS = {"TEST_ENERGY_WEBHOOK": "http://energy", "TEST_OVERSOLD_WEBHOOK": "http://oversold"}
+
+
+def routed_by_name(results, config):
+    os.environ.update(ROUTE_WEBHOOKS)
+    try:
+        return {name: (url, subset) for name, url, subset in route_results(results, config)}
+    finally:
+        for var in ROUTE_WEBHOOKS:
+            del os.environ[var]
+
+
+def test_unrouted_alerts_go_to_default_webhook():
+    results = make_results()
+    results.data_issues = pd.DataFrame([("OLD", "Stale", "Last bar 2024-01-29 is 80 sessions old")],
+                                       columns=["Ticker", "Issue", "Detail"])
+    routed = routed_by_name(results, {"webhook_url": "http://default", "routes": []})
+    assert list(routed) == ["Default"]
+    url, subset = routed["Default"]
+    assert url == "http://default"
+    assert subset.table.equals(results.table)
+    assert subset.data_issues.equals(results.data_issues)
+
+
+def test_routes_filter_by_group_and_category():
+    results = make_results()
+    config = {
+        "webhook_url": "http://default",
+        "routes": [
+            {"name": "Energy desk", "webhook_env": "TEST_ENERGY_WEBHOOK", "categories": ["Energy"]},
+            {"name": "Oversold", "webhook_env": "TEST_OVERSOLD_WEBHOOK", "groups": ["Oversold"], "categories": ["Tech"]},
+        ],
+    }
+    routed = routed_by_name(results, config)
+    assert routed["Energy desk"][0] == "http://energy"
+
+    energy = routed["Energy desk"][1].table
+    assert set(energy["Category"]) == {"Energy"} and len(energy) == (results.table["Category"] == "Energy").sum()
+
+    oversold = routed["Oversold"][1]
+    assert set(oversold.table["Category"]) == {"Tech"}
+    assert all(title.startswith("[Oversold]") for title in oversold.groups)
+    assert set(oversold.group_columns) == set(oversold.groups)
+
+    # Only Tech rows of other groups are left for the default webhook
+    default = routed["Default"][1]
+    assert set(default.table["Category"]) == {"Tech"}
+    assert not any(title.startswith("[Oversold]") for title in default.groups)
+    assert len(energy) + len(oversold) + len(default) == len(results)
+
+
+def test_routes_sharing_a_webhook_are_merged_and_env_webhooks_resolved():
+    os.environ["TEST_ROUTE_WEBHOOK"] = "http://team"
+    try:
+        results = make_results()
+        config = {
+            "webhook_url": "",
+            "routes": [
+                {"name": "A", "webhook_env": "TEST_ROUTE_WEBHOOK", "groups": ["Oversold"]},
+                {"name": "B", "webhook_env": "TEST_ROUTE_WEBHOOK", "groups": ["Trend"]},
+                {"name": "Missing", "webhook_env": "NO_SUCH_WEBHOOK_VAR"},
+            ],
+        }
+        routed = route_results(results, config)
+        assert [(name, url) for name, url, _ in routed] == [("A, B", "http://team")]
+        assert len(routed[0][2]) == len(results)
+    finally:
+        del os.environ["TEST_ROUTE_WEBHOOK"]
+
+
+def test_destination_payloads_only_mention_their_rows():
+    close = make_close_matrix(num_tickers=6)
+    categories = {t: ("Tech" if i % 2 else "Energy") for i, t in enumerate(close.columns)}
+    results = evaluate_groups(IndicatorContext(close, categories=categories), GROUPS)
+    config = {"webhook_url": "", "routes": [{"name": "Energy", "webhook_env": "TEST_ENERGY_WEBHOOK", "categories": ["Energy"]}]}
+
+    [(_, subset)] = routed_by_name(results, config).values()
+    text = "\n".join(p["content"] for p, _ in build_result_payloads(subset, mode="text"))
+    for i, ticker in enumerate(close.columns):
+        assert (ticker in text) == (i % 2 == 0)
+
+
+if __name__ == "__main__":
+    test_unrouted_alerts_go_to_default_webhook()
+    test_routes_filter_by_group_and_category()
+    test_routes_sharing_a_webhook_are_merged_and_env_webhooks_resolved()
+    test_destination_payloads_only_mention_their_rows()
+    print("All routing tests passed.")
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from data.store import PriceStore
+from logic.runner import build_price_matrices
+
+DATES = pd.bdate_range("2024-01-01", periods=120)
+
+
+def make_bars(seed, dates=DATES):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": rng.integers(1_000, 2_000, len(dates)).astype(float)}, index=dates)
+
+
+class FakeMarket:
+    """Serves yfinance-shaped downloads from in-memory histories, visible up to `today`."""
+
+    def __init__(self, histories, today):
+        self.histories = histories
+        self.today = today
+        self.calls = []
+
+    def __call__(self, tickers, period="2y", start=None):
+        self.calls.append((tuple(tickers), start))
+        frames = {}
+        for t in tickers:
+            if t not in self.histories:
+                continue
+            df = self.histories[t]
+            df = df[df.index <= self.today]
+            frames[t] = df[df.index >= pd.Timestamp(start)] if start else df
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+
+def make_store(market):
+    return PriceStore(tempfile.mkdtemp(), fetch=market, period="max")
+
+
+def test_incremental_update_appends_new_bars():
+    market = FakeMarket({"AAA": make_bars(0), "BBB": make_bars(1)}, today=DATES[99])
+    store = make_store(market)
+    assert store.update(["AAA", "BBB"]) == set()
+    assert market.calls[-1] == (("AAA", "BBB"), None)
+
+    market.today = DATES[-1]
+    assert store.update(["AAA", "BBB"]) == set()
+    # Second update only asks for the overlapping tail
+    assert market.calls[-1][1] is not None and len(market.calls) == 2
+    pd.testing.assert_frame_equal(store.history("AAA"), market.histories["AAA"], check_freq=False)
+    assert store.revision("AAA") == 0
+
+
+def test_stale_ticker_does_not_widen_other_tails():
+    old = make_bars(2)
+    market = FakeMarket({"AAA": make_bars(0), "BBB": make_bars(1), "OLD": old[old.index <= DATES[20]]}, today=DATES[99])
+    store = make_store(market)
+    store.update(["AAA", "BBB", "OLD"])
+
+    market.today = DATES[-1]
+    store.update(["AAA", "BBB", "OLD"])
+    tails = {tickers: pd.Timestamp(start) for tickers, start in market.calls[1:]}
+    assert set(tails) == {("OLD",), ("AAA", "BBB")}
+    assert tails[("AAA", "BBB")] == DATES[99] - pd.Timedelta(days=store.overlap_days)
+    assert tails[("OLD",)] == DATES[20] - pd.Timedelta(days=store.overlap_days)
+    assert store.last_update == {"hit": 3, "miss": 0, "adjusted": 0}
+
+
+def test_dividend_adjustment_invalidates_only_that_ticker():
+    market = FakeMarket({"AAA": make_bars(0), "BBB": make_bars(1)}, today=DATES[99])
+    store = make_store(market)
+    store.update(["AAA", "BBB"])
+
+    # A dividend on AAA: every past price is scaled down by 0.5%
+    adjusted = market.histories["AAA"].copy()
+    adjusted.loc[:, ["Open", "High", "Low", "Close"]] *= 0.995
+    market.histories["AAA"] = adjusted
+    market.today = DATES[-1]
+
+    assert store.update(["AAA", "BBB"]) == {"AAA"}
+    assert market.calls[-1] == (("AAA",), None)
+    pd.testing.assert_frame_equal(store.history("AAA"), adjusted, check_freq=False)
+    assert store.revision("AAA") == 1 and store.revision("BBB") == 0
+
+    # Revisions survive a restart
+    assert PriceStore(store.path, fetch=market).revision("AAA") == 1
+
+
+def test_unfinished_last_bar_is_not_an_adjustment():
+    market = FakeMarket({"AAA": make_bars(0)}, today=DATES[99])
+    store = make_store(market)
+    store.update(["AAA"])
+
+    # The last stored bar was taken intraday; its final close differs
+    final = market.histories["AAA"].copy()
+    final.loc[DATES[99], "Close"] *= 1.02
+    market.histories["AAA"] = final
+    market.today = DATES[-1]
+
+    assert store.update(["AAA"]) == set()
+    assert store.history("AAA").at[DATES[99], "Close"] == final.at[DATES[99], "Close"]
+
+
+def test_load_matches_a_direct_download():
+    market = FakeMarket({"AAA": make_bars(0), "BBB": make_bars(1)}, today=DATES[-1])
+    store = make_store(market)
+    raw = store.refresh(["AAA", "BBB", "ZZZ"])
+    prices = build_price_matrices(raw, ["AAA", "BBB", "ZZZ"])
+    direct = build_price_matrices(market(["AAA", "BBB"]), ["AAA", "BBB"])
+    pd.testing.assert_frame_equal(prices["Close"], direct["Close"], check_freq=False)
+    assert sorted(f for f in os.listdir(store.path) if not f.startswith(".")) == ["AAA.parquet", "BBB.parquet"]
+
+
+if __name__ == "__main__":
+    test_incremental_update_appends_new_bars()
+    test_stale_ticker_does_not_widen_other_tails()
+    test_dividend_adjustment_invalidates_only_that_ticker()
+    test_unfinished_last_bar_is_not_an_adjustment()
+    test_load_matches_a_direct_download()
+    print("All price store tests passed.")
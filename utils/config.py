@@ -1,5 +1,10 @@
+import atexit
+import copy
+import hashlib
 import json
 import os
+import tempfile
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +16,9 @@ DEFAULT_CONFIG = {
         "Default": ["AAPL", "MSFT", "GOOGL", "TSLA", "SPY"]
     },
     "webhook_url": "",
+    "delivery_mode": "auto",
+    # Extra webhooks, each receiving the alerts of the listed groups/categories
+    "routes": [],
     "groups": [
         {
             "name": "Oversold RSI < 30",
@@ -22,17 +30,98 @@ DEFAULT_CONFIG = {
     ]
 }
 
+# Keys that live outside config.json
+NON_PERSISTED_KEYS = {"webhook_url"}
 
-def load_config() -> dict:
-    """Load config from config.json, with webhook_url sourced from .env."""
-    if not os.path.exists(CONFIG_FILE):
-        config = DEFAULT_CONFIG.copy()
+
+def validate_config(config) -> tuple[dict, list[str]]:
+    """
+    Check the config structure once at load time, repairing what can be repaired.
+    Returns (config, warnings). Broken sections fall back to their defaults; malformed
+    entries inside a valid section are dropped.
+    """
+    warnings = []
+    if not isinstance(config, dict):
+        return copy.deepcopy(DEFAULT_CONFIG), ["Config is not a JSON object; using defaults."]
+
+    categories = config.get("ticker_categories")
+    if not isinstance(categories, dict):
+        warnings.append("'ticker_categories' must be an object of category -> tickers; using defaults.")
+        config["ticker_categories"] = copy.deepcopy(DEFAULT_CONFIG["ticker_categories"])
+    else:
+        for name, tickers in list(categories.items()):
+            if not isinstance(tickers, list):
+                warnings.append(f"Category '{name}' is not a list of tickers; dropped.")
+                del categories[name]
+                continue
+            cleaned = [str(t).strip().upper() for t in tickers if str(t).strip()]
+            categories[name] = list(dict.fromkeys(cleaned))
+
+    groups = config.get("groups")
+    if not isinstance(groups, list):
+        warnings.append("'groups' must be a list; using defaults.")
+        config["groups"] = copy.deepcopy(DEFAULT_CONFIG["groups"])
+    else:
+        valid_groups = []
+        for i, group in enumerate(groups):
+            if not isinstance(group, dict):
+                warnings.append(f"Group #{i + 1} is not an object; dropped.")
+                continue
+            if group.get("logic", "AND") not in ("AND", "OR"):
+                warnings.append(f"Group '{group.get('name')}' has unknown logic '{group.get('logic')}'; using AND.")
+                group["logic"] = "AND"
+            conditions = group.get("conditions", [])
+            if not isinstance(conditions, list):
+                conditions = []
+            group["conditions"] = [c for c in conditions if isinstance(c, dict) and c.get("indicator")]
+            if len(group["conditions"]) != len(conditions):
+                warnings.append(f"Group '{group.get('name')}' had malformed conditions; dropped them.")
+            valid_groups.append(group)
+        config["groups"] = valid_groups
+
+    routes = config.get("routes", [])
+    if not isinstance(routes, list):
+        warnings.append("'routes' must be a list; ignoring it.")
+        routes = []
+    valid_routes = []
+    for i, route in enumerate(routes):
+        if not isinstance(route, dict):
+            warnings.append(f"Route #{i + 1} is not an object; dropped.")
+            continue
+        for key in ("groups", "categories"):
+            if not isinstance(route.get(key, []), list):
+                warnings.append(f"Route '{route.get('name')}' has a non-list '{key}'; matching all instead.")
+                route[key] = []
+        if "webhook_url" in route:
+            route.pop("webhook_url")
+            warnings.append(f"Route '{route.get('name')}' has a literal webhook_url; dropped it. "
+                            "Put the URL in .env and set the route's webhook_env to the variable name.")
+        valid_routes.append(route)
+    config["routes"] = valid_routes
+
+    return config, warnings
+
+
+def section_hash(config: dict, section: str) -> str:
+    """Stable hash of one top-level config section (canonical JSON)."""
+    raw = json.dumps(config.get(section), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load_config(path: str = CONFIG_FILE) -> dict:
+    """Load and validate config from config.json, with webhook_url sourced from .env."""
+    if not os.path.exists(path):
+        config = copy.deepcopy(DEFAULT_CONFIG)
     else:
         try:
-            with open(CONFIG_FILE, "r") as f:
+            with open(path, "r") as f:
                 config = json.load(f)
         except Exception:
-            config = DEFAULT_CONFIG.copy()
+            config = copy.deepcopy(DEFAULT_CONFIG)
+
+    config, warnings = validate_config(config)
+    for warning in warnings:
+        print(f"Config warning: {warning}")
 
     # Always prefer .env for webhook_url (keeps secrets out of config.json)
     env_webhook = os.getenv("DISCORD_WEBHOOK_URL", "")
@@ -42,13 +131,115 @@ def load_config() -> dict:
     return config
 
 
-def save_config(config: dict) -> bool:
-    """Save config to config.json, excluding webhook_url (stored in .env)."""
+def save_config(config: dict, path: str = CONFIG_FILE) -> bool:
+    """
+    Save config to config.json, excluding webhook URLs (stored in .env), including any
+    literal webhook_url set on a route.
+    Written to a temp file in the same directory and renamed over the original,
+    so a crash mid-write never leaves a truncated config.json.
+    """
     # Don't persist webhook_url to config.json — it lives in .env
-    config_to_save = {k: v for k, v in config.items() if k != "webhook_url"}
+    config_to_save = {k: v for k, v in config.items() if k not in NON_PERSISTED_KEYS}
+    if isinstance(config_to_save.get("routes"), list):
+        config_to_save["routes"] = [
+            {k: v for k, v in route.items() if k not in NON_PERSISTED_KEYS} if isinstance(route, dict) else route
+            for route in config_to_save["routes"]
+        ]
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = None
     try:
-        with open(CONFIG_FILE, "w") as f:
+        with tempfile.NamedTemporaryFile("w", dir=directory, prefix=".config-", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
             json.dump(config_to_save, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
         return True
     except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
+
+
+class ConfigStore:
+    """
+    The live config plus change tracking and debounced, atomic persistence.
+
+    Call `update()` after editing `config` in place: it rehashes each top-level section,
+    bumps `version` if anything changed and schedules a write `debounce_seconds` after the
+    last edit, so a burst of sidebar edits becomes one write. `hashes` lets downstream
+    caches (ticker universe, compiled rules) key on just the section they depend on.
+
+    The config is copied for writing inside `update()`, on the editing thread: the timer
+    thread only writes that copy, so it never reads dicts that are being edited.
+    """
+
+    def __init__(self, path: str = CONFIG_FILE, debounce_seconds: float = 1.0, config: dict | None = None):
+        self.path = path
+        self.debounce_seconds = debounce_seconds
+        self.config = config if config is not None else load_config(path)
+        self.version = 0
+        self.hashes = {section: section_hash(self.config, section) for section in self.config}
+        # Version at which each section last changed
+        self.section_versions = {section: 0 for section in self.config}
+        self._persisted_hashes = dict(self.hashes)
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        # (config copy, hashes) taken by the last update() that left unsaved changes
+        self._pending: tuple[dict, dict] | None = None
+        atexit.register(self.flush)
+
+    def update(self) -> set[str]:
+        """Record edits made to `config`. Returns the names of the sections that changed."""
+        with self._lock:
+            changed = set()
+            for section in set(self.config) | set(self.hashes):
+                new_hash = section_hash(self.config, section)
+                if self.hashes.get(section) != new_hash:
+                    self.hashes[section] = new_hash
+                    changed.add(section)
+
+            if changed:
+                self.version += 1
+                for section in changed:
+                    self.section_versions[section] = self.version
+
+            if self._is_dirty():
+                if changed or self._pending is None:
+                    self._pending = (copy.deepcopy(self.config), dict(self.hashes))
+                self._schedule_write()
+            else:
+                self._pending = None
+        return changed
+
+    def changed_since(self, version: int) -> set[str]:
+        """Sections modified after the given version."""
+        return {s for s, v in self.section_versions.items() if v > version}
+
+    def _is_dirty(self) -> bool:
+        return any(
+            self.hashes.get(s) != self._persisted_hashes.get(s)
+            for s in set(self.hashes) | set(self._persisted_hashes) if s not in NON_PERSISTED_KEYS
+        )
+
+    def _schedule_write(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce_seconds, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> bool:
+        """Write pending changes now. Returns False only if a write was needed and failed."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return True
+            snapshot, hashes = self._pending
+            if not save_config(snapshot, self.path):
+                return False
+            self._persisted_hashes = hashes
+            self._pending = None
+            return True
@@ -1,4 +1,9 @@
+import json
+import time
 import requests
+from logic.results import AlertResults
+from utils.formatting import format_cell, render_table_block
+from utils.metrics import DISCORD_REQUESTS, DISCORD_SECONDS, timed
 
 
 def send_discord_message(webhook_url: str, content: str) -> tuple[bool, str]:
@@ -6,13 +11,45 @@ def send_discord_message(webhook_url: str, content: str) -> tuple[bool, str]:
     Send a single message to a Discord Webhook.
     Returns (success, message).
     """
+    return send_discord_payload(webhook_url, {"content": content})
+
+
+def post_discord_payload(webhook_url: str, payload: dict, files: dict | None = None) -> requests.Response:
+    """
+    Make one webhook request: plain JSON, or multipart with `payload_json` when files are attached.
+    files: mapping of filename -> (bytes, content type). Raises on connection errors.
+    Every request is counted by status and timed in the metrics registry.
+    """
+    start = time.perf_counter()
+    status = "error"
+    try:
+        if files:
+            multipart = {
+                f"files[{i}]": (name, data, content_type)
+                for i, (name, (data, content_type)) in enumerate(files.items())
+            }
+            response = requests.post(webhook_url, data={"payload_json": json.dumps(payload)}, files=multipart, timeout=30)
+        else:
+            response = requests.post(webhook_url, json=payload, timeout=30)
+        status = str(response.status_code)
+        return response
+    finally:
+        DISCORD_SECONDS.observe(time.perf_counter() - start)
+        DISCORD_REQUESTS.inc(status=status)
+
+
+def send_discord_payload(webhook_url: str, payload: dict, files: dict | None = None) -> tuple[bool, str]:
+    """
+    Send one webhook request (see post_discord_payload).
+    Returns (success, message).
+    """
     if not webhook_url:
         return False, "No Webhook URL provided"
 
-    data = {"content": content}
     try:
-        response = requests.post(webhook_url, json=data)
-        if response.status_code == 204:
+        response = post_discord_payload(webhook_url, payload, files)
+        # 204 for plain webhook calls, 200 when Discord echoes the message (e.g. ?wait=true)
+        if response.status_code in (200, 204):
             return True, "Message sent successfully"
         else:
             return False, f"Failed to send message: {response.status_code} - {response.text}"
@@ -23,32 +60,83 @@ def send_discord_message(webhook_url: str, content: str) -> tuple[bool, str]:
 DISCORD_CHAR_LIMIT = 2000
 
 
-def batch_discord_messages(all_alerts_text: list[str], header: str = "**Stock Alerts Triggered**") -> list[str]:
+def split_text_block(text: str, limit: int) -> list[str]:
+    """
+    Split a plain text alert at line boundaries into pieces of at most `limit` chars.
+    A ``` code block cut in the middle is closed and reopened so every piece renders.
+    Lines longer than the limit are hard-wrapped.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    # Room left on a line after the reopened fence and the closing "\n```"
+    max_line = max(limit - 8, 1)
+    lines = []
+    for line in text.split("\n"):
+        lines.extend(line[k:k + max_line] for k in range(0, max(len(line), 1), max_line))
+
+    pieces, current, size = [], [], 0
+    in_code = False
+    for line in lines:
+        if current and size + 1 + len(line) + 4 > limit:
+            if in_code:
+                current.append("```")
+            pieces.append("\n".join(current))
+            current = ["```"] if in_code else []
+            size = 3 if in_code else 0
+        size += len(line) + (1 if current else 0)
+        current.append(line)
+        if line.startswith("```"):
+            in_code = not in_code
+
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def pack_into_messages(pieces: list[str], capacity: int) -> list[list[str]]:
+    """
+    Pack alert pieces into messages without reordering them: a piece joins the current
+    message if it fits, otherwise it starts the next one. Keeping the order means a split
+    table's "(cont.)" chunks always follow its first chunk and groups arrive in config
+    order; for a fixed order this greedy fill also gives the fewest messages.
+    Each piece costs its length plus 2 for the blank-line separator.
+    """
+    messages: list[list[str]] = []
+    free = 0
+    for piece in pieces:
+        cost = len(piece) + 2
+        if not messages or cost > free:
+            messages.append([])
+            free = capacity
+        messages[-1].append(piece)
+        free -= cost
+    return messages
+
+
+def batch_discord_messages(all_alerts_text: list, header: str = "**Stock Alerts Triggered**") -> list[str]:
     """
     Batch alert texts into Discord-safe messages that respect the character limit.
+    Items may be plain strings or utils.formatting.TableBlock objects; anything too large
+    for one message is split (tables at row boundaries, repeating their header) and the
+    pieces are packed, in order, into as few messages as possible.
     Returns a list of ready-to-send message strings (with header and pagination).
     """
     if not all_alerts_text:
         return []
 
-    messages_to_send = []
-    current_parts = []
     # Reserve space for header, page numbers like (1/2), and newlines
-    current_length = len(header) + 20
+    capacity = DISCORD_CHAR_LIMIT - (len(header) + 20)
+    piece_limit = capacity - 2  # for \n\n separator
 
+    pieces = []
     for group_alert in all_alerts_text:
-        alert_len = len(group_alert) + 2  # for \n\n separator
-
-        if current_parts and current_length + alert_len > DISCORD_CHAR_LIMIT:
-            messages_to_send.append("\n\n".join(current_parts))
-            current_parts = []
-            current_length = len(header) + 20
-
-        current_parts.append(group_alert)
-        current_length += alert_len
+        if isinstance(group_alert, str):
+            pieces.extend(split_text_block(group_alert, piece_limit))
+        else:
+            pieces.extend(group_alert.split(piece_limit))
 
-    if current_parts:
-        messages_to_send.append("\n\n".join(current_parts))
+    messages_to_send = ["\n\n".join(parts) for parts in pack_into_messages(pieces, capacity)]
 
     # Attach headers with pagination
     num_messages = len(messages_to_send)
@@ -62,15 +150,21 @@ def batch_discord_messages(all_alerts_text: list[str], header: str = "**Stock Al
     return final_messages
 
 
-def send_batched_notifications(webhook_url: str, all_alerts_text: list[str]) -> tuple[int, int, list[str]]:
+def send_batched_notifications(webhook_url: str, all_alerts_text: list) -> tuple[int, int, list[str]]:
     """
     Batch and send all alert texts to Discord.
     Returns (success_count, total_count, error_messages).
     """
-    messages = batch_discord_messages(all_alerts_text)
+    with timed("batch"):
+        messages = batch_discord_messages(all_alerts_text)
     if not messages:
         return 0, 0, []
 
+    with timed("send"):
+        return _send_messages(webhook_url, messages)
+
+
+def _send_messages(webhook_url: str, messages: list[str]) -> tuple[int, int, list[str]]:
     success_count = 0
     errors = []
 
@@ -78,7 +172,7 @@ def send_batched_notifications(webhook_url: str, all_alerts_text: list[str]) ->
         if len(full_msg) > DISCORD_CHAR_LIMIT:
             errors.append(
                 f"Message {i + 1}/{len(messages)} is too long ({len(full_msg)} chars) "
-                f"and could not be sent. This can happen if a single group's alert is too large."
+                f"and could not be sent."
             )
             continue
 
@@ -89,3 +183,163 @@ def send_batched_notifications(webhook_url: str, all_alerts_text: list[str]) ->
             errors.append(f"Discord Error on message {i + 1}/{len(messages)}: {resp}")
 
     return success_count, len(messages), errors
+
+
+# --- Embed and file-attachment delivery ---
+
+DELIVERY_MODES = ["auto", "text", "embeds", "file"]
+EMBEDS_PER_MESSAGE = 10
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TITLE_LIMIT = 256
+EMBEDS_TOTAL_CHAR_LIMIT = 6000
+EMBED_COLOR = 0xE67E22
+
+
+def format_embed_line(row: dict, stat_columns: list[str]) -> str:
+    """One compact line per ticker: `AAPL` 182.3 · RSI 28.1 · EMA(21) 180.02"""
+    parts = [f"`{row['Ticker']}` {format_cell(row.get('Price'))}"]
+    parts.extend(f"{col} {format_cell(row.get(col))}" for col in stat_columns)
+    return " · ".join(parts)
+
+
+def build_result_embeds(results: AlertResults) -> list[dict]:
+    """
+    One embed per group title (continued in further embeds when the description limit is hit),
+    with one line per triggered ticker, grouped under bold category labels.
+    """
+    embeds = []
+    for title in results.groups:
+        table = results.group_table(title)
+        stat_columns = [c for c in table.columns if c not in ("Ticker", "Category", "Price")]
+        lines, category = [], None
+        for row in table.to_dict("records"):
+            if row.get("Category") != category:
+                category = row.get("Category")
+                lines.append(f"**{category}**")
+            lines.append(format_embed_line(row, stat_columns))
+
+        embed_title = title[:EMBED_TITLE_LIMIT]
+        description = []
+        size = 0
+        for line in lines:
+            if description and size + len(line) + 1 > EMBED_DESCRIPTION_LIMIT:
+                embeds.append({"title": embed_title, "description": "\n".join(description), "color": EMBED_COLOR})
+                embed_title = f"{title[:EMBED_TITLE_LIMIT - 8]} (cont.)"
+                description, size = [], 0
+            description.append(line[:EMBED_DESCRIPTION_LIMIT])
+            size += len(line) + 1
+        if description:
+            embeds.append({"title": embed_title, "description": "\n".join(description), "color": EMBED_COLOR})
+    return embeds
+
+
+def pack_embeds(embeds: list[dict]) -> list[list[dict]]:
+    """Group embeds in order into requests of at most 10 embeds and 6000 embed characters."""
+    batches, current, size = [], [], 0
+    for embed in embeds:
+        embed_size = len(embed["title"]) + len(embed["description"])
+        if current and (len(current) == EMBEDS_PER_MESSAGE or size + embed_size > EMBEDS_TOTAL_CHAR_LIMIT):
+            batches.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += embed_size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_embed_payloads(results: AlertResults, header: str = "**Stock Alerts Triggered**") -> list[dict]:
+    """Webhook payloads carrying the results as embeds, up to 10 per request."""
+    batches = pack_embeds(build_result_embeds(results))
+    return [
+        {"content": header if len(batches) == 1 else f"{header} ({i + 1}/{len(batches)})", "embeds": batch}
+        for i, batch in enumerate(batches)
+    ]
+
+
+def build_file_summary(results: AlertResults, header: str = "**Stock Alerts Triggered**") -> str:
+    """Short message body accompanying the attached CSV: alert counts per group."""
+    lines = [f"{header} — {len(results)} alerts in {len(results.groups)} groups (full table attached)"]
+    counts = results.table["Group"].value_counts(sort=False)
+    for title in results.groups:
+        line = f"• {title}: {counts[title]}"
+        if sum(len(l) + 1 for l in lines) + len(line) + 20 > DISCORD_CHAR_LIMIT:
+            lines.append("• ...")
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_file_payload(results: AlertResults, header: str = "**Stock Alerts Triggered**") -> tuple[dict, dict]:
+    """Webhook payload and attachment for sending the full results table as alerts.csv."""
+    files = {"alerts.csv": (results.to_csv().encode("utf-8"), "text/csv")}
+    return {"content": build_file_summary(results, header)}, files
+
+
+def send_payloads(webhook_url: str, payloads: list[tuple[dict, dict | None]],
+                  label: str = "message") -> tuple[int, int, list[str]]:
+    """
+    Send prepared (payload, files) webhook requests in order.
+    Returns (success_count, total_count, error_messages).
+    """
+    with timed("send"):
+        return _send_payloads(webhook_url, payloads, label)
+
+
+def _send_payloads(webhook_url: str, payloads: list[tuple[dict, dict | None]], label: str) -> tuple[int, int, list[str]]:
+    success_count = 0
+    errors = []
+
+    for i, (payload, files) in enumerate(payloads):
+        success, resp = send_discord_payload(webhook_url, payload, files)
+        if success:
+            success_count += 1
+        else:
+            errors.append(f"Discord Error on {label} {i + 1}/{len(payloads)}: {resp}")
+
+    return success_count, len(payloads), errors
+
+
+def choose_delivery_mode(results: AlertResults, all_alerts_text: list) -> str:
+    """
+    Pick the delivery mode needing the fewest webhook requests: text tables when they fit in
+    one message, else embeds when they fit in one request, else a single CSV attachment.
+    """
+    if len(batch_discord_messages(all_alerts_text)) <= 1:
+        return "text"
+    if len(pack_embeds(build_result_embeds(results))) <= 1:
+        return "embeds"
+    return "file"
+
+
+def build_alert_payloads(results: AlertResults, all_alerts_text: list,
+                         mode: str = "auto") -> list[tuple[dict, dict | None]]:
+    """
+    Prepare the webhook requests for delivering results with the given mode
+    ("auto", "text", "embeds" or "file"), as (payload, files) pairs.
+    all_alerts_text are the rendered group tables used by text mode.
+    """
+    if results.empty:
+        return []
+    if mode == "auto":
+        mode = choose_delivery_mode(results, all_alerts_text)
+    if mode == "embeds":
+        return [(payload, None) for payload in build_embed_payloads(results)]
+    if mode == "file":
+        return [build_file_payload(results)]
+    return [({"content": message}, None) for message in batch_discord_messages(all_alerts_text)]
+
+
+def build_result_payloads(results: AlertResults, mode: str = "auto") -> list[tuple[dict, dict | None]]:
+    """Render each group's table and prepare the requests for one destination's results (see build_alert_payloads)."""
+    blocks = [render_table_block(results.group_table(title), title=title) for title in results.groups]
+    return build_alert_payloads(results, blocks, mode)
+
+
+def send_alert_results(webhook_url: str, results: AlertResults, all_alerts_text: list,
+                       mode: str = "auto") -> tuple[int, int, list[str]]:
+    """
+    Deliver analysis results with the given mode (see build_alert_payloads).
+    Returns (success_count, total_count, error_messages).
+    """
+    return send_payloads(webhook_url, build_alert_payloads(results, all_alerts_text, mode))
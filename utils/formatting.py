@@ -1,77 +1,155 @@
-def format_discord_table(matches: list[dict]) -> str:
+import pandas as pd
+from indicators.registry import stat_column_sort_key
+
+# Columns of a results table that are never rendered as stat columns
+NON_STAT_COLUMNS = {"Group", "Ticker", "Price", "Category"}
+
+
+def format_cell(value) -> str:
+    """Render one table value; missing values show as '-'."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "-"
+    return str(value)
+
+
+class TableBlock:
     """
-    Generates a monospaced ASCII table for Discord with category grouping.
-    matches: list of dicts containing ticker and indicator stats.
-    Each dict may contain a '_category' key for grouping.
+    A group's rendered Discord table, kept as lines so it can be split at row
+    boundaries: every chunk repeats the title, the column header and the current
+    category label, and stays a valid code block.
     """
-    if not matches:
-        return "No matches found."
 
-    # Define Column Order: Ticker first, then Price, then RSI/RCI, then EMAs, then Days>EMA
+    def __init__(self, title: str, head: list[str], rows: list[str], foot: list[str], section_rows: set[int]):
+        self.title = title
+        self.head = head
+        self.rows = rows
+        self.foot = foot
+        # Indexes into `rows` that are category label rows rather than tickers
+        self.section_rows = section_rows
+
+    def _wrap(self, title_line: str, rows: list[str]) -> str:
+        table = "```\n" + "\n".join(self.head + rows + self.foot) + "\n```"
+        return f"{title_line}\n{table}" if title_line else table
+
+    def _title_line(self, continued: bool = False) -> str:
+        if not self.title:
+            return ""
+        return f"**{self.title}**" + (" (cont.):" if continued else ":")
+
+    @property
+    def table_text(self) -> str:
+        """The fenced table without the title line."""
+        return self._wrap("", self.rows)
+
+    def __str__(self) -> str:
+        return self._wrap(self._title_line(), self.rows)
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def split(self, limit: int) -> list[str]:
+        """
+        Split into texts of at most `limit` chars, cutting only between rows. Runs in one pass
+        over the rows. A single row that cannot fit even alone is emitted on its own, and a
+        category label always stays in the same chunk as its first ticker row.
+        """
+        full = str(self)
+        if len(full) <= limit:
+            return [full]
+
+        # Fixed cost of a chunk: continuation title, fences and head/foot lines, plus newlines
+        overhead = len(self._wrap(self._title_line(continued=True), []))
+        chunks, current, size = [], [], overhead
+        section_label = None
+        # Whether `current` holds a ticker row yet (a chunk is never closed on labels alone)
+        has_ticker = False
+
+        for i, row in enumerate(self.rows):
+            is_label = i in self.section_rows
+            if is_label:
+                section_label = row
+            cost = len(row) + 1
+            # A label needs room for the first ticker after it, otherwise it starts the next chunk
+            needed = cost + len(self.rows[i + 1]) + 1 if is_label and i + 1 < len(self.rows) else cost
+            if has_ticker and size + needed > limit:
+                chunks.append(self._wrap(self._title_line(continued=bool(chunks)), current))
+                current, size, has_ticker = [], overhead, False
+                # Repeat the category label if the cut falls inside a category
+                if section_label is not None and i not in self.section_rows:
+                    current.append(section_label)
+                    size += len(section_label) + 1
+            current.append(row)
+            size += cost
+            has_ticker = has_ticker or not is_label
+
+        if current:
+            chunks.append(self._wrap(self._title_line(continued=bool(chunks)), current))
+        return chunks
+
+
+def render_table_block(matches: pd.DataFrame | list[dict], title: str = "") -> TableBlock | None:
+    """
+    Render a results table (see logic.results.AlertResults.group_table) in a single pass over
+    its rows: cells are formatted, column widths measured and rows bucketed by Category together.
+    Returns None when there are no matches.
+    """
+    if isinstance(matches, list):
+        matches = pd.DataFrame(matches).rename(columns={"_category": "Category"})
+
+    if matches.empty:
+        return None
+
+    # Define Column Order: Ticker first, then Price, then indicator stats in the order
+    # their registered indicators declare (RSI/RCI, then EMAs, then Days>EMA, ...)
     # Exclude internal keys (prefixed with _) from headers
-    all_keys = set().union(*(m.keys() for m in matches))
-    all_keys = {k for k in all_keys if not k.startswith("_")}
-    ema_cols = sorted([k for k in all_keys if "EMA" in k and not k.startswith("Days")])
-    days_cols = sorted([k for k in all_keys if k.startswith("Days")])
-
-    # Static priority headers
-    headers = ["Ticker", "Price"]
-    if "RSI" in all_keys:
-        headers.append("RSI")
-    if "RCI" in all_keys:
-        headers.append("RCI")
-    headers.extend(ema_cols)
-    headers.extend(days_cols)
-
-    # Calculate column widths based on longest string in header or data
-    widths = {h: len(h) for h in headers}
-    for m in matches:
-        for h in headers:
-            val = str(m.get(h, "-"))
-            widths[h] = max(widths[h], len(val))
-
-    total_width = sum(widths[h] + 3 for h in headers) + 1  # +3 for " | ", +1 for leading "|"
-
-    def make_row(row_data):
-        return "| " + " | ".join(
-            str(row_data.get(h, "-")).ljust(widths[h]) for h in headers
-        ) + " |"
-
-    def make_separator():
-        return "+" + "+".join("-" * (widths[h] + 2) for h in headers) + "+"
-
-    def make_category_row(category_name):
-        """Create a centered category label row spanning the full table width."""
-        inner_width = total_width - 2  # exclude outer | characters
-        label = category_name.center(inner_width)
-        return "|" + label + "|"
+    stat_cols = sorted(
+        (c for c in matches.columns if not c.startswith("_") and c not in NON_STAT_COLUMNS),
+        key=stat_column_sort_key,
+    )
+    headers = ["Ticker", "Price"] + stat_cols
+    present = [h for h in headers if h in matches.columns]
+    positions = [present.index(h) if h in matches.columns else None for h in headers]
+
+    widths = [len(h) for h in headers]
+    has_categories = "Category" in matches.columns and matches["Category"].notna().any()
+    category_values = matches["Category"].tolist() if has_categories else [None] * len(matches)
 
     # Group matches by category, preserving order of first appearance
-    has_categories = any(m.get("_category") for m in matches)
-
-    if has_categories:
-        # Collect categories in order of first appearance
-        seen_categories = []
-        categorized: dict[str, list[dict]] = {}
-        for m in matches:
-            cat = m.get("_category", "Other")
-            if cat not in categorized:
-                seen_categories.append(cat)
-                categorized[cat] = []
-            categorized[cat].append(m)
-
-        # Build table with category headers
-        table_lines = [make_separator(), make_row({h: h for h in headers}), make_separator()]
-        for cat in seen_categories:
-            table_lines.append(make_category_row(cat))
-            for m in categorized[cat]:
-                table_lines.append(make_row(m))
-        table_lines.append(make_separator())
-    else:
-        # No categories — flat table
-        table_lines = [make_separator(), make_row({h: h for h in headers}), make_separator()]
-        for m in matches:
-            table_lines.append(make_row(m))
-        table_lines.append(make_separator())
-
-    return "```\n" + "\n".join(table_lines) + "\n```"
+    buckets: dict[str, list[list[str]]] = {}
+    for category, values in zip(category_values, matches[present].itertuples(index=False, name=None)):
+        cells = ["-" if pos is None else format_cell(values[pos]) for pos in positions]
+        for k, cell in enumerate(cells):
+            if len(cell) > widths[k]:
+                widths[k] = len(cell)
+        key = "Other" if category is None or pd.isna(category) else str(category)
+        buckets.setdefault(key, []).append(cells)
+
+    total_width = sum(w + 3 for w in widths) + 1  # +3 for " | ", +1 for leading "|"
+
+    def make_row(cells):
+        return "| " + " | ".join(c.ljust(w) for c, w in zip(cells, widths)) + " |"
+
+    separator = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+
+    rows, section_rows = [], set()
+    for category, bucket in buckets.items():
+        if has_categories:
+            # Centered category label row spanning the full table width (exclude outer | characters)
+            section_rows.add(len(rows))
+            rows.append("|" + category.center(total_width - 2) + "|")
+        rows.extend(make_row(cells) for cells in bucket)
+
+    return TableBlock(title, [separator, make_row(headers), separator], rows, [separator], section_rows)
+
+
+def format_discord_table(matches: pd.DataFrame | list[dict]) -> str:
+    """
+    Generates a monospaced ASCII table for Discord with category grouping.
+    matches: a results table (see logic.results.AlertResults.group_table) with Ticker, Price,
+    stat columns and an optional Category column. A list of stat dicts using a '_category'
+    key is also accepted.
+    """
+    block = render_table_block(matches)
+    if block is None:
+        return "No matches found."
+    return block.table_text
@@ -0,0 +1,262 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RUN_HISTORY_FILE = "run_history.jsonl"
+METRICS_PORT = 9108
+
+# Latency buckets in seconds, from a cached indicator lookup to a slow full download
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Full-precision sample value: integers as integers, other floats round-trip exact."""
+    value = float(value)
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Current value per label set (e.g. queue depth)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set, as Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help_text, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the pipeline's metrics
+REGISTRY = MetricsRegistry()
+
+RUNS = REGISTRY.counter("notifier_runs_total", "Analysis runs, by outcome")
+RUN_SECONDS = REGISTRY.histogram("notifier_run_seconds", "End-to-end duration of an analysis run")
+STAGE_SECONDS = REGISTRY.histogram("notifier_stage_seconds", "Duration of each pipeline stage")
+TICKERS_FETCHED = REGISTRY.counter("notifier_tickers_fetched_total", "Tickers requested from the price source")
+TICKERS_EXCLUDED = REGISTRY.counter("notifier_tickers_excluded_total", "Tickers dropped by the data quality check, by issue")
+ALERTS = REGISTRY.counter("notifier_alerts_total", "Alert rows produced by analysis runs")
+CACHE_LOOKUPS = REGISTRY.counter("notifier_cache_lookups_total", "Cache lookups, by cache and result (hit/miss)")
+DISCORD_REQUESTS = REGISTRY.counter("notifier_discord_requests_total", "Webhook requests, by HTTP status (or 'error')")
+DISCORD_SECONDS = REGISTRY.histogram("notifier_discord_request_seconds", "Webhook request latency")
+DELIVERIES = REGISTRY.counter("notifier_deliveries_total", "Queued notification outcomes (sent/retry/dead)")
+QUEUE_DEPTH = REGISTRY.gauge("notifier_queue_depth", "Notifications in the outbox, by status")
+
+
+@contextmanager
+def timed(stage: str, timings: dict | None = None):
+    """Observe the block's duration as notifier_stage_seconds{stage=...}, also storing it in `timings`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed, 4)
+
+
+class RunHistory:
+    """
+    Compact rolling log of runs: one JSON line per run, trimmed to the last `max_runs`.
+    The line count is tracked in memory (counted from the file once), and the file is only
+    reread and rewritten (atomically) once it holds twice that many lines, so a normal run
+    costs a single append.
+    """
+
+    def __init__(self, path: str = RUN_HISTORY_FILE, max_runs: int = 500):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._lines: int | None = None
+
+    def append(self, record: dict):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            if self._lines is None:
+                self._lines = self._count_lines()
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+            self._lines += 1
+            if self._lines > 2 * self.max_runs:
+                self._trim()
+
+    def _count_lines(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def _trim(self):
+        with open(self.path, "r") as f:
+            lines = f.readlines()
+        self._lines = len(lines)
+        if len(lines) <= 2 * self.max_runs:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, prefix=".history-", suffix=".tmp", delete=False) as f:
+            f.writelines(lines[-self.max_runs:])
+        os.replace(f.name, self.path)
+        self._lines = self.max_runs
+
+    def read(self, last: int | None = None) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        records = records[-self.max_runs:]
+        return records[-last:] if last else records
+
+
+RUN_HISTORY = RunHistory()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+    history = RUN_HISTORY
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = self.registry.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/runs":
+            body = json.dumps(self.history.read(last=50)).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the app's console
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "127.0.0.1",
+                         registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer | None:
+    """
+    Serve /metrics (Prometheus text format) and /runs (recent run history as JSON) from a
+    daemon thread. Returns the server, or None if the port could not be bound.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        print(f"Metrics endpoint not started on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,340 @@
+import base64
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from utils.discord_sender import post_discord_payload
+from utils.metrics import DELIVERIES, QUEUE_DEPTH, timed
+
+QUEUE_FILE = "notification_queue.db"
+# How long a claimed row stays reserved for its claimer; the worker renews it while sending
+LEASE_SECONDS = 120.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    webhook_url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    files TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_error TEXT,
+    claimed_by TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+def _encode_files(files: dict | None) -> str | None:
+    if not files:
+        return None
+    return json.dumps({
+        name: [base64.b64encode(data).decode("ascii"), content_type]
+        for name, (data, content_type) in files.items()
+    })
+
+
+def _decode_files(raw: str | None) -> dict | None:
+    if not raw:
+        return None
+    return {name: (base64.b64decode(data), content_type) for name, (data, content_type) in json.loads(raw).items()}
+
+
+class _ClosingConnection:
+    """Context manager that closes the sqlite3 connection on exit (sqlite3's own only ends the transaction)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+
+class NotificationQueue:
+    """
+    Disk-backed outbox for webhook requests (SQLite in WAL mode).
+
+    Rows move pending -> sending -> deleted on success. Failures go back to pending with
+    a later next_attempt_at; permanent client errors (4xx other than 429) go to 'dead'
+    and are kept for inspection/requeue instead of being dropped.
+
+    Several processes may share the file (the app and the polling loop): a claim records
+    its owner and a lease, and rows are only taken back from 'sending' once the lease has
+    expired (e.g. the claimer crashed), never while another process is still sending them.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE, lease_seconds: float = LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Outboxes created before claims had owners
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+            for column, kind in (("claimed_by", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> _ClosingConnection:
+        # A short-lived connection per operation keeps the queue safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _ClosingConnection(conn)
+
+    def enqueue(self, webhook_url: str, payloads: list[tuple[dict, dict | None]]) -> int:
+        """Persist (payload, files) requests for a webhook in one transaction. Returns how many were queued."""
+        now = time.time()
+        rows = [(webhook_url, json.dumps(payload), _encode_files(files), now, now) for payload, files in payloads]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO outbox (webhook_url, payload, files, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        return len(rows)
+
+    def claim_due(self, limit: int = 10, now: float | None = None) -> list[dict]:
+        """
+        Mark up to `limit` due rows as sending (oldest first) and return them. A row is held
+        back while an older row for the same webhook is still being sent or waiting for a
+        retry, so each webhook receives its messages in order.
+        """
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Recover rows whose claimer stopped renewing its lease
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_by = NULL, lease_until = NULL "
+                "WHERE status = 'sending' AND (lease_until IS NULL OR lease_until < ?)",
+                (now,),
+            )
+            rows = conn.execute(
+                "SELECT * FROM outbox AS o WHERE status = 'pending' AND next_attempt_at <= ? "
+                "AND NOT EXISTS (SELECT 1 FROM outbox AS p WHERE p.webhook_url = o.webhook_url AND p.id < o.id "
+                "AND (p.status = 'sending' OR (p.status = 'pending' AND p.next_attempt_at > ?))) "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', claimed_by = ?, lease_until = ? WHERE id = ?",
+                [(self.owner, now + self.lease_seconds, r["id"]) for r in rows],
+            )
+            conn.execute("COMMIT")
+
+        return [
+            {
+                "id": r["id"],
+                "webhook_url": r["webhook_url"],
+                "payload": json.loads(r["payload"]),
+                "files": _decode_files(r["files"]),
+                "attempts": r["attempts"],
+            }
+            for r in rows
+        ]
+
+    def mark_sent(self, item_id: int):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM outbox WHERE id = ?", (item_id,))
+
+    def renew(self, item_ids: list[int]):
+        """Extend this queue's lease on rows it is still working through."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET lease_until = ? WHERE id = ? AND status = 'sending' AND claimed_by = ?",
+                [(time.time() + self.lease_seconds, i, self.owner) for i in item_ids],
+            )
+
+    def release(self, item_ids: list[int]):
+        """Return claimed rows to pending untouched (no attempt counted), e.g. behind a failed earlier row."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'pending', claimed_by = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = 'sending' AND claimed_by = ?",
+                [(i, self.owner) for i in item_ids],
+            )
+
+    def mark_retry(self, item_id: int, error: str, delay: float):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, last_error = ?, "
+                "claimed_by = NULL, lease_until = NULL WHERE id = ? AND claimed_by = ?",
+                (time.time() + delay, error, item_id, self.owner),
+            )
+
+    def mark_dead(self, item_id: int, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'dead', attempts = attempts + 1, last_error = ?, "
+                "claimed_by = NULL, lease_until = NULL WHERE id = ? AND claimed_by = ?",
+                (error, item_id, self.owner),
+            )
+
+    def requeue_dead(self) -> int:
+        """Give dead rows another chance (e.g. after fixing the webhook URL). Returns how many were requeued."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE outbox SET status = 'pending', next_attempt_at = ? WHERE status = 'dead'", (time.time(),)
+            )
+            return cur.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Number of rows per status, e.g. {'pending': 3, 'dead': 1}."""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def dead_errors(self, limit: int = 5) -> list[str]:
+        """Last errors of the most recent dead rows."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT last_error FROM outbox WHERE status = 'dead' ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def next_due_in(self) -> float | None:
+        """Seconds until the next pending row is due (0 if overdue), or None when nothing is pending."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()
+        if row[0] is None:
+            return None
+        return max(row[0] - time.time(), 0.0)
+
+
+class NotificationWorker:
+    """
+    Drains a NotificationQueue in a background thread.
+
+    Requests to the same webhook are sent in order and spaced at least `min_interval` seconds
+    apart; different webhooks are served in parallel (up to `max_parallel` at a time). A 429's
+    Retry-After is honoured, and other failures back off exponentially
+    (base_delay * 2^attempts, capped at max_delay, plus up to 10% jitter).
+    """
+
+    def __init__(self, queue: NotificationQueue, post=post_discord_payload, min_interval: float = 0.5,
+                 base_delay: float = 2.0, max_delay: float = 300.0, poll_interval: float = 1.0,
+                 max_parallel: int = 4):
+        self.queue = queue
+        self.max_parallel = max_parallel
+        self.post = post
+        self.min_interval = min_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self._last_sent: dict[str, float] = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.base_delay * (2 ** attempts), self.max_delay)
+        return delay + random.uniform(0, delay * 0.1)
+
+    def _throttle(self, webhook_url: str):
+        wait = self._last_sent.get(webhook_url, 0.0) + self.min_interval - time.monotonic()
+        if wait > 0:
+            self._stop.wait(wait)
+        self._last_sent[webhook_url] = time.monotonic()
+
+    def deliver(self, item: dict) -> bool:
+        """Send one claimed row and record the outcome in the queue. Returns whether it was sent."""
+        self._throttle(item["webhook_url"])
+        try:
+            with timed("send"):
+                response = self.post(item["webhook_url"], item["payload"], item["files"])
+        except Exception as e:
+            self.queue.mark_retry(item["id"], str(e), self.backoff(item["attempts"]))
+            DELIVERIES.inc(outcome="retry")
+            return False
+
+        status = response.status_code
+        if status in (200, 204):
+            self.queue.mark_sent(item["id"])
+            DELIVERIES.inc(outcome="sent")
+            return True
+        elif status == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                retry_after = self.backoff(item["attempts"])
+            self.queue.mark_retry(item["id"], "429 rate limited", retry_after)
+            DELIVERIES.inc(outcome="retry")
+        elif 400 <= status < 500:
+            self.queue.mark_dead(item["id"], f"{status} - {response.text[:500]}")
+            DELIVERIES.inc(outcome="dead")
+        else:
+            self.queue.mark_retry(item["id"], f"{status} - {response.text[:500]}", self.backoff(item["attempts"]))
+            DELIVERIES.inc(outcome="retry")
+        return False
+
+    def _deliver_in_order(self, items: list[dict]):
+        # One webhook's rows, oldest first: after a failure the rest wait behind the failed row
+        for k, item in enumerate(items):
+            if k:
+                self.queue.renew([rest["id"] for rest in items[k:]])
+            if not self.deliver(item):
+                self.queue.release([rest["id"] for rest in items[k + 1:]])
+                break
+
+    def drain_once(self, batch_size: int = 10) -> int:
+        """Deliver everything currently due. Returns the number of rows processed."""
+        processed = 0
+        while not self._stop.is_set():
+            items = self.queue.claim_due(batch_size)
+            if not items:
+                break
+            by_webhook: dict[str, list[dict]] = {}
+            for item in items:
+                by_webhook.setdefault(item["webhook_url"], []).append(item)
+
+            if len(by_webhook) == 1:
+                self._deliver_in_order(items)
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(by_webhook), self.max_parallel)) as pool:
+                    list(pool.map(self._deliver_in_order, by_webhook.values()))
+            processed += len(items)
+        return processed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain_once()
+                counts = self.queue.counts()
+                for status in ("pending", "sending", "dead"):
+                    QUEUE_DEPTH.set(counts.get(status, 0), status=status)
+            except sqlite3.Error as e:
+                print(f"Notification queue error: {e}")
+            next_due = self.queue.next_due_in()
+            timeout = self.poll_interval if next_due is None else min(max(next_due, 0.05), self.poll_interval)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def notify(self):
+        """Wake the worker immediately (call after enqueueing)."""
+        self._wake.set()
+
+    def start(self) -> "NotificationWorker":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)